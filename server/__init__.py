@@ -3,6 +3,7 @@ from dotenv import load_dotenv
 import cloudinary
 from flask import Flask
 from .extensions import db, migrate, cors, api, bcrypt, jwt
+from .logging_setup import configure_logging
 
 load_dotenv()
 
@@ -29,6 +30,66 @@ def create_app(config_object: str = None):
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
     app.config["SECRET_KEY"] = os.getenv("SECRET_KEY", "super-secret-key")
 
+    # Agent chat response cache (similarity threshold unset = exact matches only)
+    app.config["CHAT_CACHE_TTL"] = int(os.getenv("CHAT_CACHE_TTL", 6 * 3600))
+    app.config["CHAT_CACHE_MAX_ENTRIES"] = int(os.getenv("CHAT_CACHE_MAX_ENTRIES", 2000))
+    threshold = os.getenv("CHAT_CACHE_SIMILARITY_THRESHOLD")
+    app.config["CHAT_CACHE_SIMILARITY_THRESHOLD"] = float(threshold) if threshold else None
+
+    # Catch image uploads: spooled locally, pushed to storage by a worker pool
+    app.config["STORAGE_BACKEND"] = os.getenv("STORAGE_BACKEND", "cloudinary")
+    app.config["LOCAL_STORAGE_DIR"] = os.getenv(
+        "LOCAL_STORAGE_DIR", os.path.join(app.instance_path, "images")
+    )
+    app.config["LOCAL_STORAGE_URL"] = os.getenv("LOCAL_STORAGE_URL", "/images")
+    app.config["UPLOAD_SPOOL_DIR"] = os.getenv(
+        "UPLOAD_SPOOL_DIR", os.path.join(app.instance_path, "upload_spool")
+    )
+    app.config["UPLOAD_WORKERS"] = int(os.getenv("UPLOAD_WORKERS", 4))
+    # Resized variants (full/medium/thumbnail) built in a process pool
+    app.config["IMAGE_MAX_EDGE"] = int(os.getenv("IMAGE_MAX_EDGE", 2048))
+    app.config["IMAGE_FORMAT"] = os.getenv("IMAGE_FORMAT", "webp")  # webp | jpeg
+    app.config["IMAGE_QUALITY"] = int(os.getenv("IMAGE_QUALITY", 82))
+    app.config["IMAGE_WORKERS"] = int(os.getenv("IMAGE_WORKERS", os.cpu_count() or 1))
+
+    # Bulk catch import: rows per insert/transaction
+    app.config["IMPORT_CHUNK_SIZE"] = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+
+    # Like/comment notifications: write-behind flush period (0 = write inline)
+    app.config["NOTIFICATION_FLUSH_INTERVAL"] = float(os.getenv("NOTIFICATION_FLUSH_INTERVAL", 1.0))
+    # Notification push fan-out: memory:// (single process) or redis://... (all
+    # workers; needed with gunicorn -w > 1, which warns at startup otherwise)
+    app.config["PUBSUB_URL"] = os.getenv("PUBSUB_URL", "memory://")
+
+    # Follower-graph cache (per process; TTL bounds staleness across workers)
+    app.config["FOLLOW_CACHE_MAX_ENTRIES"] = int(os.getenv("FOLLOW_CACHE_MAX_ENTRIES", 10000))
+    app.config["FOLLOW_CACHE_TTL"] = int(os.getenv("FOLLOW_CACHE_TTL", 60))
+
+    # Token revocation: how often each worker syncs its bloom filter of revoked
+    # jtis from the database, and how often it rebuilds it (dropping expired ones)
+    app.config["TOKEN_REVOCATION_SYNC_INTERVAL"] = float(os.getenv("TOKEN_REVOCATION_SYNC_INTERVAL", 5.0))
+    app.config["TOKEN_BLOOM_REBUILD_INTERVAL"] = float(os.getenv("TOKEN_BLOOM_REBUILD_INTERVAL", 3600.0))
+    app.config["TOKEN_BLOOM_CAPACITY"] = int(os.getenv("TOKEN_BLOOM_CAPACITY", 100000))
+    app.config["TOKEN_BLOOM_ERROR_RATE"] = float(os.getenv("TOKEN_BLOOM_ERROR_RATE", 0.001))
+
+    # Serialized user cards embedded in catches/comments (per process)
+    app.config["USER_CACHE_MAX_ENTRIES"] = int(os.getenv("USER_CACHE_MAX_ENTRIES", 5000))
+    app.config["USER_CACHE_TTL"] = int(os.getenv("USER_CACHE_TTL", 30))
+
+    # GET /users/<id>/profile|catches, /catches/<id>[/comments]: ETags always;
+    # rendered bodies cached only if set (memory:// or redis://...)
+    app.config["RESPONSE_CACHE_URL"] = os.getenv("RESPONSE_CACHE_URL", "")
+    app.config["RESPONSE_CACHE_TTL"] = int(os.getenv("RESPONSE_CACHE_TTL", 300))
+    app.config["RESPONSE_CACHE_MAX_ENTRIES"] = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", 2000))
+
+    # Following timeline: authors above the limit are merged on read instead
+    app.config["TIMELINE_FANOUT_LIMIT"] = int(os.getenv("TIMELINE_FANOUT_LIMIT", 5000))
+    app.config["TIMELINE_BACKFILL"] = int(os.getenv("TIMELINE_BACKFILL", 50))
+
+    # Per-request SQL instrumentation (/debug/perf only when explicitly enabled)
+    app.config["PERF_QUERY_THRESHOLD"] = int(os.getenv("PERF_QUERY_THRESHOLD", 20))
+    app.config["PERF_DEBUG_ENDPOINT"] = os.getenv("PERF_DEBUG_ENDPOINT") == "1"
+
     # Cloudinary configuration
     cloudinary.config(
         cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
@@ -36,7 +97,13 @@ def create_app(config_object: str = None):
         api_secret=os.getenv("CLOUDINARY_API_SECRET"),
     )
 
+    configure_logging(app)
+
     # Initialize extensions
+    from .serialization import OrjsonProvider
+
+    app.json = OrjsonProvider(app)
+
     db.init_app(app)
     migrate.init_app(app, db, directory="server/migrations")
     cors.init_app(app, resources={r"/*": {"origins": "*"}}, supports_credentials=True)
@@ -44,6 +111,44 @@ def create_app(config_object: str = None):
     bcrypt.init_app(app)
     jwt.init_app(app)
 
+    from .current_user import user_cache
+
+    user_cache.init_app(app)
+
+    from .revocation import revocation_store
+
+    revocation_store.init_app(app)
+
+    from .chat_cache import chat_cache
+
+    chat_cache.init_app(app)
+
+    from .uploads import upload_pipeline
+
+    upload_pipeline.init_app(app)
+
+    from .follow_graph import follow_graph
+
+    follow_graph.init_app(app)
+
+    from .timeline import timeline
+
+    timeline.init_app(app)
+
+    from .http_cache import http_cache
+
+    http_cache.init_app(app)
+
+    from .pubsub import pubsub
+    from .notifications import notification_queue
+
+    pubsub.init_app(app)
+    notification_queue.init_app(app)
+
+    from . import perf
+
+    perf.init_app(app)
+
     # Import and register route modules (no blueprints)
     from .routes import catches, social, user, ai, auth
 
@@ -53,4 +158,8 @@ def create_app(config_object: str = None):
     user.register_routes(app)
     auth.register_routes(app)
 
+    from .commands import register_commands
+
+    register_commands(app)
+
     return app
\ No newline at end of file
@@ -1,14 +1,17 @@
 import os
 from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.runnables import RunnablePassthrough
 from langchain.agents import create_tool_calling_agent, AgentExecutor
+from langchain.agents.format_scratchpad.tools import format_to_tool_messages
+from langchain.agents.output_parsers.tools import ToolsAgentOutputParser
 from dotenv import load_dotenv
-from .tools import tools
+from .tools import tools, build_tools
 
 load_dotenv()
 
 # initialize llm
-llm = ChatOpenAI(model="gpt-3.5-turbo")
+llm = ChatOpenAI(model="gpt-3.5-turbo", streaming=True)  # streaming so /chat/stream gets tokens
 
 # prompt template
 prompt = ChatPromptTemplate.from_messages(
@@ -28,14 +31,59 @@ prompt = ChatPromptTemplate.from_messages(
 )
 
 
+# Signed-out users get no catch history tool at all, only general advice
+guest_prompt = ChatPromptTemplate.from_messages(
+    [
+        (
+            "system",
+            """
+            You are a smart fishing assistant that helps anglers catch more fish.
+            The user is not signed in, so you can't see any logged catches: give general advice,
+            and mention that signing in lets you tailor suggestions to their own catch history.
+            """,
+        ),
+        ("placeholder", "{chat_history}"),
+        ("human", "{query}"),
+        ("placeholder", "{agent_scratchpad}"),
+    ]
+)
+
+
+def build_guest_agent(llm):
+    """create_tool_calling_agent's pipeline minus bind_tools (OpenAI rejects an empty tools list)."""
+    return (
+        RunnablePassthrough.assign(
+            agent_scratchpad=lambda x: format_to_tool_messages(x["intermediate_steps"])
+        )
+        | guest_prompt
+        | llm
+        | ToolsAgentOutputParser()
+    )
+
+
 # create & run agent
 agent = create_tool_calling_agent(
     llm=llm,
     prompt=prompt,
     tools=tools
 )
+guest_agent = build_guest_agent(llm)
+
+# AGENT_VERBOSE=1 prints the agent's thought process to stdout (off by default:
+# it is synchronous and very chatty under load)
+AGENT_VERBOSE = os.getenv("AGENT_VERBOSE") == "1"
+
+agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=AGENT_VERBOSE)
+
+
+def build_agent_executor(user_id):
+    """Executor whose tools only see user_id's catches (the agent itself is shared).
 
-agent_executor = AgentExecutor(agent=agent, tools=tools, verbose=True) # verbose = true to show agents thought process
+    user_id must come from the caller's JWT; None builds the tool-less guest agent.
+    """
+    if user_id is None:
+        return AgentExecutor(agent=guest_agent, tools=[], verbose=AGENT_VERBOSE)
+    return AgentExecutor(agent=agent, tools=build_tools(user_id), verbose=AGENT_VERBOSE)
 
 if __name__ == "__main__":
     query = input("What can I help you with today? ")
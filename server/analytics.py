@@ -0,0 +1,131 @@
+from sqlalchemy import case, extract, func
+from .extensions import db
+from .models import Catch
+
+# SQL-side catch aggregation shared by the AI endpoints and agent tools.
+# Everything here is GROUP BY / aggregate queries, so memory and latency
+# don't grow with the number of catches a user has logged. extract() is
+# compiled to strftime on SQLite and EXTRACT on Postgres by SQLAlchemy.
+
+
+def catch_filters(user_id=None, species=None, month=None):
+    """Build the WHERE clauses used by the aggregate helpers below."""
+    filters = []
+    if user_id is not None:
+        filters.append(Catch.user_id == user_id)
+    if species:
+        filters.append(Catch.species == species)
+    if month is not None:
+        filters.append(extract("month", Catch.date_caught) == month)
+    return filters
+
+
+def time_of_day(column=Catch.date_caught):
+    """Hour bucket matching the old Python categorize_time() helper."""
+    hour = extract("hour", column)
+    return case(
+        (hour.between(5, 11), "morning"),
+        (hour.between(12, 17), "afternoon"),
+        else_="night",
+    )
+
+
+def count_catches(filters):
+    return db.session.query(func.count(Catch.id)).filter(*filters).scalar() or 0
+
+
+def most_common(expr, filters, skip_empty=True):
+    """Most frequent value of expr among catches matching filters.
+
+    Ties go to the value logged first (lowest catch id), which is what
+    Counter.most_common returned when catches were loaded in id order.
+    With skip_empty=False, NULL values compete like any other value.
+    """
+    query = db.session.query(expr).filter(*filters)
+    if skip_empty:
+        query = query.filter(expr.isnot(None), expr != "")
+    row = (
+        query.group_by(expr)
+        .order_by(func.count(Catch.id).desc(), func.min(Catch.id))
+        .first()
+    )
+    return row[0] if row else None
+
+
+def averages(filters, *columns, ndigits=1):
+    """Rounded averages of the given numeric columns, keyed by column name."""
+    row = (
+        db.session.query(*[func.avg(col) for col in columns])
+        .filter(*filters)
+        .one()
+    )
+    return {
+        col.key: round(value, ndigits) if value is not None else None
+        for col, value in zip(columns, row)
+    }
+
+
+def conditions_summary(user_id, species=None):
+    """Best tide/bait/time/spot for a user (optionally one species)."""
+    filters = catch_filters(user_id=user_id, species=species)
+    if not count_catches(filters):
+        return None
+
+    return {
+        "best_tide": most_common(Catch.tide, filters),
+        "best_bait": most_common(Catch.bait_used, filters),
+        "best_time": most_common(
+            time_of_day(), filters + [Catch.date_caught.isnot(None)], skip_empty=False
+        ),
+        "best_spot": most_common(Catch.location, filters),
+    }
+
+
+def month_patterns(user_id, month):
+    """Top species/location/bait/tide across every year for one calendar month."""
+    filters = catch_filters(user_id=user_id, month=month)
+    if not count_catches(filters):
+        return None
+
+    return {
+        "species": most_common(Catch.species, filters, skip_empty=False),
+        "location": most_common(Catch.location, filters, skip_empty=False),
+        "bait": most_common(Catch.bait_used, filters, skip_empty=False),
+        "tide": most_common(Catch.tide, filters, skip_empty=False),
+    }
+
+
+def month_patterns_for_users(user_ids, month):
+    """month_patterns() for many users at once: one grouped query per field.
+
+    Returns {user_id: stats}; users with no catches in that month are absent.
+    """
+    if not user_ids:
+        return {}
+    filters = [Catch.user_id.in_(user_ids)] + catch_filters(month=month)
+    fields = {
+        "species": Catch.species,
+        "location": Catch.location,
+        "bait": Catch.bait_used,
+        "tide": Catch.tide,
+    }
+
+    results = {}
+    for name, column in fields.items():
+        rows = (
+            db.session.query(
+                Catch.user_id, column, func.count(Catch.id), func.min(Catch.id)
+            )
+            .filter(*filters)
+            .group_by(Catch.user_id, column)
+            .all()
+        )
+        # Highest count wins; ties go to the value logged first
+        best = {}
+        for user_id, value, count, first_id in rows:
+            current = best.get(user_id)
+            if current is None or (count, -first_id) > (current[1], -current[2]):
+                best[user_id] = (value, count, first_id)
+        for user_id, (value, _, _) in best.items():
+            results.setdefault(user_id, {})[name] = value
+    return results
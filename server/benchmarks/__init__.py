@@ -0,0 +1,4 @@
+"""Synthetic-data seeding and performance benchmarks for the Flask API.
+
+Run modules with ``python -m server.benchmarks.<name> --help``.
+"""
@@ -0,0 +1,161 @@
+"""Latency, queries-per-request and memory benchmark for the main endpoints.
+
+    python -m server.benchmarks.http_load --users 10000 --catches 100000
+    python -m server.benchmarks.http_load --base-url http://localhost:5000 --concurrency 16
+
+By default the app is built with create_app() against a throwaway SQLite
+file (or DATABASE_URI), seeded in bulk, and driven through the Flask test
+client with the OpenAI client stubbed out. With --base-url it drives an
+already-running server over HTTP instead; query counts and memory are
+only measured in-process. Peak memory comes from a separate, untimed
+pass under tracemalloc (which slows every allocation several times), so
+in-process latencies stay comparable with --base-url runs.
+"""
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+from sqlalchemy import event
+
+
+def endpoint_mix(user_ids):
+    """(name, method, path-or-factory, json body) tuples to benchmark."""
+    pick = random.Random(7).choice
+    return [
+        ("GET /feed", "GET", lambda: "/feed?limit=20", None),
+        ("GET /users/<id>/catches", "GET", lambda: f"/users/{pick(user_ids)}/catches", None),
+        ("GET /users/<id>/profile", "GET", lambda: f"/users/{pick(user_ids)}/profile?viewer_id={pick(user_ids)}", None),
+        ("GET /notifications", "GET", lambda: f"/notifications?user_id={pick(user_ids)}", None),
+        ("GET /notifications/unread-count", "GET", lambda: f"/notifications/unread-count?user_id={pick(user_ids)}", None),
+        ("POST /ai/conditions_summary", "POST", lambda: "/ai/conditions_summary", lambda: {"user_id": pick(user_ids)}),
+    ]
+
+
+def stub_llm():
+    """Replace the OpenAI client used for forecasts with an instant fake."""
+    from .. import forecasts
+
+    message = SimpleNamespace(content="Stubbed forecast: fish the incoming tide.")
+    completion = SimpleNamespace(choices=[SimpleNamespace(message=message)])
+    forecasts.client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=lambda **kwargs: completion))
+    )
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def report(name, latencies, queries=None, peak_kb=None, errors=0):
+    line = (
+        f"{name:34} n={len(latencies):5} "
+        f"p50={percentile(latencies, 50):8.2f}ms "
+        f"p95={percentile(latencies, 95):8.2f}ms "
+        f"p99={percentile(latencies, 99):8.2f}ms"
+    )
+    if queries:
+        line += f"  queries/req={statistics.mean(queries):6.1f} (max {max(queries)})"
+    if peak_kb is not None:
+        line += f"  peak={peak_kb:8.0f}KiB"
+    if errors:
+        line += f"  errors={errors}"
+    print(line)
+
+
+def run_in_process(args):
+    if not os.getenv("DATABASE_URI"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URI"] = f"sqlite:///{path}"
+
+    from .. import create_app
+    from ..extensions import db
+    from ..models import User
+    from .seed import seed
+
+    stub_llm()
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        started = time.perf_counter()
+        print("Seeded:", seed(users=args.users, catches=args.catches),
+              f"in {time.perf_counter() - started:.1f}s")
+        user_ids = [uid for (uid,) in db.session.query(User.id)]
+        engine = db.engine
+
+    counter = {"n": 0}
+
+    def count_query(*_):
+        counter["n"] += 1
+
+    event.listen(engine, "before_cursor_execute", count_query)
+    client = app.test_client()
+
+    for name, method, path, body in endpoint_mix(user_ids):
+        latencies, queries, errors = [], [], 0
+        for _ in range(args.requests):
+            counter["n"] = 0
+            started = time.perf_counter()
+            response = client.open(path(), method=method, json=body() if body else None)
+            latencies.append((time.perf_counter() - started) * 1000)
+            queries.append(counter["n"])
+            errors += response.status_code >= 400
+
+        peak_kb = None
+        if args.memory_requests:
+            tracemalloc.start()
+            for _ in range(args.memory_requests):
+                client.open(path(), method=method, json=body() if body else None)
+            peak_kb = tracemalloc.get_traced_memory()[1] / 1024
+            tracemalloc.stop()
+        report(name, latencies, queries, peak_kb, errors)
+
+    event.remove(engine, "before_cursor_execute", count_query)
+
+
+def run_remote(args):
+    import requests
+
+    user_ids = list(range(1, args.users + 1))
+    session = requests.Session()
+
+    for name, method, path, body in endpoint_mix(user_ids):
+        def one(_):
+            started = time.perf_counter()
+            response = session.request(method, args.base_url + path(), json=body() if body else None)
+            return (time.perf_counter() - started) * 1000, response.status_code >= 400
+
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            results = list(pool.map(one, range(args.requests)))
+        report(name, [ms for ms, _ in results], errors=sum(err for _, err in results))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--catches", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=200, help="Requests per endpoint.")
+    parser.add_argument("--base-url", help="Benchmark a running server instead of in-process.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Client threads (--base-url only).")
+    parser.add_argument(
+        "--memory-requests", type=int, default=20,
+        help="Untimed requests per endpoint traced for peak memory (0 skips; in-process only).",
+    )
+    args = parser.parse_args()
+
+    if args.base_url:
+        run_remote(args)
+    else:
+        run_in_process(args)
+
+
+if __name__ == "__main__":
+    main()
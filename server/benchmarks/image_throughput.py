@@ -0,0 +1,92 @@
+"""Image variant processing throughput, overall and per core.
+
+    python -m server.benchmarks.image_throughput --images 48 --size 4032x3024
+    python -m server.benchmarks.image_throughput --format jpeg --workers 1,2,4
+
+Generates synthetic camera-sized JPEGs (noise over a gradient, so they
+compress like real photos rather than flat colour), then runs
+images.process_image over them in the same spawn-based process pool the
+upload pipeline uses, once per worker count.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from PIL import Image
+
+
+def make_samples(directory, count, size, seed_value=7):
+    rng = random.Random(seed_value)
+    width, height = size
+    paths = []
+    for i in range(count):
+        base = Image.linear_gradient("L").resize(size).convert("RGB")
+        noise = Image.effect_noise(size, rng.uniform(20, 60)).convert("RGB")
+        image = Image.blend(base, noise, 0.5)
+        exif = Image.Exif()
+        exif[0x0112] = rng.choice([1, 6, 8])  # orientation, exercises exif_transpose
+        path = os.path.join(directory, f"sample-{i}.jpg")
+        image.save(path, "JPEG", quality=92, exif=exif)
+        paths.append(path)
+    return paths
+
+
+def run(paths, workers, options):
+    from ..images import image_pool, process_image
+
+    out_root = tempfile.mkdtemp()
+    with image_pool(workers) as pool:
+        # Warm the pool so process start-up isn't billed to the first batch
+        list(pool.map(abs, range(workers)))
+        started = time.perf_counter()
+        futures = []
+        for i, path in enumerate(paths):
+            out_dir = os.path.join(out_root, str(i))
+            os.makedirs(out_dir)
+            futures.append(pool.submit(process_image, path, out_dir, **options))
+        outputs = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+
+    sizes = {name: 0 for name in outputs[0]}
+    for variants in outputs:
+        for name, path in variants.items():
+            sizes[name] += os.path.getsize(path)
+    return elapsed, {name: total / len(outputs) / 1024 for name, total in sizes.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--size", default="4032x3024", help="Source WIDTHxHEIGHT.")
+    parser.add_argument("--workers", default=None, help="Comma-separated worker counts (default 1 and all cores).")
+    parser.add_argument("--format", default="webp", choices=["webp", "jpeg"])
+    parser.add_argument("--max-edge", type=int, default=2048)
+    parser.add_argument("--quality", type=int, default=82)
+    args = parser.parse_args()
+
+    size = tuple(int(part) for part in args.size.lower().split("x"))
+    cores = os.cpu_count() or 1
+    worker_counts = (
+        [int(n) for n in args.workers.split(",")] if args.workers else sorted({1, cores})
+    )
+    options = {"max_edge": args.max_edge, "fmt": args.format, "quality": args.quality}
+
+    source_dir = tempfile.mkdtemp()
+    paths = make_samples(source_dir, args.images, size)
+    source_kb = sum(os.path.getsize(p) for p in paths) / len(paths) / 1024
+    print(f"{len(paths)} source images {size[0]}x{size[1]}, avg {source_kb:.0f}KiB, {cores} core(s)")
+
+    for workers in worker_counts:
+        elapsed, variant_kb = run(paths, workers, options)
+        rate = len(paths) / elapsed
+        sizes = "  ".join(f"{name}={kb:.1f}KiB" for name, kb in variant_kb.items())
+        print(
+            f"workers={workers:2}  {rate:6.2f} img/s  {rate / workers:6.2f} img/s/worker  "
+            f"{elapsed / len(paths) * 1000:7.1f}ms/img  {sizes}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""EXPLAIN plans and timings for the hot catch queries, with and without
+the hot-path indexes.
+
+    python -m server.benchmarks.index_plans --users 2000 --catches 100000
+
+Uses DATABASE_URI when set (point it at a scratch Postgres database to see
+the partial index), otherwise a throwaway SQLite file.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from sqlalchemy import func, select, text
+
+HOT_PATH_INDEXES = {
+    "idx_catches_public_feed",
+    "idx_catches_user_date",
+    "idx_catches_user_species",
+    "idx_likes_catch",
+    "idx_comments_catch_timestamp",
+    "idx_followers_following",
+}
+
+
+def hot_queries(sample_user, sample_catch, sample_species):
+    from ..models import Catch, Like, Comment, Follower
+
+    return {
+        "feed page": (
+            select(Catch.id, Catch.date_caught)
+            .where(Catch.is_public == True)  # noqa: E712
+            .order_by(Catch.date_caught.desc(), Catch.id.desc())
+            .limit(20)
+        ),
+        "profile catches": (
+            select(Catch.id)
+            .where(Catch.user_id == sample_user)
+            .order_by(Catch.date_caught.desc())
+        ),
+        "AI summary (user+species)": (
+            select(Catch.tide, func.count(Catch.id))
+            .where(Catch.user_id == sample_user, Catch.species == sample_species)
+            .group_by(Catch.tide)
+        ),
+        "likes for catch": select(func.count(Like.id)).where(Like.catch_id == sample_catch),
+        "comments for catch": (
+            select(Comment.id)
+            .where(Comment.catch_id == sample_catch)
+            .order_by(Comment.timestamp.desc())
+        ),
+        "follower count": select(func.count(Follower.id)).where(Follower.following_id == sample_user),
+    }
+
+
+def explain(conn, stmt):
+    sql = str(stmt.compile(conn, compile_kwargs={"literal_binds": True}))
+    prefix = "EXPLAIN ANALYZE " if conn.dialect.name == "postgresql" else "EXPLAIN QUERY PLAN "
+    rows = conn.execute(text(prefix + sql)).fetchall()
+    return "\n".join("    " + " | ".join(str(col) for col in row) for row in rows)
+
+
+def time_query(conn, stmt, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        conn.execute(stmt).fetchall()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def run(queries, engine, repeat):
+    results = {}
+    with engine.connect() as conn:
+        for name, stmt in queries.items():
+            results[name] = (explain(conn, stmt), time_query(conn, stmt, repeat))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--catches", type=int, default=50000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URI"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URI"] = f"sqlite:///{path}"
+
+    from .. import create_app
+    from ..extensions import db
+    from ..models import Catch
+    from .seed import seed
+
+    app = create_app()
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        counts = seed(users=args.users, catches=args.catches)
+        print("Seeded:", counts)
+
+        sample_user, sample_species = (
+            db.session.query(Catch.user_id, Catch.species)
+            .group_by(Catch.user_id, Catch.species)
+            .order_by(func.count(Catch.id).desc())
+            .first()
+        )
+        sample_catch = db.session.query(func.max(Catch.id)).scalar()
+        queries = hot_queries(sample_user, sample_catch, sample_species)
+
+        indexes = [
+            ix for table in db.metadata.tables.values()
+            for ix in table.indexes if ix.name in HOT_PATH_INDEXES
+        ]
+        engine = db.engine
+
+        for ix in indexes:
+            ix.drop(engine)
+        before = run(queries, engine, args.repeat)
+        for ix in indexes:
+            ix.create(engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+        after = run(queries, engine, args.repeat)
+
+    for name in queries:
+        (plan_before, ms_before), (plan_after, ms_after) = before[name], after[name]
+        print(f"\n== {name}: {ms_before:.2f} ms -> {ms_after:.2f} ms")
+        print("  before:\n" + plan_before)
+        print("  after:\n" + plan_after)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""Catch list serialization: ORM to_dict + stdlib json vs column rows + orjson.
+
+    python -m server.benchmarks.json_serialization --catches 5000 --repeat 10
+
+Seeds a throwaway SQLite file (or DATABASE_URI when set), then times the
+/users/<id>/catches-style list both ways, split into query/build and
+encode, and checks that the two paths produce the same JSON objects.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def best_of(repeat, fn):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--catches", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if not os.getenv("DATABASE_URI"):
+        path = os.path.join(tempfile.mkdtemp(), "bench.db")
+        os.environ["DATABASE_URI"] = f"sqlite:///{path}"
+
+    import orjson
+    from flask.json.provider import DefaultJSONProvider
+    from .. import create_app
+    from ..current_user import user_cache
+    from ..extensions import db
+    from ..models import Catch
+    from ..serialization import as_dicts, catch_query
+    from .seed import seed
+
+    app = create_app()
+    stdlib = DefaultJSONProvider(app)
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        seed(users=args.users, catches=args.catches)
+
+        def orm_build():
+            # Fresh identity map and user cache each run, as in a real request
+            db.session.expunge_all()
+            user_cache.clear()
+            catches = Catch.query.order_by(Catch.date_caught.desc(), Catch.id.desc()).all()
+            user_cache.cards({c.user_id for c in catches})
+            return [c.to_dict() for c in catches]
+
+        def row_build():
+            return as_dicts(catch_query().order_by(Catch.date_caught.desc(), Catch.id.desc()).all())
+
+        orm_ms, orm_items = best_of(args.repeat, orm_build)
+        row_ms, row_items = best_of(args.repeat, row_build)
+        stdlib_ms, stdlib_body = best_of(args.repeat, lambda: stdlib.dumps(orm_items).encode())
+        orjson_ms, orjson_body = best_of(args.repeat, lambda: orjson.dumps(row_items))
+
+    same = json.loads(stdlib_body) == json.loads(orjson_body)
+    print(f"{len(row_items)} catches, {len(orjson_body) / 1024:.0f}KiB, identical output: {same}")
+    print(f"{'':24}{'build':>10}{'encode':>10}{'total':>10}")
+    for name, build, encode in (
+        ("ORM to_dict + json", orm_ms, stdlib_ms),
+        ("rows + orjson", row_ms, orjson_ms),
+    ):
+        print(f"{name:24}{build:9.1f}ms{encode:9.1f}ms{build + encode:9.1f}ms")
+    print(f"speedup: {(orm_ms + stdlib_ms) / (row_ms + orjson_ms):.1f}x")
+
+
+if __name__ == "__main__":
+    main()
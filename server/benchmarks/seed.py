@@ -0,0 +1,111 @@
+import random
+from datetime import datetime, timedelta
+from sqlalchemy import insert
+from ..extensions import db
+from ..models import User, Catch, Like, Comment, Follower, Notification
+
+SPECIES = ["Striped Bass", "Fluke", "Bluefish", "Black Sea Bass", "Porgy", "Weakfish", "Tautog"]
+TIDES = ["High", "Low", "Incoming", "Outgoing"]
+BAITS = ["clam", "squid", "bunker", "sandworm", "bucktail", "soft plastic", "crab"]
+METHODS = ["surf casting", "jigging", "trolling", "drifting", "fly"]
+LOCATIONS = ["Jones Beach", "Montauk Point", "Sandy Hook", "Fire Island Inlet", "Shinnecock", "Raritan Bay"]
+
+CHUNK = 5000
+
+
+def _insert_chunked(model, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(insert(model), rows[start:start + CHUNK])
+
+
+def seed(users=1000, catches=10000, likes_per_catch=2.0, comments_per_catch=0.5,
+         follows_per_user=20, notifications_per_user=10, public_ratio=0.6,
+         seed_value=42):
+    """Bulk-insert a realistic synthetic dataset into the current database.
+
+    Activity is skewed so a minority of users log most catches and a few
+    accounts attract most follows, like the real app. Returns row counts.
+    """
+    rng = random.Random(seed_value)
+    now = datetime.utcnow()
+    first_user = (db.session.query(db.func.max(User.id)).scalar() or 0) + 1
+    user_ids = list(range(first_user, first_user + users))
+
+    _insert_chunked(User, [
+        {"id": uid, "username": f"angler{uid}", "level": rng.randint(1, 29),
+         "prestige": 0, "posts_toward_next_level": 0}
+        for uid in user_ids
+    ])
+
+    # Pareto-ish weights: heavy loggers and popular accounts
+    weights = [1.0 / (rank + 1) ** 0.8 for rank in range(users)]
+
+    catch_rows = []
+    owners = rng.choices(user_ids, weights=weights, k=catches)
+    for owner in owners:
+        catch_rows.append({
+            "user_id": owner,
+            "species": rng.choice(SPECIES),
+            "date_caught": now - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60)),
+            "water_temp": round(rng.uniform(45, 78), 1),
+            "air_temp": round(rng.uniform(40, 90), 1),
+            "tide": rng.choice(TIDES),
+            "length": round(rng.uniform(8, 40), 1),
+            "weight": round(rng.uniform(0.5, 30), 1),
+            "wind_speed": round(rng.uniform(0, 25), 1),
+            "method": rng.choice(METHODS),
+            "bait_used": rng.choice(BAITS),
+            "location": rng.choice(LOCATIONS),
+            "is_public": rng.random() < public_ratio,
+            "image_url": f"https://example.invalid/catch/{rng.getrandbits(48):x}.jpg",
+        })
+    _insert_chunked(Catch, catch_rows)
+    first_catch = db.session.query(db.func.min(Catch.id)).filter(Catch.user_id >= first_user).scalar()
+    catch_ids = list(range(first_catch, first_catch + catches))
+
+    like_pairs = set()
+    for _ in range(int(catches * likes_per_catch)):
+        like_pairs.add((rng.choice(user_ids), rng.choice(catch_ids)))
+    _insert_chunked(Like, [{"user_id": u, "catch_id": c} for u, c in like_pairs])
+
+    comment_rows = [
+        {"user_id": rng.choice(user_ids), "catch_id": rng.choice(catch_ids),
+         "content": "Nice fish!", "timestamp": now - timedelta(minutes=rng.randint(0, 525600))}
+        for _ in range(int(catches * comments_per_catch))
+    ]
+    _insert_chunked(Comment, comment_rows)
+
+    follow_pairs = set()
+    for follower in user_ids:
+        for following in rng.choices(user_ids, weights=weights, k=follows_per_user):
+            if following != follower:
+                follow_pairs.add((follower, following))
+    _insert_chunked(Follower, [{"follower_id": a, "following_id": b} for a, b in follow_pairs])
+
+    notification_rows = []
+    for recipient in user_ids:
+        for _ in range(notifications_per_user):
+            kind = rng.choice(["like", "comment", "follow"])
+            notification_rows.append({
+                "recipient_id": recipient,
+                "actor_id": rng.choice(user_ids),
+                "catch_id": rng.choice(catch_ids) if kind != "follow" else None,
+                "type": kind,
+                "is_read": rng.random() < 0.7,
+                "created_at": now - timedelta(minutes=rng.randint(0, 525600)),
+            })
+    _insert_chunked(Notification, notification_rows)
+
+    # Keep the denormalized counters consistent with the seeded rows
+    from ..counters import repair_counters
+    repair_counters()
+    db.session.commit()
+
+    return {
+        "users": users,
+        "catches": catches,
+        "likes": len(like_pairs),
+        "comments": len(comment_rows),
+        "followers": len(follow_pairs),
+        "notifications": len(notification_rows),
+    }
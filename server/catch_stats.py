@@ -0,0 +1,166 @@
+from sqlalchemy import func
+from .extensions import db
+from .models import Catch, CatchStats
+
+# Incrementally maintained per-user/per-species aggregates (CatchStats) so
+# the agent's catch_history_analyzer is one indexed lookup, not a scan.
+
+ALL_SPECIES = ""
+AVERAGED = ("water_temp", "wind_speed", "length", "weight")
+COUNTED = ("bait_used", "tide", "location", "method")
+
+
+def _species_key(species):
+    return species.lower() if species else None
+
+
+def _get_or_create(user_id, species):
+    stats = (
+        CatchStats.query.filter_by(user_id=user_id, species=species)
+        .with_for_update()
+        .first()
+    )
+    if stats is None:
+        stats = CatchStats(
+            user_id=user_id,
+            species=species,
+            catch_count=0,
+            water_temp_sum=0, water_temp_n=0,
+            wind_speed_sum=0, wind_speed_n=0,
+            length_sum=0, length_n=0,
+            weight_sum=0, weight_n=0,
+            value_counts={},
+        )
+        db.session.add(stats)
+    return stats
+
+
+def record_catch(catch):
+    """Fold a newly added catch into its user's stats rows.
+
+    Call before the commit that inserts the catch so both land in the
+    same transaction.
+    """
+    keys = [ALL_SPECIES]
+    if _species_key(catch.species):
+        keys.append(_species_key(catch.species))
+
+    for key in keys:
+        stats = _get_or_create(catch.user_id, key)
+        stats.catch_count += 1
+        if catch.date_caught and (
+            stats.last_caught is None or catch.date_caught > stats.last_caught
+        ):
+            stats.last_caught = catch.date_caught
+
+        for field in AVERAGED:
+            value = getattr(catch, field)
+            if value is not None:
+                setattr(stats, f"{field}_sum", getattr(stats, f"{field}_sum") + value)
+                setattr(stats, f"{field}_n", getattr(stats, f"{field}_n") + 1)
+
+        # Reassign (not mutate) the JSON column so the change is flushed
+        counts = {field: dict(values) for field, values in (stats.value_counts or {}).items()}
+        for field in COUNTED:
+            value = getattr(catch, field)
+            if value:
+                bucket = counts.setdefault(field, {})
+                bucket[value] = bucket.get(value, 0) + 1
+        stats.value_counts = counts
+
+
+def refresh_user_stats(user_id):
+    """Rebuild one user's stats rows from their catches with grouped queries."""
+    CatchStats.query.filter_by(user_id=user_id).delete(synchronize_session=False)
+
+    species = func.lower(Catch.species)
+    named = [Catch.user_id == user_id, Catch.species.isnot(None), Catch.species != ""]
+    everything = [Catch.user_id == user_id]
+
+    rows = {}
+    # Postgres rejects constant GROUP BY keys, so the all-species pass
+    # groups by nothing and is keyed as ALL_SPECIES in Python.
+    for key_expr, filters in ((species, named), (None, everything)):
+        keys = [key_expr] if key_expr is not None else []
+
+        totals = (
+            db.session.query(
+                *keys,
+                func.count(Catch.id),
+                func.max(Catch.date_caught),
+                *[func.coalesce(func.sum(getattr(Catch, f)), 0) for f in AVERAGED],
+                *[func.count(getattr(Catch, f)) for f in AVERAGED],
+            )
+            .filter(*filters)
+            .group_by(*keys)
+            .all()
+        )
+        for row in totals:
+            key, (count, last, *aggs) = (row[0], row[1:]) if keys else (ALL_SPECIES, row)
+            if not count:
+                continue
+            stats = CatchStats(
+                user_id=user_id,
+                species=key,
+                catch_count=count,
+                last_caught=last,
+                value_counts={},
+            )
+            for i, field in enumerate(AVERAGED):
+                setattr(stats, f"{field}_sum", aggs[i])
+                setattr(stats, f"{field}_n", aggs[len(AVERAGED) + i])
+            rows[key] = stats
+
+        for field in COUNTED:
+            column = getattr(Catch, field)
+            # Ordered by first appearance so ties resolve like they used to
+            values = (
+                db.session.query(*keys, column, func.count(Catch.id))
+                .filter(*filters, column.isnot(None), column != "")
+                .group_by(*keys, column)
+                .order_by(func.min(Catch.id))
+                .all()
+            )
+            for row in values:
+                key, value, count = row if keys else (ALL_SPECIES, *row)
+                rows[key].value_counts.setdefault(field, {})[value] = count
+
+    db.session.add_all(rows.values())
+
+
+def rebuild_all_stats():
+    """Recompute stats for every user with catches. Returns users processed."""
+    user_ids = [uid for (uid,) in db.session.query(Catch.user_id).distinct()]
+    for user_id in user_ids:
+        refresh_user_stats(user_id)
+        db.session.commit()
+    return len(user_ids)
+
+
+def stats_for_query(user_id, query):
+    """Pick the stats row for the species mentioned in query (or all catches).
+
+    Returns (species or None, CatchStats or None) from a single indexed
+    lookup of the user's rows.
+    """
+    if user_id is None:
+        return None, None
+    rows = CatchStats.query.filter_by(user_id=user_id).all()
+    by_species = {r.species: r for r in rows}
+
+    query = query.lower()
+    mentioned = [s for s in by_species if s and s in query]
+    if mentioned:
+        species = max(mentioned, key=len)
+        return species, by_species[species]
+    return None, by_species.get(ALL_SPECIES)
+
+
+def most_common_value(stats, field):
+    counts = (stats.value_counts or {}).get(field) or {}
+    return max(counts, key=counts.get) if counts else None
+
+
+def average(stats, field):
+    n = getattr(stats, f"{field}_n")
+    return round(getattr(stats, f"{field}_sum") / n, 1) if n else None
@@ -0,0 +1,128 @@
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import func
+from .extensions import db
+from .models import Catch
+
+# Response cache for agent chat replies. Keys are (user, data version,
+# normalized query); the data version changes whenever the user's catches
+# do, so stale advice is never served. An optional embedding tier matches
+# near-duplicate phrasings within the same user/version.
+
+
+def normalize_query(query):
+    query = re.sub(r"[^\w\s]", " ", query.lower())
+    return " ".join(query.split())
+
+
+def data_version(user_id):
+    """Cheap stamp of a user's catch data: (count, max id) in one query."""
+    if user_id is None:
+        return "anon"
+    count, max_id = (
+        db.session.query(func.count(Catch.id), func.max(Catch.id))
+        .filter(Catch.user_id == user_id)
+        .one()
+    )
+    return f"{count}:{max_id or 0}"
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    def __init__(self, max_entries=1000, ttl=3600, similarity_threshold=None, embed=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold
+        self._embed = embed
+        self._entries = OrderedDict()  # key -> (reply, expires_at, vector)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        self.max_entries = app.config.get("CHAT_CACHE_MAX_ENTRIES", self.max_entries)
+        self.ttl = app.config.get("CHAT_CACHE_TTL", self.ttl)
+        self.similarity_threshold = app.config.get(
+            "CHAT_CACHE_SIMILARITY_THRESHOLD", self.similarity_threshold
+        )
+
+    @property
+    def semantic(self):
+        return self.similarity_threshold is not None
+
+    def embed(self, text):
+        if self._embed is None:
+            from langchain_openai import OpenAIEmbeddings
+
+            self._embed = OpenAIEmbeddings().embed_query
+        return self._embed(text)
+
+    def get(self, user_id, version, query):
+        """Return (reply, vector). vector is the query embedding when the
+        semantic tier is on, so set() can reuse it after a miss."""
+        normalized = normalize_query(query)
+        key = (user_id, version, normalized)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[1] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], entry[2]
+            if entry:
+                del self._entries[key]
+
+        vector = None
+        if self.semantic:
+            vector = self.embed(normalized)
+            best, best_score = None, self.similarity_threshold
+            with self._lock:
+                for (uid, ver, _), (reply, expires_at, other) in self._entries.items():
+                    if uid != user_id or ver != version or other is None or expires_at <= now:
+                        continue
+                    score = _cosine(vector, other)
+                    if score >= best_score:
+                        best, best_score = reply, score
+                if best is not None:
+                    self.semantic_hits += 1
+                    return best, vector
+
+        with self._lock:
+            self.misses += 1
+        return None, vector
+
+    def set(self, user_id, version, query, reply, vector=None):
+        key = (user_id, version, normalize_query(query))
+        with self._lock:
+            self._entries[key] = (reply, time.monotonic() + self.ttl, vector)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.semantic_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "semantic_hits": self.semantic_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.semantic_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+
+chat_cache = ResponseCache()
@@ -0,0 +1,83 @@
+import json
+import queue
+import threading
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Server-sent events for /chat/stream. The agent runs in a background
+# thread (a greenlet under gunicorn's gevent workers) and pushes tokens and
+# tool events through a queue that the response generator drains.
+
+KEEPALIVE_SECONDS = 15
+_DONE = object()
+
+
+class ClientDisconnected(Exception):
+    """Raised inside the agent run to abort it once the client is gone."""
+
+
+class QueueCallbackHandler(BaseCallbackHandler):
+    raise_error = True  # let ClientDisconnected stop the AgentExecutor
+
+    def __init__(self, events, cancelled):
+        self.events = events
+        self.cancelled = cancelled
+
+    def _put(self, event, data):
+        if self.cancelled.is_set():
+            raise ClientDisconnected()
+        self.events.put((event, data))
+
+    def on_llm_new_token(self, token, **kwargs):
+        if token:
+            self._put("token", {"text": token})
+
+    def on_tool_start(self, serialized, input_str, **kwargs):
+        self._put("tool_start", {"tool": (serialized or {}).get("name"), "input": input_str})
+
+    def on_tool_end(self, output, **kwargs):
+        self._put("tool_end", {"output": str(output)})
+
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def stream_agent(app, executor, inputs, on_done=None):
+    """Yield SSE-formatted chunks while executor answers inputs.
+
+    on_done(reply) is called (inside the app context) with the final answer.
+    """
+    events = queue.Queue()
+    cancelled = threading.Event()
+    handler = QueueCallbackHandler(events, cancelled)
+
+    def run():
+        # Tools query the database, so the worker needs its own app context
+        with app.app_context():
+            try:
+                result = executor.invoke(inputs, config={"callbacks": [handler]})
+                if on_done:
+                    on_done(result["output"])
+                events.put(("done", {"reply": result["output"]}))
+            except ClientDisconnected:
+                pass
+            except Exception as e:
+                events.put(("error", {"reply": f"❌ Agent error: {str(e)}"}))
+            finally:
+                events.put(_DONE)
+
+    threading.Thread(target=run, daemon=True).start()
+
+    try:
+        while True:
+            try:
+                item = events.get(timeout=KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ": keep-alive\n\n"
+                continue
+            if item is _DONE:
+                return
+            yield sse(*item)
+    finally:
+        # Runs when the client disconnects and the generator is closed early
+        cancelled.set()
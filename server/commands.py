@@ -0,0 +1,167 @@
+import click
+from flask.cli import AppGroup
+
+
+def register_commands(app):
+    counters_cli = AppGroup("counters", help="Check or repair denormalized catch and unread counters.")
+
+    # flask --app server.app counters check
+    @counters_cli.command("check")
+    def check_counters():
+        from .counters import find_counter_drift, find_unread_drift
+
+        drift = find_counter_drift()
+        for d in drift:
+            click.echo(
+                f"catch {d['catch_id']}: likes {d['like_count']} != {d['actual_likes']}, "
+                f"comments {d['comment_count']} != {d['actual_comments']}"
+            )
+        click.echo(f"{len(drift)} catch(es) with counter drift")
+
+        unread_drift = find_unread_drift()
+        for d in unread_drift:
+            click.echo(f"user {d['user_id']}: unread {d['unread']} != {d['actual_unread']}")
+        click.echo(f"{len(unread_drift)} user(s) with unread counter drift")
+        if drift or unread_drift:
+            raise SystemExit(1)
+
+    # flask --app server.app counters repair
+    @counters_cli.command("repair")
+    def repair_counters_command():
+        from .counters import repair_counters, repair_unread_counters
+
+        fixed = repair_counters()
+        click.echo(f"Repaired counters on {fixed} catch(es)")
+        fixed = repair_unread_counters()
+        click.echo(f"Repaired unread counters on {fixed} user(s)")
+
+    app.cli.add_command(counters_cli)
+
+    stats_cli = AppGroup("catch-stats", help="Maintain the per-user catch_stats table.")
+
+    # flask --app server.app catch-stats rebuild
+    @stats_cli.command("rebuild")
+    def rebuild_catch_stats():
+        from .catch_stats import rebuild_all_stats
+
+        users = rebuild_all_stats()
+        click.echo(f"Rebuilt catch stats for {users} user(s)")
+
+    app.cli.add_command(stats_cli)
+
+    forecasts_cli = AppGroup("forecasts", help="Precompute monthly AI forecasts.")
+
+    # flask --app server.app forecasts precompute --workers 8
+    @forecasts_cli.command("precompute")
+    @click.option("--active-days", default=90, help="Only users with a catch in this window.")
+    @click.option("--workers", default=8, help="Concurrent LLM calls.")
+    def precompute_forecasts_command(active_days, workers):
+        from .forecasts import precompute_forecasts
+
+        written, failed = precompute_forecasts(active_days=active_days, max_workers=workers)
+        click.echo(f"Wrote {written} forecast(s), {failed} failed")
+
+    # flask --app server.app forecasts schedule (one process; runs until stopped)
+    @forecasts_cli.command("schedule")
+    @click.option("--interval", default=3600, help="Seconds between precompute runs.")
+    def schedule_forecasts_command(interval):
+        from flask import current_app
+        from .forecasts import run_scheduler
+
+        click.echo(f"Precomputing forecasts every {interval}s")
+        run_scheduler(current_app._get_current_object(), interval=interval)
+
+    app.cli.add_command(forecasts_cli)
+
+    timeline_cli = AppGroup("timeline", help="Maintain materialized following timelines.")
+
+    # flask --app server.app timeline rebuild
+    @timeline_cli.command("rebuild")
+    def rebuild_timelines():
+        from .timeline import timeline
+
+        entries = timeline.rebuild()
+        click.echo(f"Wrote {entries} timeline entries")
+
+    app.cli.add_command(timeline_cli)
+
+    tokens_cli = AppGroup("tokens", help="Revoked JWT bookkeeping.")
+
+    # flask --app server.app tokens prune
+    @tokens_cli.command("prune")
+    def prune_tokens():
+        """Delete revocations for tokens that have expired anyway."""
+        from .revocation import revocation_store
+
+        removed = revocation_store.prune()
+        click.echo(f"Pruned {removed} expired token revocation(s)")
+
+    app.cli.add_command(tokens_cli)
+
+    uploads_cli = AppGroup("uploads", help="Spooled catch image uploads.")
+
+    # flask --app server.app uploads retry
+    @uploads_cli.command("retry")
+    def retry_uploads():
+        """Re-upload images still spooled (pending or failed) after a restart."""
+        from .uploads import upload_pipeline, READY
+
+        results = [upload_pipeline.process(catch_id, path)
+                   for catch_id, path in upload_pipeline.spooled_catches()]
+        click.echo(f"Uploaded {results.count(READY)} image(s), "
+                   f"{len(results) - results.count(READY)} still failing")
+
+    app.cli.add_command(uploads_cli)
+
+    catches_cli = AppGroup("catches", help="Bulk catch maintenance.")
+
+    # flask --app server.app catches import logbook.csv --user-id 42
+    @catches_cli.command("import")
+    @click.argument("source", type=click.File("rb"))
+    @click.option("--user-id", type=int, required=True, help="Owner of the imported catches.")
+    @click.option("--format", "fmt", type=click.Choice(["csv", "jsonl"]), help="Defaults to the file extension.")
+    @click.option("--chunk-size", default=1000, help="Rows per insert/transaction.")
+    @click.option("--dry-run", is_flag=True, help="Validate only; write nothing.")
+    def import_catches_command(source, user_id, fmt, chunk_size, dry_run):
+        """Import catches from a CSV or JSONL logbook ("-" reads stdin)."""
+        from .extensions import db
+        from .imports import detect_format, import_catches, read_rows
+        from .models import User
+
+        user = db.session.get(User, user_id)
+        if not user:
+            raise click.ClickException(f"User {user_id} not found")
+        fmt = fmt or detect_format(source.name)
+        if not fmt:
+            raise click.ClickException("Can't tell the format from the file name; pass --format")
+
+        summary = import_catches(user, read_rows(source, fmt), chunk_size=chunk_size, dry_run=dry_run)
+        for error in summary["errors"]:
+            click.echo(f"row {error['row']}: {error['error']}", err=True)
+        if summary["errors_truncated"]:
+            click.echo("(further errors omitted)", err=True)
+        verb = "Validated" if dry_run else "Imported"
+        click.echo(f"{verb} {summary['inserted']} catch(es), {summary['failed']} rejected")
+
+    # flask --app server.app catches export -o catches.ndjson.gz --gzip
+    @catches_cli.command("export")
+    @click.option("-o", "--output", type=click.File("wb"), default="-", help="Defaults to stdout.")
+    @click.option("--user-id", type=int, help="Only this user's catches (default: everyone).")
+    @click.option("--format", "fmt", type=click.Choice(["ndjson", "csv"]), default="ndjson")
+    @click.option("--fields", help="Comma-separated columns (default: all).")
+    @click.option("--public-only", is_flag=True, help="Skip private catches.")
+    @click.option("--gzip", "compress", is_flag=True, help="Gzip the output.")
+    def export_catches_command(output, user_id, fmt, fields, public_only, compress):
+        """Stream catches as NDJSON or CSV with constant memory."""
+        from . import exports
+
+        try:
+            fields = exports.parse_fields(fields)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="--fields")
+
+        rows = exports.export_rows(fields, user_id=user_id, public_only=public_only)
+        for chunk in exports.encode(exports.render(rows, fields, fmt), compress=compress):
+            output.write(chunk)
+
+    app.cli.add_command(catches_cli)
@@ -0,0 +1,120 @@
+from sqlalchemy import func, select
+from .extensions import db
+from .models import Catch, Like, Comment, Notification, User
+
+
+def bump_catch_counter(catch_id, column, delta):
+    """Atomically adjust a denormalized counter on a catch.
+
+    Runs as a single UPDATE in the caller's transaction, so the counter
+    commits (or rolls back) together with the Like/Comment row change.
+    Returns False when the catch does not exist.
+    """
+    updated = (
+        Catch.query.filter(Catch.id == catch_id)
+        .update({column: column + delta}, synchronize_session=False)
+    )
+    return updated > 0
+
+
+def bump_unread(user_id, delta):
+    """Atomically adjust a user's unread notification counter (caller commits)."""
+    if delta:
+        User.query.filter(User.id == user_id).update(
+            {
+                User.unread_notifications: User.unread_notifications + delta,
+                # Private to the user; don't invalidate their public profile stamp
+                User.updated_at: User.updated_at,
+            },
+            synchronize_session=False,
+        )
+
+
+def _actual_counts():
+    likes = (
+        select(func.count(Like.id))
+        .where(Like.catch_id == Catch.id)
+        .correlate(Catch)
+        .scalar_subquery()
+    )
+    comments = (
+        select(func.count(Comment.id))
+        .where(Comment.catch_id == Catch.id)
+        .correlate(Catch)
+        .scalar_subquery()
+    )
+    return likes, comments
+
+
+def _drifted(likes, comments):
+    return (Catch.like_count != likes) | (Catch.comment_count != comments)
+
+
+def find_counter_drift():
+    """Return catches whose stored counters disagree with the real row counts."""
+    likes, comments = _actual_counts()
+    rows = (
+        db.session.query(
+            Catch.id,
+            Catch.like_count,
+            likes.label("actual_likes"),
+            Catch.comment_count,
+            comments.label("actual_comments"),
+        )
+        .filter(_drifted(likes, comments))
+        .all()
+    )
+    return [
+        {
+            "catch_id": r.id,
+            "like_count": r.like_count,
+            "actual_likes": r.actual_likes,
+            "comment_count": r.comment_count,
+            "actual_comments": r.actual_comments,
+        }
+        for r in rows
+    ]
+
+
+def repair_counters():
+    """Recompute drifted catches' counters from likes/comments. Returns rows fixed."""
+    likes, comments = _actual_counts()
+    fixed = Catch.query.filter(_drifted(likes, comments)).update(
+        {Catch.like_count: likes, Catch.comment_count: comments},
+        synchronize_session=False,
+    )
+    db.session.commit()
+    return fixed
+
+
+def _actual_unread():
+    return (
+        select(func.count(Notification.id))
+        .where(Notification.recipient_id == User.id, Notification.is_read == False)
+        .correlate(User)
+        .scalar_subquery()
+    )
+
+
+def find_unread_drift():
+    """Return users whose unread_notifications disagrees with their notifications."""
+    unread = _actual_unread()
+    rows = (
+        db.session.query(User.id, User.unread_notifications, unread.label("actual_unread"))
+        .filter(User.unread_notifications != unread)
+        .all()
+    )
+    return [
+        {"user_id": r.id, "unread": r.unread_notifications, "actual_unread": r.actual_unread}
+        for r in rows
+    ]
+
+
+def repair_unread_counters():
+    """Recompute drifted users' unread counters. Returns rows fixed."""
+    unread = _actual_unread()
+    fixed = User.query.filter(User.unread_notifications != unread).update(
+        {User.unread_notifications: unread}, synchronize_session=False
+    )
+    db.session.commit()
+    return fixed
@@ -0,0 +1,94 @@
+import threading
+import time
+from collections import OrderedDict
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from .extensions import db
+from .models import User
+
+# One place to turn a JWT identity into a user, plus a small TTL cache of
+# the public user fields (User.to_dict) that serializers embed.
+#
+# Tokens used to carry {"id", "username"} as the subject, while add_catch
+# treated it as a bare id; parse_identity accepts both. New tokens are
+# issued with the id as a string subject (see user_identity_loader in
+# routes/auth.py).
+
+
+def parse_identity(identity):
+    """User id from a JWT identity: {"id": ...}, an int, or a numeric string."""
+    if isinstance(identity, dict):
+        identity = identity.get("id")
+    try:
+        return int(identity) if identity is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def current_user_id():
+    """Authenticated user's id for this request (None for guests)."""
+    if "current_user_id" not in g:
+        g.current_user_id = parse_identity(get_jwt_identity())
+    return g.current_user_id
+
+
+def current_user():
+    """The authenticated User row, loaded at most once per request."""
+    if "current_user" not in g:
+        user_id = current_user_id()
+        g.current_user = db.session.get(User, user_id) if user_id is not None else None
+    return g.current_user
+
+
+class UserCache:
+    """TTL + LRU cache of User.to_dict() keyed by id. Treat values as read-only."""
+
+    def __init__(self, max_entries=5000, ttl=30):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # user_id -> (dict, expires_at)
+        self._lock = threading.Lock()
+
+    def init_app(self, app):
+        self.max_entries = app.config.get("USER_CACHE_MAX_ENTRIES", self.max_entries)
+        self.ttl = app.config.get("USER_CACHE_TTL", self.ttl)
+        self.clear()
+
+    def cards(self, user_ids):
+        """{user_id: User.to_dict()} for user_ids, loading misses in one query."""
+        now = time.monotonic()
+        found, missing = {}, set()
+        with self._lock:
+            for user_id in set(user_ids):
+                entry = self._entries.get(user_id)
+                if entry and entry[1] > now:
+                    self._entries.move_to_end(user_id)
+                    found[user_id] = entry[0]
+                elif user_id is not None:
+                    missing.add(user_id)
+
+        if missing:
+            loaded = {user.id: user.to_dict() for user in User.query.filter(User.id.in_(missing))}
+            expires_at = time.monotonic() + self.ttl
+            with self._lock:
+                for user_id, card in loaded.items():
+                    self._entries[user_id] = (card, expires_at)
+                    self._entries.move_to_end(user_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            found.update(loaded)
+        return found
+
+    def card(self, user_id):
+        return self.cards((user_id,)).get(user_id)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
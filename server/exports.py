@@ -0,0 +1,102 @@
+import csv
+import io
+import zlib
+import orjson
+from .extensions import db
+from .models import Catch
+
+# Streaming catch export (NDJSON or CSV). Rows come from a column-only
+# query with yield_per, which on Postgres runs through a server-side
+# cursor, so memory stays flat however many catches a user has. Output is
+# produced in batches of BATCH_SIZE rows and optionally gzip-compressed
+# on the fly.
+
+BATCH_SIZE = 1000
+FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+EXPORT_FIELDS = (
+    "id", "user_id", "species", "date_caught", "location",
+    "water_temp", "air_temp", "moon_phase", "tide",
+    "length", "weight", "wind_speed", "method", "bait_used",
+    "is_public", "like_count", "comment_count",
+    "image_url", "medium_url", "thumbnail_url",
+)
+
+
+def parse_fields(raw):
+    """Comma-separated field list -> tuple, in the order given; all fields if empty."""
+    if not raw:
+        return EXPORT_FIELDS
+    fields = tuple(dict.fromkeys(f.strip() for f in raw.split(",") if f.strip()))
+    unknown = [f for f in fields if f not in EXPORT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}")
+    return fields
+
+
+def export_rows(fields, user_id=None, public_only=False, batch_size=BATCH_SIZE):
+    """Yield row tuples for fields, oldest first."""
+    query = db.session.query(*(getattr(Catch, f) for f in fields))
+    if user_id is not None:
+        query = query.filter(Catch.user_id == user_id)
+    if public_only:
+        query = query.filter(Catch.is_public == True)
+    return query.order_by(Catch.date_caught, Catch.id).execution_options(yield_per=batch_size)
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _iso_dates(rows, index):
+    for row in rows:
+        row = list(row)
+        if row[index] is not None:
+            row[index] = row[index].isoformat()
+        yield row
+
+
+def render(rows, fields, fmt, batch_size=BATCH_SIZE):
+    """Yield UTF-8 chunks (one per batch of rows) in the given format."""
+    if fmt == "csv":
+        if "date_caught" in fields:
+            rows = _iso_dates(rows, fields.index("date_caught"))
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for batch in _batches(rows, batch_size):
+            writer.writerows(batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        # Header only when there were no rows
+        if buffer.tell():
+            yield buffer.getvalue().encode()
+        return
+
+    # orjson writes datetimes as ISO 8601 itself
+    for batch in _batches(rows, batch_size):
+        yield b"".join(
+            orjson.dumps(dict(zip(fields, row)), option=orjson.OPT_APPEND_NEWLINE) for row in batch
+        )
+
+
+def encode(chunks, compress=False):
+    """Pass chunks through, gzipping the stream when asked."""
+    if not compress:
+        yield from chunks
+        return
+
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31: gzip container
+    for chunk in chunks:
+        data = gzip.compress(chunk)
+        if data:
+            yield data
+    yield gzip.flush()
@@ -0,0 +1,127 @@
+import threading
+import time
+from collections import OrderedDict
+from sqlalchemy import func
+from .extensions import db
+from .models import Follower
+
+# Follower-graph cache. For each user it keeps the set of accounts they
+# follow (one query to load) and their follower count, in LRU maps with
+# a TTL. Follow/unfollow invalidate the two users involved in this
+# process; the TTL bounds how stale other gunicorn workers can be.
+#
+# is_following_many(viewer, user_ids) answers "which of these does the
+# viewer follow?" from the viewer's cached set, so feed pages and
+# profiles never need a per-row (or even per-page) follow query.
+
+
+class _LRU:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class FollowGraph:
+    def __init__(self, max_entries=10000, ttl=60):
+        self._following = _LRU(max_entries, ttl)       # user_id -> frozenset of followed ids
+        self._follower_counts = _LRU(max_entries, ttl)  # user_id -> int
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        max_entries = app.config.get("FOLLOW_CACHE_MAX_ENTRIES", 10000)
+        ttl = app.config.get("FOLLOW_CACHE_TTL", 60)
+        for cache in (self._following, self._follower_counts):
+            cache.max_entries, cache.ttl = max_entries, ttl
+            cache.clear()
+
+    def following_ids(self, user_id):
+        """frozenset of the ids user_id follows."""
+        cached = self._following.get(user_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        ids = frozenset(
+            following_id
+            for (following_id,) in db.session.query(Follower.following_id).filter(
+                Follower.follower_id == user_id
+            )
+        )
+        self._following.set(user_id, ids)
+        return ids
+
+    def is_following_many(self, viewer_id, user_ids):
+        """The subset of user_ids that viewer_id follows (empty for guests)."""
+        if not viewer_id:
+            return set()
+        return self.following_ids(viewer_id).intersection(user_ids)
+
+    def is_following(self, viewer_id, user_id):
+        return bool(self.is_following_many(viewer_id, (user_id,)))
+
+    def follower_count(self, user_id):
+        cached = self._follower_counts.get(user_id)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        count = (
+            db.session.query(func.count(Follower.id))
+            .filter(Follower.following_id == user_id)
+            .scalar()
+        )
+        self._follower_counts.set(user_id, count)
+        return count
+
+    def following_count(self, user_id):
+        return len(self.following_ids(user_id))
+
+    def invalidate(self, follower_id, following_id):
+        """Forget cached state for both ends of a follow/unfollow."""
+        self._following.pop(follower_id)
+        self._follower_counts.pop(following_id)
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "follow_sets": len(self._following),
+            "follower_counts": len(self._follower_counts),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+follow_graph = FollowGraph()
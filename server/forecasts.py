@@ -0,0 +1,113 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from openai import OpenAI
+from sqlalchemy.exc import IntegrityError
+from .extensions import db
+from .models import Catch, MonthlyForecast
+from . import analytics
+from .utils import with_retries
+
+client = OpenAI()
+
+FORECAST_MODEL = "gpt-4o-mini"
+
+
+def build_prompt(stats, month_name):
+    return f"""
+        Based on this user's historical fishing performance:
+
+        Month: {month_name}
+        Best species: {stats["species"]}
+        Best location: {stats["location"]}
+        Best bait: {stats["bait"]}
+        Best tide: {stats["tide"]}
+
+        Write a short, upbeat monthly fishing forecast (1–2 sentences).
+        Make it friendly, confident, and motivating.
+        """
+
+
+def generate_forecast_text(stats, month_name, attempts=1):
+    prompt = build_prompt(stats, month_name)
+
+    def call():
+        completion = client.chat.completions.create(
+            model=FORECAST_MODEL,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        return completion.choices[0].message.content
+
+    return with_retries(call, attempts=attempts)
+
+
+def active_user_ids(since):
+    return [
+        uid for (uid,) in
+        db.session.query(Catch.user_id).filter(Catch.date_caught >= since).distinct()
+    ]
+
+
+def precompute_forecasts(now=None, active_days=90, max_workers=8, attempts=3):
+    """Write this month's MonthlyForecast for every recently active user.
+
+    Stats for all users come from a handful of grouped queries; only the
+    LLM calls fan out, through a bounded thread pool with retry/backoff.
+    Users who already have a forecast for the month are skipped, so the
+    job is safe to re-run. Returns (written, failed) counts.
+    """
+    now = now or datetime.now()
+    month_name = now.strftime("%B")
+
+    user_ids = active_user_ids(now - timedelta(days=active_days))
+    done = {
+        uid for (uid,) in db.session.query(MonthlyForecast.user_id).filter_by(
+            month=now.month, year=now.year
+        )
+    }
+    pending = [uid for uid in user_ids if uid not in done]
+    stats_by_user = analytics.month_patterns_for_users(pending, now.month)
+
+    def generate(item):
+        user_id, stats = item
+        try:
+            return user_id, generate_forecast_text(stats, month_name, attempts=attempts)
+        except Exception:
+            return user_id, None
+
+    # Worker threads only talk to the LLM; all DB writes stay on this thread
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        results = list(pool.map(generate, stats_by_user.items()))
+
+    written = 0
+    for uid, text in results:
+        if not text:
+            continue
+        # A request may have generated this user's row meanwhile; the
+        # unique key rejects the duplicate and we keep theirs.
+        try:
+            with db.session.begin_nested():
+                db.session.add(MonthlyForecast(
+                    user_id=uid, month=now.month, year=now.year, forecast_text=text
+                ))
+            written += 1
+        except IntegrityError:
+            pass
+    db.session.commit()
+    return written, sum(1 for _, text in results if not text)
+
+
+def run_scheduler(app, interval=3600):
+    """Run precompute_forecasts every interval seconds, forever.
+
+    Blocks the calling process: run it as its own process (`flask forecasts
+    schedule`), never inside the web workers, which just read the cache it fills.
+    """
+    while True:
+        with app.app_context():
+            try:
+                precompute_forecasts()
+            except Exception as e:
+                db.session.rollback()
+                app.logger.exception("Forecast precompute failed: %s", e)
+        time.sleep(interval)
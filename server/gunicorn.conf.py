@@ -0,0 +1,27 @@
+import os
+
+# Gunicorn hooks for the Docker image: gunicorn -c server/gunicorn.conf.py ...
+# (worker settings stay on the command line in the Dockerfile)
+
+
+def when_ready(server):
+    # memory:// pub/sub is per process: with several workers an SSE client
+    # only hears notifications published by the worker it is connected to
+    url = os.getenv("PUBSUB_URL", "memory://")
+    if server.cfg.workers > 1 and not url.startswith("redis"):
+        server.log.warning(
+            "PUBSUB_URL=%s with %d workers: /notifications/stream misses events "
+            "from other workers; set PUBSUB_URL=redis://...",
+            url, server.cfg.workers,
+        )
+
+
+def post_fork(server, worker):
+    # psycopg2 is a C driver that gevent's monkey patching can't reach: without
+    # a wait callback every query blocks the worker's whole hub, i.e. all of
+    # its --worker-connections. psycogreen makes it yield while waiting.
+    if "gevent" in server.cfg.worker_class_str:
+        from psycogreen.gevent import patch_psycopg
+
+        patch_psycopg()
+        server.log.info("psycopg2 patched for gevent (worker %s)", worker.pid)
@@ -0,0 +1,277 @@
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, request, Response
+from sqlalchemy import func, select
+from werkzeug.http import is_resource_modified
+from .extensions import db
+from .follow_graph import follow_graph
+from .models import Catch, Comment, User
+
+logger = logging.getLogger(__name__)
+
+# Conditional GETs for read-heavy endpoints. Each cached view has a version
+# function that returns a cheap stamp of everything its response depends
+# on (updated_at columns, counts, max ids) in one small query. The stamp
+# becomes the ETag, so a matching If-None-Match gets a 304 before the view
+# runs at all. No Last-Modified is sent: stamps also move through counts
+# and ids with no timestamp changing, and HTTP dates only resolve to the
+# second, so If-Modified-Since could answer 304 for a changed resource.
+#
+# Optionally the rendered 200 bodies are kept too, keyed by URL and only
+# served while their ETag still matches the current stamp:
+#
+#   RESPONSE_CACHE_URL=             (default) ETags only, no body cache
+#   RESPONSE_CACHE_URL=memory://    per-process LRU
+#   RESPONSE_CACHE_URL=redis://...  shared by all workers (needs `redis`)
+#
+# Write routes call invalidate(kind, id) for the resources they touch,
+# which drops cached bodies early instead of waiting for the TTL.
+
+KEY_PREFIX = "fishing:http:"
+
+
+def make_etag(endpoint, stamp):
+    raw = repr((endpoint, stamp)).encode()
+    return hashlib.blake2b(raw, digest_size=10).hexdigest()
+
+
+class MemoryResponseStore:
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (entry, tags, expires_at)
+        self._tags = {}                # tag -> set of keys
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                return None
+            if item[2] <= time.monotonic():
+                self._drop(key)
+                return None
+            self._entries.move_to_end(key)
+            return item[0]
+
+    def set(self, key, entry, tags):
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = (entry, tags, time.monotonic() + self.ttl)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, tag):
+        with self._lock:
+            for key in self._tags.pop(tag, ()):
+                self._drop(key)
+
+    def _drop(self, key):
+        item = self._entries.pop(key, None)
+        if item is None:
+            return
+        for tag in item[1]:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class RedisResponseStore:
+    def __init__(self, url, ttl):
+        import redis
+
+        self.ttl = ttl
+        self._redis = redis.Redis.from_url(url)
+
+    def get(self, key):
+        raw = self._redis.get(KEY_PREFIX + key)
+        return json.loads(raw) if raw else None
+
+    def set(self, key, entry, tags):
+        pipe = self._redis.pipeline()
+        pipe.set(KEY_PREFIX + key, json.dumps(entry), ex=int(self.ttl))
+        for tag in tags:
+            pipe.sadd(KEY_PREFIX + "tag:" + tag, key)
+            pipe.expire(KEY_PREFIX + "tag:" + tag, int(self.ttl))
+        pipe.execute()
+
+    def invalidate(self, tag):
+        tag_key = KEY_PREFIX + "tag:" + tag
+        keys = self._redis.smembers(tag_key)
+        pipe = self._redis.pipeline()
+        for key in keys:
+            pipe.delete(KEY_PREFIX + key.decode())
+        pipe.delete(tag_key)
+        pipe.execute()
+
+    def __len__(self):
+        return 0  # not tracked; Redis owns the keyspace
+
+
+class HttpCache:
+    def __init__(self):
+        self.store = None
+        self.not_modified = 0
+        self.hits = 0
+        self.misses = 0
+
+    def init_app(self, app):
+        url = app.config.get("RESPONSE_CACHE_URL") or ""
+        ttl = app.config.get("RESPONSE_CACHE_TTL", 300)
+        if not url:
+            self.store = None
+        elif url.startswith("memory"):
+            self.store = MemoryResponseStore(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 2000), ttl)
+        elif url.startswith("redis"):
+            self.store = RedisResponseStore(url, ttl)
+        else:
+            raise ValueError(f"Unsupported RESPONSE_CACHE_URL: {url}")
+
+    def conditional(self, version, tags=None):
+        """Add ETag revalidation (and body caching) to a GET view.
+
+        version(**view_args) returns a tuple stamp of the response's inputs,
+        or None to run the view untouched (e.g. to let it 404). tags(**view_args)
+        lists the (kind, id) resources a cached body depends on, for invalidate().
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapped(**kwargs):
+                if request.method != "GET":
+                    return view(**kwargs)
+                stamp = version(**kwargs)
+                if stamp is None:
+                    return view(**kwargs)
+
+                etag = make_etag(request.endpoint, stamp)
+                if not is_resource_modified(request.environ, etag=etag):
+                    self.not_modified += 1
+                    return _validated(Response(status=304), etag)
+
+                key = request.full_path
+                if self.store is not None:
+                    try:
+                        entry = self.store.get(key)
+                    except Exception:
+                        logger.exception("Response cache read failed")
+                        entry = None
+                    if entry and entry["etag"] == etag:
+                        self.hits += 1
+                        response = Response(entry["body"], mimetype=entry["mimetype"])
+                        return _validated(response, etag)
+                    self.misses += 1
+
+                response = current_app.make_response(view(**kwargs))
+                if response.status_code != 200:
+                    return response
+                if self.store is not None and not response.is_streamed:
+                    entry = {
+                        "etag": etag,
+                        "mimetype": response.mimetype,
+                        "body": response.get_data(as_text=True),
+                    }
+                    try:
+                        names = [f"{kind}:{id}" for kind, id in tags(**kwargs)] if tags else []
+                        self.store.set(key, entry, names)
+                    except Exception:
+                        logger.exception("Response cache write failed")
+                return _validated(response, etag)
+
+            return wrapped
+
+        return decorator
+
+    def invalidate(self, kind, id):
+        """Drop cached bodies that depend on one resource, e.g. ("catch", 12)."""
+        if self.store is None or id is None:
+            return
+        try:
+            self.store.invalidate(f"{kind}:{id}")
+        except Exception:
+            logger.exception("Response cache invalidation failed")
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.store) if self.store is not None else 0,
+            "not_modified": self.not_modified,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
+
+
+def _validated(response, etag):
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate before reusing it
+    response.cache_control.no_cache = True
+    return response
+
+
+http_cache = HttpCache()
+
+
+# Version stamps. Each is one query; tuples may hold None for rows written
+# before updated_at existed, which simply stay stable until their next write.
+
+def catch_version(id):
+    row = (
+        db.session.query(Catch.updated_at, User.updated_at)
+        .outerjoin(User, User.id == Catch.user_id)
+        .filter(Catch.id == id)
+        .first()
+    )
+    return tuple(row) if row else None
+
+
+def comments_version(catch_id):
+    # Comments are never edited; their authors' cards can change
+    count, max_id, authors_updated = (
+        db.session.query(func.count(Comment.id), func.max(Comment.id), func.max(User.updated_at))
+        .select_from(Comment)
+        .outerjoin(User, User.id == Comment.user_id)
+        .filter(Comment.catch_id == catch_id)
+        .one()
+    )
+    return (count, max_id, authors_updated)
+
+
+def user_catches_version(user_id):
+    user_updated = select(User.updated_at).where(User.id == user_id).scalar_subquery()
+    row = (
+        db.session.query(
+            func.count(Catch.id), func.max(Catch.id), func.max(Catch.updated_at), user_updated
+        )
+        .filter(Catch.user_id == user_id)
+        .one()
+    )
+    return tuple(row)
+
+
+def profile_version(user_id):
+    catch_count = (
+        select(func.count(Catch.id)).where(Catch.user_id == user_id).scalar_subquery()
+    )
+    row = db.session.query(User.updated_at, catch_count).filter(User.id == user_id).first()
+    if row is None:
+        return None
+    viewer_id = request.args.get("viewer_id", type=int)
+    return (
+        row[0],
+        row[1],
+        follow_graph.follower_count(user_id),
+        follow_graph.following_count(user_id),
+        follow_graph.is_following(viewer_id, user_id),
+    )
@@ -0,0 +1,62 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image, ImageOps
+
+# CPU-bound half of the upload pipeline: decode a spooled photo once,
+# apply its EXIF orientation, then write a downscaled full-size image plus
+# medium and thumbnail variants with EXIF/XMP (GPS, camera serial) dropped;
+# only the ICC colour profile is carried over. Runs in worker processes so
+# resizing never competes with request threads for the GIL.
+
+# name -> longest edge in pixels; "full" uses IMAGE_MAX_EDGE
+VARIANT_EDGES = {"medium": 1080, "thumbnail": 320}
+
+FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg")}
+
+
+def _save(image, path, fmt, quality, icc_profile):
+    options = {"quality": quality}
+    if icc_profile:
+        options["icc_profile"] = icc_profile
+    if fmt == "JPEG":
+        options.update(optimize=True, progressive=True)
+    else:
+        options["method"] = 4
+    image.save(path, fmt, **options)
+
+
+def process_image(path, out_dir, max_edge=2048, fmt="webp", quality=82, variant_edges=None):
+    """Write the full/medium/thumbnail variants of path into out_dir.
+
+    Returns {variant name: output path}. Variants are produced largest
+    first, each downscaled from the previous one, so the expensive
+    resample from camera resolution happens once.
+    """
+    pil_format, ext = FORMATS[fmt]
+    edges = {"full": max_edge, **(variant_edges or VARIANT_EDGES)}
+
+    with Image.open(path) as source:
+        # Let the JPEG decoder skip straight to roughly the target scale
+        source.draft("RGB", (max_edge, max_edge))
+        icc_profile = source.info.get("icc_profile")
+        image = ImageOps.exif_transpose(source).convert("RGB")
+    # Metadata is only written when passed to save() explicitly
+    image.info = {}
+
+    outputs = {}
+    for name, edge in sorted(edges.items(), key=lambda item: item[1], reverse=True):
+        if max(image.size) > edge:
+            image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+        out_path = os.path.join(out_dir, name + ext)
+        _save(image, out_path, pil_format, quality, icc_profile)
+        outputs[name] = out_path
+    return outputs
+
+
+def image_pool(workers=None):
+    # spawn, not fork: the parent holds DB connections and worker threads
+    return ProcessPoolExecutor(
+        max_workers=workers or os.cpu_count(),
+        mp_context=multiprocessing.get_context("spawn"),
+    )
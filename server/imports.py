@@ -0,0 +1,159 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from itertools import islice
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+from .extensions import db
+from .models import Catch
+from .catch_stats import refresh_user_stats
+from .routes.progression import apply_catch_posts
+from .current_user import user_cache
+from .http_cache import http_cache
+
+logger = logging.getLogger(__name__)
+
+# Bulk logbook import: rows stream in from CSV or JSONL, are validated a
+# chunk at a time and inserted with one executemany per chunk, each chunk
+# in its own transaction together with that chunk's progression update.
+# catch_stats is rebuilt once at the end rather than per row.
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 500
+FORMATS = ("csv", "jsonl")
+
+FLOAT_FIELDS = ("water_temp", "air_temp", "length", "weight", "wind_speed")
+TEXT_FIELDS = ("species", "moon_phase", "tide", "method", "bait_used", "location", "image_url")
+REQUIRED_FIELDS = ("species", "date_caught")
+
+
+def detect_format(filename=None, content_type=None):
+    """Guess csv/jsonl from a filename or content type; None if unknown."""
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in ctype:
+        return "csv"
+    if name.endswith((".jsonl", ".ndjson")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "jsonl"
+    return None
+
+
+def read_rows(stream, fmt):
+    """Yield (row number, dict or ValueError) from a binary or text stream."""
+    if isinstance(stream, io.TextIOBase):
+        text = stream
+    else:
+        text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        for number, row in enumerate(csv.DictReader(text), start=1):
+            yield number, row
+        return
+
+    number = 0
+    for line in text:
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, ValueError(f"Invalid JSON: {e}")
+            continue
+        yield number, row if isinstance(row, dict) else ValueError("Expected a JSON object")
+
+
+def _parse_date(value):
+    if isinstance(value, str) and value.endswith("Z"):
+        value = value[:-1]
+    return datetime.fromisoformat(value)
+
+
+def _parse_bool(value):
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ("1", "true", "yes", "y")
+
+
+def validate_row(raw, user_id):
+    """Map one input row to Catch column values, or raise ValueError."""
+    if isinstance(raw, ValueError):
+        raise raw
+
+    # CSV gives "" for empty cells; treat them like missing keys
+    row = {k.strip(): v for k, v in raw.items() if k and v not in ("", None)}
+    missing = [field for field in REQUIRED_FIELDS if field not in row]
+    if missing:
+        raise ValueError(f"Missing {', '.join(missing)}")
+
+    values = {"user_id": user_id, "is_public": _parse_bool(row.get("is_public", False))}
+    for field in TEXT_FIELDS:
+        values[field] = str(row[field]).strip() if field in row else None
+    for field in FLOAT_FIELDS:
+        try:
+            values[field] = float(row[field]) if field in row else None
+        except (TypeError, ValueError):
+            raise ValueError(f"{field} must be a number, got {row[field]!r}")
+    try:
+        values["date_caught"] = _parse_date(row["date_caught"])
+    except (TypeError, ValueError):
+        raise ValueError(f"date_caught must be an ISO date, got {row['date_caught']!r}")
+    return values
+
+
+def import_catches(user, rows, chunk_size=CHUNK_SIZE, dry_run=False):
+    """Validate and bulk-insert (row number, row) pairs for user.
+
+    Returns a summary with inserted/failed counts and the first
+    MAX_REPORTED_ERRORS per-row errors. With dry_run nothing is written.
+    """
+    inserted, failed, errors = 0, 0, []
+
+    def reject(number, message):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"row": number, "error": message})
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+
+        valid = []
+        for number, raw in chunk:
+            try:
+                valid.append((number, validate_row(raw, user.id)))
+            except ValueError as e:
+                reject(number, str(e))
+        if not valid or dry_run:
+            inserted += len(valid)
+            continue
+
+        try:
+            db.session.execute(insert(Catch), [values for _, values in valid])
+            apply_catch_posts(user, len(valid))
+            db.session.commit()
+            inserted += len(valid)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            logger.warning("Import chunk for user %s failed: %s", user.id, e)
+            for number, _ in valid:
+                reject(number, "Database error while inserting this chunk")
+
+    if inserted and not dry_run:
+        refresh_user_stats(user.id)
+        db.session.commit()
+        user_cache.invalidate(user.id)
+        http_cache.invalidate("user", user.id)
+
+    return {
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "errors_truncated": failed > len(errors),
+        "dry_run": dry_run,
+    }
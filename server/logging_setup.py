@@ -0,0 +1,135 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import threading
+import time
+from datetime import datetime, timezone
+
+# App-wide logging: structured JSON lines written off the request path by a
+# QueueListener thread, per-module levels, and sampling/rate limits for
+# chatty debug output. Configured from the environment:
+#
+#   LOG_LEVEL=INFO                      root level for "server.*"
+#   LOG_LEVELS=server.routes.progression=DEBUG,server.agent=WARNING
+#   LOG_FORMAT=json | text
+#   LOG_DEBUG_SAMPLE_RATE=0.1           keep 10% of DEBUG records
+#   LOG_RATE_LIMIT=200                  max records/second per logger (0 = off)
+#
+# In production (FLASK_ENV=production) the default level is WARNING, which
+# gates off the diagnostic messages that used to be print() calls.
+
+_STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        # Anything passed via extra={...} becomes a top-level field
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                payload[key] = value
+        # QueueHandler pre-renders tracebacks into exc_text before enqueueing
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records at or below max_level."""
+
+    def __init__(self, rate, max_level=logging.DEBUG):
+        super().__init__()
+        self.rate = rate
+        self.max_level = max_level
+
+    def filter(self, record):
+        return record.levelno > self.max_level or random.random() < self.rate
+
+
+class RateLimitFilter(logging.Filter):
+    """Drop records beyond per_second per logger (warnings and up always pass)."""
+
+    def __init__(self, per_second):
+        super().__init__()
+        self.per_second = per_second
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        second = int(time.monotonic())
+        with self._lock:
+            window, count = self._windows.get(record.name, (second, 0))
+            if window != second:
+                window, count = second, 0
+            self._windows[record.name] = (window, count + 1)
+        return count < self.per_second
+
+
+def _parse_levels(spec):
+    levels = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, level = item.partition("=")
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+
+def _stop_listener():
+    """Flush queued records on interpreter exit."""
+    if _listener is not None and _listener._thread is not None:
+        _listener.stop()
+
+
+def configure_logging(app):
+    """Route the "server" logger tree (and app.logger) through a queue."""
+    global _listener
+
+    production = os.getenv("FLASK_ENV") == "production"
+    base_level = os.getenv("LOG_LEVEL", "WARNING" if production else "DEBUG").upper()
+
+    stream = logging.StreamHandler()
+    if os.getenv("LOG_FORMAT", "json" if production else "text") == "json":
+        stream.setFormatter(JsonFormatter())
+    else:
+        stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+
+    # Filters run on the request thread before enqueueing, so dropped
+    # records never cost a queue put
+    queue_handler = logging.handlers.QueueHandler(queue.SimpleQueue())
+    sample_rate = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "1"))
+    if sample_rate < 1:
+        queue_handler.addFilter(SamplingFilter(sample_rate))
+    rate_limit = int(os.getenv("LOG_RATE_LIMIT", "0"))
+    if rate_limit:
+        queue_handler.addFilter(RateLimitFilter(rate_limit))
+
+    # create_app() may run more than once per process (tests, CLI)
+    if _listener is None:
+        atexit.register(_stop_listener)
+    else:
+        _listener.stop()
+    _listener = logging.handlers.QueueListener(queue_handler.queue, stream, respect_handler_level=True)
+    _listener.start()
+
+    for name in {"server", app.logger.name}:
+        logger = logging.getLogger(name)
+        logger.handlers[:] = [queue_handler]
+        logger.setLevel(base_level)
+        logger.propagate = False
+
+    for name, level in _parse_levels(os.getenv("LOG_LEVELS", "")).items():
+        logging.getLogger(name).setLevel(level)
@@ -0,0 +1,39 @@
+"""add unread_notifications counter to users and notification keyset index
+
+Revision ID: 2d8e1a7f4b36
+Revises: 9c4f7b2e8a15
+Create Date: 2026-10-18 16:05:52.119842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8e1a7f4b36'
+down_revision = '9c4f7b2e8a15'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('unread_notifications', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing unread notifications
+    op.execute(
+        "UPDATE users SET unread_notifications = ("
+        "SELECT COUNT(*) FROM notifications "
+        "WHERE notifications.recipient_id = users.id AND notifications.is_read = false)"
+    )
+
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.create_index('idx_notifications_recipient_created', ['recipient_id', 'created_at', 'id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('notifications', schema=None) as batch_op:
+        batch_op.drop_index('idx_notifications_recipient_created')
+
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('unread_notifications')
@@ -0,0 +1,35 @@
+"""add like_count and comment_count counters to catches
+
+Revision ID: a3f1c9d2e7b4
+Revises: 20a383188cab
+Create Date: 2026-10-18 09:12:44.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3f1c9d2e7b4'
+down_revision = '20a383188cab'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('catches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('like_count', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('comment_count', sa.Integer(), server_default='0', nullable=False))
+
+    # Backfill from the existing likes/comments rows
+    op.execute(
+        "UPDATE catches SET "
+        "like_count = (SELECT COUNT(*) FROM likes WHERE likes.catch_id = catches.id), "
+        "comment_count = (SELECT COUNT(*) FROM comments WHERE comments.catch_id = catches.id)"
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('catches', schema=None) as batch_op:
+        batch_op.drop_column('comment_count')
+        batch_op.drop_column('like_count')
@@ -0,0 +1,34 @@
+"""dedupe monthly_forecasts and make (user_id, month, year) unique
+
+Revision ID: e5b2d48c9f13
+Revises: c71e08b5a2d9
+Create Date: 2026-10-18 11:20:05.902117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b2d48c9f13'
+down_revision = 'c71e08b5a2d9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Keep the earliest forecast for each user/month, drop racing duplicates
+    op.execute(
+        "DELETE FROM monthly_forecasts WHERE id NOT IN ("
+        "SELECT keep_id FROM ("
+        "SELECT MIN(id) AS keep_id FROM monthly_forecasts GROUP BY user_id, month, year"
+        ") AS keepers)"
+    )
+
+    with op.batch_alter_table('monthly_forecasts', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_monthly_forecasts_user_month_year', ['user_id', 'month', 'year'])
+
+
+def downgrade():
+    with op.batch_alter_table('monthly_forecasts', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_monthly_forecasts_user_month_year', type_='unique')
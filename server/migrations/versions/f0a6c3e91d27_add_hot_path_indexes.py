@@ -0,0 +1,62 @@
+"""add indexes for feed, profile, AI and social hot paths
+
+Revision ID: f0a6c3e91d27
+Revises: e5b2d48c9f13
+Create Date: 2026-10-18 12:02:51.660384
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f0a6c3e91d27'
+down_revision = 'e5b2d48c9f13'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop duplicate follow rows so the pair can become unique
+    op.execute(
+        "DELETE FROM followers WHERE id NOT IN ("
+        "SELECT keep_id FROM ("
+        "SELECT MIN(id) AS keep_id FROM followers GROUP BY follower_id, following_id"
+        ") AS keepers)"
+    )
+
+    with op.batch_alter_table('catches', schema=None) as batch_op:
+        batch_op.create_index(
+            'idx_catches_public_feed', ['date_caught', 'id'], unique=False,
+            postgresql_where=sa.text('is_public = true'),
+            sqlite_where=sa.text('is_public = 1'),
+        )
+        batch_op.create_index('idx_catches_user_date', ['user_id', 'date_caught', 'id'], unique=False)
+        batch_op.create_index('idx_catches_user_species', ['user_id', 'species'], unique=False)
+
+    with op.batch_alter_table('likes', schema=None) as batch_op:
+        batch_op.create_index('idx_likes_catch', ['catch_id'], unique=False)
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.create_index('idx_comments_catch_timestamp', ['catch_id', 'timestamp'], unique=False)
+
+    with op.batch_alter_table('followers', schema=None) as batch_op:
+        batch_op.create_unique_constraint('uq_followers_pair', ['follower_id', 'following_id'])
+        batch_op.create_index('idx_followers_following', ['following_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('followers', schema=None) as batch_op:
+        batch_op.drop_index('idx_followers_following')
+        batch_op.drop_constraint('uq_followers_pair', type_='unique')
+
+    with op.batch_alter_table('comments', schema=None) as batch_op:
+        batch_op.drop_index('idx_comments_catch_timestamp')
+
+    with op.batch_alter_table('likes', schema=None) as batch_op:
+        batch_op.drop_index('idx_likes_catch')
+
+    with op.batch_alter_table('catches', schema=None) as batch_op:
+        batch_op.drop_index('idx_catches_user_species')
+        batch_op.drop_index('idx_catches_user_date')
+        batch_op.drop_index('idx_catches_public_feed')
@@ -1,5 +1,4 @@
 from sqlalchemy import ForeignKey
-from sqlalchemy_serializer import SerializerMixin
 from datetime import datetime
 from .extensions import db, bcrypt
 
@@ -12,6 +11,10 @@ class User(db.Model):
     level = db.Column(db.Integer, default=1, nullable=False)
     prestige = db.Column(db.Integer, default=0, nullable=False)
     posts_toward_next_level = db.Column(db.Integer, default=0, nullable=False)
+    # Denormalized unread notification count, kept in sync wherever notifications are written
+    unread_notifications = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Version stamp for HTTP caching; bumped on every ORM or bulk UPDATE
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     catches = db.relationship('Catch', back_populates='user')
     likes = db.relationship('Like', back_populates='user', cascade='all, delete-orphan')
@@ -30,11 +33,14 @@ class User(db.Model):
         }
     
 
-class Catch(db.Model, SerializerMixin):
+class Catch(db.Model):
     __tablename__ = 'catches'
 
     id = db.Column(db.Integer, primary_key=True)
     image_url = db.Column(db.String)  # URL to cloud-stored image
+    medium_url = db.Column(db.String)  # ~1080px variant for detail views
+    thumbnail_url = db.Column(db.String)  # ~320px variant for grids and feed lists
+    image_status = db.Column(db.String(20), default="ready", server_default="ready", nullable=False)  # pending | ready | failed
     species = db.Column(db.String)
     date_caught = db.Column(db.DateTime, default=datetime.utcnow)
     water_temp = db.Column(db.Float)
@@ -48,17 +54,51 @@ class Catch(db.Model, SerializerMixin):
     bait_used = db.Column(db.String) 
     location = db.Column(db.String)
     is_public = db.Column(db.Boolean, default=False)
+    # Set once the catch is copied into its followers' timelines; public
+    # catches without it are merged into /timeline at read time
+    fanned_out = db.Column(db.Boolean, default=False, server_default=db.false(), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    # Denormalized counters, kept in sync by the like/unlike/comment routes
+    like_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    comment_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    # Version stamp for HTTP caching; bumped on every ORM or bulk UPDATE
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
 
     user = db.relationship('User', back_populates='catches')
     likes = db.relationship('Like', back_populates='catch', cascade='all, delete-orphan')
     comments = db.relationship('Comment', back_populates='catch', cascade='all, delete-orphan')
 
+    __table_args__ = (
+        # /feed: is_public = true ORDER BY date_caught DESC, id DESC
+        db.Index(
+            "idx_catches_public_feed", "date_caught", "id",
+            postgresql_where=db.text("is_public = true"),
+            sqlite_where=db.text("is_public = 1"),
+        ),
+        # profiles / exports: user_id = ? ORDER BY date_caught DESC
+        db.Index("idx_catches_user_date", "user_id", "date_caught", "id"),
+        # /timeline merge: followed authors' public catches that were not fanned out
+        db.Index(
+            "idx_catches_unfanned", "user_id", "date_caught", "id",
+            postgresql_where=db.text("is_public = true AND fanned_out = false"),
+            sqlite_where=db.text("is_public = 1 AND fanned_out = 0"),
+        ),
+        # AI summaries: user_id = ? AND species = ?
+        db.Index("idx_catches_user_species", "user_id", "species"),
+    )
+
     def to_dict(self):
+        # Author fields come from the user cache, not a lazy load per catch
+        from .current_user import user_cache
+
+        user = user_cache.card(self.user_id)
         return {
             "id": self.id,
             "owner_id": self.user_id,
             "image_url": self.image_url,
+            "medium_url": self.medium_url,
+            "thumbnail_url": self.thumbnail_url,
+            "image_status": self.image_status,
             "species": self.species,
             "date_caught": self.date_caught.isoformat(),
             "water_temp": self.water_temp,
@@ -73,10 +113,10 @@ class Catch(db.Model, SerializerMixin):
             "location": self.location,
             "is_public": self.is_public,
             "user_id": self.user_id,
-            "user_name": self.user.username if self.user else None,
-            "user_avatar": self.user.profile_photo if self.user else None,
-            "likes_count": len(self.likes),
-            "comments_count": len(self.comments)
+            "user_name": user["username"] if user else None,
+            "user_avatar": user["profile_photo"] if user else None,
+            "likes_count": self.like_count or 0,
+            "comments_count": self.comment_count or 0
         }
     
 class Like(db.Model):
@@ -89,7 +129,10 @@ class Like(db.Model):
     user = db.relationship('User', back_populates='likes')
     catch = db.relationship('Catch', back_populates='likes')
 
-    __table_args__ = (db.UniqueConstraint('user_id', 'catch_id', name='unique_user_catch_like'),)
+    __table_args__ = (
+        db.UniqueConstraint('user_id', 'catch_id', name='unique_user_catch_like'),
+        db.Index('idx_likes_catch', 'catch_id'),
+    )
 
 
 class Comment(db.Model):
@@ -104,12 +147,18 @@ class Comment(db.Model):
     user = db.relationship('User', back_populates='comments')
     catch = db.relationship('Catch', back_populates='comments')
 
+    __table_args__ = (
+        db.Index('idx_comments_catch_timestamp', 'catch_id', 'timestamp'),
+    )
+
     def to_dict(self):
+        from .current_user import user_cache
+
         return {
             "id": self.id,
             "content": self.content,
             "timestamp": self.timestamp.isoformat(),
-            "user": self.user.to_dict(),
+            "user": user_cache.card(self.user_id),
         }
     
 class Follower(db.Model):
@@ -118,6 +167,79 @@ class Follower(db.Model):
     follower_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
     following_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
 
+    __table_args__ = (
+        db.UniqueConstraint("follower_id", "following_id", name="uq_followers_pair"),
+        db.Index("idx_followers_following", "following_id"),
+    )
+
+
+class TimelineEntry(db.Model):
+    """A public catch materialized into a follower's home timeline.
+
+    date_caught is copied from the catch so a timeline page is a single
+    index range scan on (user_id, date_caught, catch_id).
+    """
+    __tablename__ = "timeline_entries"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)  # timeline owner
+    catch_id = db.Column(db.Integer, db.ForeignKey("catches.id"), nullable=False)
+    author_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    date_caught = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "catch_id", name="uq_timeline_entries_user_catch"),
+        db.Index("idx_timeline_entries_page", "user_id", "date_caught", "catch_id"),
+        # unfollow cleanup: user_id = ? AND author_id = ?
+        db.Index("idx_timeline_entries_author", "user_id", "author_id"),
+        db.Index("idx_timeline_entries_catch", "catch_id"),
+    )
+
+
+class RevokedToken(db.Model):
+    """A logged-out access token, kept until the token would have expired anyway."""
+    __tablename__ = "revoked_tokens"
+
+    id = db.Column(db.Integer, primary_key=True)
+    jti = db.Column(db.String(36), nullable=False, unique=True)
+    revoked_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        # incremental bloom sync: revoked_at >= ?
+        db.Index("idx_revoked_tokens_revoked_at", "revoked_at"),
+        # pruning: expires_at < now
+        db.Index("idx_revoked_tokens_expires_at", "expires_at"),
+    )
+
+
+class CatchStats(db.Model):
+    """Per-user, per-species running aggregates for the agent's catch tool.
+
+    species is lowercased; the "" row aggregates all of a user's catches.
+    """
+    __tablename__ = "catch_stats"
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    species = db.Column(db.String, nullable=False, default="")
+    catch_count = db.Column(db.Integer, nullable=False, default=0)
+    last_caught = db.Column(db.DateTime)
+    water_temp_sum = db.Column(db.Float, nullable=False, default=0)
+    water_temp_n = db.Column(db.Integer, nullable=False, default=0)
+    wind_speed_sum = db.Column(db.Float, nullable=False, default=0)
+    wind_speed_n = db.Column(db.Integer, nullable=False, default=0)
+    length_sum = db.Column(db.Float, nullable=False, default=0)
+    length_n = db.Column(db.Integer, nullable=False, default=0)
+    weight_sum = db.Column(db.Float, nullable=False, default=0)
+    weight_n = db.Column(db.Integer, nullable=False, default=0)
+    # {"bait_used": {"clam": 3, ...}, "tide": {...}, "location": {...}, "method": {...}}
+    value_counts = db.Column(db.JSON, nullable=False, default=dict)
+
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "species", name="uq_catch_stats_user_species"),
+    )
+
 
 class MonthlyForecast(db.Model):
     __tablename__ = "monthly_forecasts"   # NEW
@@ -129,6 +251,10 @@ class MonthlyForecast(db.Model):
     forecast_text = db.Column(db.Text, nullable=False) # NEW
     created_at = db.Column(db.DateTime, default=datetime.utcnow)  # NEW
 
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "month", "year", name="uq_monthly_forecasts_user_month_year"),
+    )
+
     # NEW: Useful for returning JSON
     def to_dict(self):
         return {
@@ -145,7 +271,8 @@ class Notification(db.Model):
 
     id = db.Column(db.Integer, primary_key=True)
     recipient_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)   # recipient
-    actor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True) # who did the action
+    actor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=True) # who did the action (latest, when coalesced)
+    actor_count = db.Column(db.Integer, default=1, server_default="1", nullable=False) # "12 people liked your catch"
     catch_id = db.Column(db.Integer, db.ForeignKey("catches.id"), nullable=True)
     type = db.Column(db.String(50), nullable=False)  # "like" | "comment"
     is_read = db.Column(db.Boolean, default=False)
@@ -160,6 +287,8 @@ class Notification(db.Model):
     __table_args__ = (
         db.Index("idx_notifications_user", "recipient_id"),
         db.Index("idx_notifications_unread", "recipient_id", "is_read"),
+        # /notifications keyset pages: recipient_id = ? ORDER BY created_at DESC, id DESC
+        db.Index("idx_notifications_recipient_created", "recipient_id", "created_at", "id"),
     )
 
     def to_dict(self):
@@ -169,8 +298,22 @@ class Notification(db.Model):
             "actor_id": self.actor_id,
             "actor_username": self.actor.username if self.actor else None,
             "actor_avatar_url": self.actor.profile_photo if self.actor else None,
+            "actor_count": self.actor_count,
             "catch_id": self.catch_id,
             "type": self.type,
             "is_read": self.is_read,
             "created_at": self.created_at.isoformat(),
-        }
\ No newline at end of file
+        }
+
+class NotificationActor(db.Model):
+    """A distinct actor counted into a coalesced like/comment notification."""
+    __tablename__ = "notification_actors"
+
+    id = db.Column(db.Integer, primary_key=True)
+    notification_id = db.Column(db.Integer, db.ForeignKey("notifications.id"), nullable=False)
+    actor_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+
+    __table_args__ = (
+        # one row per actor; also serves notification_id IN (...) lookups
+        db.UniqueConstraint("notification_id", "actor_id", name="uq_notification_actors_notification_actor"),
+    )
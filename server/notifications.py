@@ -0,0 +1,247 @@
+import atexit
+import logging
+import threading
+from datetime import datetime
+from sqlalchemy import insert
+from .chat_stream import KEEPALIVE_SECONDS, sse
+from .counters import bump_unread
+from .extensions import db
+from .models import Catch, Notification, NotificationActor, User
+from .pubsub import pubsub
+
+logger = logging.getLogger(__name__)
+
+# Write-behind queue for like/comment notifications. Routes enqueue an
+# event after their own commit and return; a background thread flushes
+# every NOTIFICATION_FLUSH_INTERVAL seconds (or once MAX_PENDING events
+# pile up) in one transaction per batch.
+#
+# Events coalesce per (type, catch): a burst of likes on one catch becomes
+# a single row with actor_count=12 and actor_id set to the latest actor.
+# If the catch owner still has an unread notification of the same type
+# for that catch, it is bumped in place instead of inserting a new row.
+# The actors behind each row are kept in notification_actors, so
+# actor_count is a count of distinct people: commenting five times, or
+# unliking and liking again, counts once across any number of flushes.
+# Only new rows add to the recipient's unread_notifications counter.
+# Delivery is best effort: a failed flush is logged and dropped.
+#
+# Written notifications and the recipients' new unread counts are then
+# published on the recipient's pub/sub channel, which GET
+# /notifications/stream relays to the app as server-sent events.
+
+COALESCED_TYPES = ("like", "comment")
+
+
+class PendingGroup:
+    """Actors waiting to be written for one (type, catch_id)."""
+
+    __slots__ = ("actors", "last_at")
+
+    def __init__(self, at):
+        self.actors = {}  # actor_id -> None, in order of latest activity
+        self.last_at = at
+
+    def add(self, actor_id, at):
+        # Re-adding moves a repeat actor to the end: dedup keeps latest order
+        self.actors.pop(actor_id, None)
+        self.actors[actor_id] = None
+        self.last_at = at
+
+
+class NotificationQueue:
+    def __init__(self):
+        self.app = None
+        self.flush_interval = 1.0
+        self.max_pending = 500
+        self._pending = {}   # (type, catch_id) -> PendingGroup, insertion ordered
+        self._events = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self.app = app
+        self.flush_interval = app.config.get("NOTIFICATION_FLUSH_INTERVAL", self.flush_interval)
+        self.max_pending = app.config.get("NOTIFICATION_MAX_PENDING", self.max_pending)
+        if self.flush_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="notification-flush", daemon=True)
+            self._thread.start()
+            atexit.register(self.flush)
+
+    def enqueue(self, type, catch_id, actor_id):
+        """Queue a notification for catch_id's owner; call after committing."""
+        if type not in COALESCED_TYPES:
+            raise ValueError(f"Unsupported notification type: {type}")
+        now = datetime.utcnow()
+        with self._lock:
+            group = self._pending.get((type, catch_id))
+            if group is None:
+                group = self._pending[(type, catch_id)] = PendingGroup(now)
+            group.add(actor_id, now)
+            self._events += 1
+            full = self._events >= self.max_pending
+        if self.flush_interval <= 0:
+            self.flush()
+        elif full:
+            self._wake.set()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write and publish everything pending; returns the number of rows touched."""
+        with self._lock:
+            batch, self._pending, self._events = self._pending, {}, 0
+        if not batch:
+            return 0
+        with self.app.app_context():
+            try:
+                written = self._write(batch)
+                db.session.commit()
+            except Exception:
+                db.session.rollback()
+                logger.exception("Dropped %d pending notification group(s)", len(batch))
+                return 0
+            publish_notifications(written)
+        return len(written)
+
+    def _write(self, batch):
+        catch_ids = {catch_id for _, catch_id in batch}
+        owners = dict(
+            db.session.query(Catch.id, Catch.user_id).filter(Catch.id.in_(catch_ids))
+        )
+
+        # Unread rows these events can fold into, newest per key
+        existing = {}
+        for row in (
+            Notification.query.filter(
+                Notification.catch_id.in_(catch_ids),
+                Notification.type.in_({type for type, _ in batch}),
+                Notification.is_read == False,
+            ).order_by(Notification.created_at, Notification.id)
+        ):
+            if owners.get(row.catch_id) == row.recipient_id:
+                existing[(row.type, row.catch_id)] = row
+
+        # Actors already counted into those rows
+        counted = {row.id: set() for row in existing.values()}
+        if counted:
+            for notification_id, actor_id in db.session.query(
+                NotificationActor.notification_id, NotificationActor.actor_id
+            ).filter(NotificationActor.notification_id.in_(list(counted))):
+                counted[notification_id].add(actor_id)
+
+        written, inserts, insert_actors, new_actors = [], [], [], []
+        # Oldest activity first, so ids follow created_at
+        for (type, catch_id), group in sorted(batch.items(), key=lambda item: item[1].last_at):
+            recipient_id = owners.get(catch_id)
+            # Catch deleted meanwhile, or the owner acting on their own catch
+            actors = [a for a in group.actors if a != recipient_id]
+            if recipient_id is None or not actors:
+                continue
+            latest = actors[-1]
+
+            row = existing.get((type, catch_id))
+            if row is not None:
+                fresh = [a for a in actors if a not in counted[row.id]]
+                counted[row.id].update(fresh)
+                new_actors.extend({"notification_id": row.id, "actor_id": a} for a in fresh)
+                row.actor_count += len(fresh)
+                row.actor_id = latest
+                row.created_at = group.last_at
+                written.append(_payload(row))
+                continue
+
+            inserts.append({
+                "recipient_id": recipient_id,
+                "actor_id": latest,
+                "actor_count": len(actors),
+                "catch_id": catch_id,
+                "type": type,
+                "is_read": False,
+                "created_at": group.last_at,
+            })
+            insert_actors.append(actors)
+
+        if inserts:
+            ids = db.session.execute(
+                insert(Notification).returning(Notification.id, sort_by_parameter_order=True),
+                inserts,
+            ).scalars().all()
+            written.extend(_payload(Notification(id=id, **values)) for id, values in zip(ids, inserts))
+            for id, actors in zip(ids, insert_actors):
+                new_actors.extend({"notification_id": id, "actor_id": a} for a in actors)
+
+            new_per_recipient = {}
+            for values in inserts:
+                recipient_id = values["recipient_id"]
+                new_per_recipient[recipient_id] = new_per_recipient.get(recipient_id, 0) + 1
+            # Sorted so concurrent flushes lock user rows in the same order
+            for recipient_id in sorted(new_per_recipient):
+                bump_unread(recipient_id, new_per_recipient[recipient_id])
+
+        if new_actors:
+            db.session.execute(insert(NotificationActor), new_actors)
+        return written
+
+
+notification_queue = NotificationQueue()
+
+
+def _payload(row):
+    return {
+        "id": row.id,
+        "recipient_id": row.recipient_id,
+        "type": row.type,
+        "catch_id": row.catch_id,
+        "actor_id": row.actor_id,
+        "actor_count": row.actor_count,
+        "is_read": row.is_read,
+        "created_at": row.created_at.isoformat(),
+    }
+
+
+def user_channel(user_id):
+    return f"notifications:{user_id}"
+
+
+def unread_counts(user_ids):
+    """{user_id: unread count} from the maintained per-user counters."""
+    counts = dict(
+        db.session.query(User.id, User.unread_notifications).filter(User.id.in_(user_ids))
+    )
+    return {user_id: counts.get(user_id, 0) for user_id in user_ids}
+
+
+def publish_unread_counts(user_ids):
+    for user_id, count in unread_counts(set(user_ids)).items():
+        pubsub.publish(user_channel(user_id), {"event": "unread_count", "data": {"count": count}})
+
+
+def publish_notifications(payloads):
+    for payload in payloads:
+        pubsub.publish(user_channel(payload["recipient_id"]), {"event": "notification", "data": payload})
+    if payloads:
+        publish_unread_counts(p["recipient_id"] for p in payloads)
+
+
+def stream_notifications(user_id):
+    """Yield SSE chunks for user_id: the current unread count, then pushes."""
+    # Subscribe before counting so nothing published in between is missed
+    subscription = pubsub.subscribe(user_channel(user_id))
+    try:
+        yield sse("unread_count", {"count": unread_counts([user_id])[user_id]})
+        # Hand the connection back to the pool; the stream may stay open for hours
+        db.session.close()
+        while True:
+            message = subscription.get(timeout=KEEPALIVE_SECONDS)
+            if message is None:
+                yield ": keep-alive\n\n"
+                continue
+            yield sse(message["event"], message["data"])
+    finally:
+        subscription.close()
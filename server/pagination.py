@@ -0,0 +1,51 @@
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def parse_limit(raw, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """Clamp a ?limit= query arg to 1..maximum, falling back to default."""
+    try:
+        limit = int(raw) if raw is not None else default
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(limit, maximum))
+
+
+def parse_cursor(raw):
+    """Parse a keyset cursor of the form "<iso timestamp>,<id>".
+
+    Returns (timestamp, id) or None when no cursor was given. Raises
+    ValueError for a malformed cursor so routes can answer with a 400.
+    """
+    if not raw:
+        return None
+    timestamp, _, row_id = raw.rpartition(",")
+    if not timestamp:
+        raise ValueError("Cursor must look like <timestamp>,<id>")
+    if timestamp.endswith("Z"):
+        timestamp = timestamp[:-1]
+    return datetime.fromisoformat(timestamp), int(row_id)
+
+
+def encode_cursor(timestamp, row_id):
+    return f"{timestamp.isoformat()},{row_id}"
+
+
+def keyset_before(query, ts_column, id_column, cursor):
+    """Restrict a query ordered by (ts desc, id desc) to rows after the cursor."""
+    if cursor is None:
+        return query
+    ts, row_id = cursor
+    return query.filter(
+        (ts_column < ts) | ((ts_column == ts) & (id_column < row_id))
+    )
+
+
+def next_cursor(rows, limit, ts_attr, id_attr="id"):
+    """Cursor for the page after rows, or None when this was the last page."""
+    if len(rows) < limit:
+        return None
+    last = rows[-1]
+    return encode_cursor(getattr(last, ts_attr), getattr(last, id_attr))
@@ -0,0 +1,138 @@
+import re
+import threading
+import time
+from collections import defaultdict, deque
+from flask import g, jsonify, has_request_context, request
+from sqlalchemy import event
+
+# Per-request SQL instrumentation: query count, DB time and the slowest
+# statements (normalized) for every request, reported as Server-Timing
+# headers, a rolling per-route summary at /debug/perf, and a warning log
+# for requests that cross PERF_QUERY_THRESHOLD (to surface new N+1s).
+
+WINDOW = 500          # samples kept per route
+SLOWEST_PER_REQUEST = 3
+
+_literals = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_in_lists = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)|\(\s*%\([^)]+\)s(?:\s*,\s*%\([^)]+\)s)+\s*\)")
+_whitespace = re.compile(r"\s+")
+
+
+def normalize_sql(statement):
+    """Collapse literals, IN-lists and whitespace so equal shapes group together."""
+    sql = _literals.sub("?", statement)
+    sql = _in_lists.sub("(?, ...)", sql)
+    return _whitespace.sub(" ", sql).strip()
+
+
+class RouteStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples = defaultdict(lambda: deque(maxlen=WINDOW))  # route -> (ms, queries, db_ms)
+        self._slow = defaultdict(lambda: deque(maxlen=20))         # route -> (ms, sql)
+
+    def record(self, route, duration_ms, queries, db_ms, slowest):
+        with self._lock:
+            self._samples[route].append((duration_ms, queries, db_ms))
+            self._slow[route].extend(slowest)
+
+    def snapshot(self):
+        def pct(values, p):
+            values = sorted(values)
+            return round(values[min(len(values) - 1, int(p / 100 * len(values)))], 2)
+
+        with self._lock:
+            routes = {}
+            for route, samples in self._samples.items():
+                durations = [s[0] for s in samples]
+                queries = [s[1] for s in samples]
+                routes[route] = {
+                    "requests": len(samples),
+                    "p50_ms": pct(durations, 50),
+                    "p95_ms": pct(durations, 95),
+                    "p99_ms": pct(durations, 99),
+                    "avg_queries": round(sum(queries) / len(queries), 1),
+                    "max_queries": max(queries),
+                    "avg_db_ms": round(sum(s[2] for s in samples) / len(samples), 2),
+                    "slowest_statements": [
+                        {"ms": round(ms, 2), "sql": sql}
+                        for ms, sql in sorted(self._slow[route], reverse=True)[:5]
+                    ],
+                }
+            return routes
+
+
+route_stats = RouteStats()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if has_request_context():
+        conn.info.setdefault("perf_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get("perf_started")
+    if not started or not has_request_context():
+        return
+    elapsed = (time.perf_counter() - started.pop()) * 1000
+    perf = g.get("perf")
+    if perf is None:
+        return
+    perf["queries"] += 1
+    perf["db_ms"] += elapsed
+    perf["statements"].append((elapsed, statement))
+
+
+def init_app(app):
+    app.config.setdefault("PERF_QUERY_THRESHOLD", 20)
+    app.config.setdefault("PERF_DEBUG_ENDPOINT", False)
+
+    with app.app_context():
+        from .extensions import db
+
+        event.listen(db.engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor_execute)
+
+    @app.before_request
+    def start_perf():
+        g.perf = {"started": time.perf_counter(), "queries": 0, "db_ms": 0.0, "statements": []}
+
+    @app.after_request
+    def finish_perf(response):
+        perf = g.pop("perf", None)
+        if perf is None:
+            return response
+
+        total_ms = (time.perf_counter() - perf["started"]) * 1000
+        route = f"{request.method} {request.url_rule.rule if request.url_rule else '<unmatched>'}"
+        slowest = [
+            (ms, normalize_sql(sql))
+            for ms, sql in sorted(perf["statements"], key=lambda s: s[0], reverse=True)[:SLOWEST_PER_REQUEST]
+        ]
+        route_stats.record(route, total_ms, perf["queries"], perf["db_ms"], slowest)
+
+        response.headers.add(
+            "Server-Timing",
+            f'db;dur={perf["db_ms"]:.1f};desc="{perf["queries"]} queries", app;dur={total_ms:.1f}',
+        )
+
+        threshold = app.config["PERF_QUERY_THRESHOLD"]
+        if threshold and perf["queries"] > threshold:
+            app.logger.warning(
+                "%s ran %d queries (threshold %d) in %.1fms; slowest: %s",
+                route, perf["queries"], threshold, total_ms,
+                slowest[0][1][:200] if slowest else "-",
+            )
+        return response
+
+    if app.config["PERF_DEBUG_ENDPOINT"]:
+        @app.route("/debug/perf", methods=["GET"])
+        def debug_perf():
+            from .chat_cache import chat_cache
+            from .follow_graph import follow_graph
+
+            return jsonify({
+                "routes": route_stats.snapshot(),
+                "chat_cache": chat_cache.stats(),
+                "follow_graph": follow_graph.stats(),
+            }), 200
@@ -0,0 +1,135 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Minimal pub/sub for pushing events to open SSE connections. Subscribers
+# always read from in-process queues; the backend decides how a publish
+# reaches them:
+#
+#   PUBSUB_URL=memory://           (default) this process only; fine for a
+#                                  single worker and for tests
+#   PUBSUB_URL=redis://host:6379/0 publishes go through Redis and one
+#                                  listener thread per worker fans them out,
+#                                  so every gunicorn worker sees every event
+#                                  (needs the optional `redis` package)
+#
+# Messages are JSON-serializable dicts. Delivery is best effort: a
+# subscriber that falls more than QUEUE_SIZE messages behind loses the
+# newest ones rather than blocking publishers.
+
+QUEUE_SIZE = 100
+CHANNEL_PREFIX = "fishing:"
+
+
+class Subscription:
+    def __init__(self, hub, channel):
+        self.hub = hub
+        self.channel = channel
+        self.queue = queue.Queue(maxsize=QUEUE_SIZE)
+
+    def get(self, timeout=None):
+        """Next message, or None after timeout seconds."""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.hub.unsubscribe(self)
+
+
+class LocalPubSub:
+    """In-process fan-out; also the local half of the Redis backend."""
+
+    def __init__(self):
+        self._subscribers = {}  # channel -> set of Subscription
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(self, channel)
+        with self._lock:
+            self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, message):
+        self.deliver(channel, message)
+
+    def deliver(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            try:
+                subscription.queue.put_nowait(message)
+            except queue.Full:
+                logger.debug("Dropping message for slow subscriber on %s", channel)
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+class RedisPubSub(LocalPubSub):
+    """Publish through Redis; a single listener thread delivers locally."""
+
+    def __init__(self, url):
+        super().__init__()
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self._listener = threading.Thread(target=self._listen, name="pubsub-redis", daemon=True)
+        self._listener.start()
+
+    def publish(self, channel, message):
+        self._redis.publish(CHANNEL_PREFIX + channel, json.dumps(message))
+
+    def _listen(self):
+        while True:
+            try:
+                pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+                pubsub.psubscribe(CHANNEL_PREFIX + "*")
+                for item in pubsub.listen():
+                    channel = item["channel"].decode()[len(CHANNEL_PREFIX):]
+                    self.deliver(channel, json.loads(item["data"]))
+            except Exception:
+                logger.exception("Redis pub/sub listener failed; reconnecting")
+                time.sleep(1)
+
+
+class PubSub:
+    """Extension-style holder so modules can import a single instance."""
+
+    def __init__(self):
+        self.backend = LocalPubSub()
+
+    def init_app(self, app):
+        url = app.config.get("PUBSUB_URL", "memory://")
+        if url.startswith("redis"):
+            self.backend = RedisPubSub(url)
+        elif url.startswith("memory"):
+            self.backend = LocalPubSub()
+        else:
+            raise ValueError(f"Unsupported PUBSUB_URL: {url}")
+
+    def publish(self, channel, message):
+        try:
+            self.backend.publish(channel, message)
+        except Exception:
+            logger.exception("Publish to %s failed", channel)
+
+    def subscribe(self, channel):
+        return self.backend.subscribe(channel)
+
+
+pubsub = PubSub()
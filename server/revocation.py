@@ -0,0 +1,167 @@
+import logging
+import math
+import threading
+import time
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+from .extensions import db
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+# Shared JWT revocation. Logouts are written to revoked_tokens, so every
+# gunicorn worker sees them. Rows are pruned (at most once per rebuild
+# interval, on logout, or with `flask tokens prune`) once the token's own
+# exp has passed, since an expired token is rejected anyway.
+#
+# Each worker keeps a bloom filter of the revoked jtis. A token that is not
+# in the filter (nearly all of them) is accepted without touching the
+# database; a filter hit is confirmed with one indexed lookup. The filter
+# picks up other workers' logouts every TOKEN_REVOCATION_SYNC_INTERVAL
+# seconds, which bounds how long a revoked token can still work elsewhere,
+# and is rebuilt from unexpired rows every TOKEN_BLOOM_REBUILD_INTERVAL
+# seconds so expired entries drop out.
+
+# Incremental syncs re-read this far back, covering clock skew between
+# workers and logouts that committed after a sync started
+SYNC_OVERLAP = timedelta(seconds=60)
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = capacity
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # The filter never leaves this process, so the (per-process salted)
+        # built-in str hash is enough; its two halves seed double hashing
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        h = hash(key) & 0xFFFFFFFFFFFFFFFF
+        h1, h2 = h & 0xFFFFFFFF, (h >> 32) | 1
+        bits, size = self.bits, self.size
+        # Stops at the first clear bit, usually the first one probed
+        for i in range(self.hashes):
+            pos = (h1 + i * h2) % size
+            if not bits[pos >> 3] & (1 << (pos & 7)):
+                return False
+        return True
+
+
+class RevocationStore:
+    def __init__(self):
+        self.sync_interval = 5.0
+        self.rebuild_interval = 3600.0
+        self.capacity = 100000
+        self.error_rate = 0.001
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self._synced_through = None  # revoked_at cutoff of the last sync
+        self._next_sync = 0.0
+        self._next_rebuild = 0.0
+        self._next_prune = 0.0
+        self._sync_lock = threading.Lock()
+        self._add_lock = threading.Lock()
+
+    def init_app(self, app):
+        self.sync_interval = app.config.get("TOKEN_REVOCATION_SYNC_INTERVAL", self.sync_interval)
+        self.rebuild_interval = app.config.get("TOKEN_BLOOM_REBUILD_INTERVAL", self.rebuild_interval)
+        self.capacity = app.config.get("TOKEN_BLOOM_CAPACITY", self.capacity)
+        self.error_rate = app.config.get("TOKEN_BLOOM_ERROR_RATE", self.error_rate)
+        self._bloom = BloomFilter(self.capacity, self.error_rate)
+        self._synced_through = None
+        self._next_sync = self._next_rebuild = self._next_prune = 0.0
+
+    def revoke(self, jti, expires_at):
+        """Persist a revocation; expires_at is the token's exp as naive UTC."""
+        db.session.add(RevokedToken(jti=jti, expires_at=expires_at))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()  # already revoked
+        self._add(jti)
+
+        now = time.monotonic()
+        if now >= self._next_prune:
+            self._next_prune = now + self.rebuild_interval
+            self.prune()
+
+    def is_revoked(self, jti):
+        if not jti:
+            return False
+        self._maybe_sync()
+        if jti not in self._bloom:
+            return False
+        return db.session.query(
+            RevokedToken.query.filter_by(jti=jti).exists()
+        ).scalar()
+
+    def _add(self, jti):
+        with self._add_lock:
+            self._bloom.add(jti)
+            full = self._bloom.count > self._bloom.capacity
+        if full:
+            self._next_rebuild = 0.0
+
+    def _maybe_sync(self):
+        now = time.monotonic()
+        if now < self._next_sync or not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            if now >= self._next_rebuild:
+                self.rebuild()
+                self._next_rebuild = now + self.rebuild_interval
+            else:
+                self.sync()
+        except Exception:
+            # Keep serving from the current filter; retry next interval
+            logger.exception("Token revocation sync failed")
+        finally:
+            self._next_sync = now + self.sync_interval
+            self._sync_lock.release()
+
+    def sync(self):
+        """Add revocations made since the last sync (by any worker)."""
+        started = datetime.utcnow()
+        query = db.session.query(RevokedToken.jti)
+        if self._synced_through is not None:
+            query = query.filter(RevokedToken.revoked_at >= self._synced_through - SYNC_OVERLAP)
+        for (jti,) in query:
+            if jti not in self._bloom:  # the overlap re-reads recent rows
+                self._add(jti)
+        self._synced_through = started
+
+    def rebuild(self):
+        """Replace the filter with one holding only unexpired revocations."""
+        started = datetime.utcnow()
+        jtis = [
+            jti for (jti,) in db.session.query(RevokedToken.jti).filter(RevokedToken.expires_at > started)
+        ]
+        bloom = BloomFilter(max(self.capacity, 2 * len(jtis)), self.error_rate)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._add_lock:
+            self._bloom = bloom
+        self._synced_through = started
+        return len(jtis)
+
+    def prune(self):
+        """Delete revocations whose tokens have expired; returns rows removed."""
+        removed = RevokedToken.query.filter(
+            RevokedToken.expires_at <= datetime.utcnow()
+        ).delete(synchronize_session=False)
+        db.session.commit()
+        return removed
+
+
+revocation_store = RevocationStore()
@@ -1,13 +1,19 @@
-from flask import request, jsonify
-from ..agent import agent_executor
-from collections import Counter
+import logging
+from flask import request, jsonify, Response, current_app
+from flask_jwt_extended import jwt_required
+from ..agent import build_agent_executor
+from ..chat_stream import stream_agent, sse
+from ..chat_cache import chat_cache, data_version
 from datetime import datetime
-from ..models import Catch
-from openai import OpenAI
+from .. import analytics
+from ..forecasts import generate_forecast_text
+from sqlalchemy.exc import IntegrityError
 from ..extensions import db
 from ..models import MonthlyForecast
+from ..singleflight import flight
+from ..current_user import current_user_id
 
-client = OpenAI()
+logger = logging.getLogger(__name__)
 
 def register_routes(app):
     @app.route("/ai/conditions_summary", methods=["POST"])
@@ -16,42 +22,27 @@ def register_routes(app):
         user_id = data.get("user_id")
         species = data.get("species")  # optional
 
-        insights = get_conditions_summary(user_id, species)
+        insights = flight.do(
+            ("summary", user_id, species),
+            lambda: get_conditions_summary(user_id, species),
+        )
         return jsonify(insights)
     
     def get_conditions_summary(user_id, species=None):
-        # 1. Load user catch data (filtered by species if provided)
-        if species:
-            catches = Catch.query.filter_by(user_id=user_id, species=species).all()
-        else:
-            catches = Catch.query.filter_by(user_id=user_id).all()
+        # 1-3. Aggregate tide/bait/time/spot patterns in SQL
+        patterns = analytics.conditions_summary(user_id, species)
 
-        if not catches:
+        if not patterns:
             return {
                 "species": species,
                 "error": "No catch data available.",
                 "summary_text": "No catches logged yet for this species."
             }
 
-        # 2. Extract attributes
-        tides = [c.tide for c in catches if c.tide]
-        baits = [c.bait_used for c in catches if c.bait_used]
-        spots = [c.location for c in catches if c.location]
-
-        # Derive time-of-day categories (morning, afternoon, night)
-        def categorize_time(dt):
-            hour = dt.hour
-            if 5 <= hour <= 11: return "morning"
-            if 12 <= hour <= 17: return "afternoon"
-            return "night"
-
-        times = [categorize_time(c.date_caught) for c in catches if c.date_caught]
-
-        # 3. Compute best patterns
-        best_tide = Counter(tides).most_common(1)[0][0] if tides else None
-        best_bait = Counter(baits).most_common(1)[0][0] if baits else None
-        best_time = Counter(times).most_common(1)[0][0] if times else None
-        best_spot = Counter(spots).most_common(1)[0][0] if spots else None
+        best_tide = patterns["best_tide"]
+        best_bait = patterns["best_bait"]
+        best_time = patterns["best_time"]
+        best_spot = patterns["best_spot"]
 
         # 4. Generate natural language summary
         sp = species if species else "your catches"
@@ -77,8 +68,8 @@ def register_routes(app):
 
     @app.route("/ai/monthly_forecast", methods=["GET"])
     def monthly_forecast():
-        user_id = request.args.get("user_id")
-        print("MONTHLY FORECAST user_id =", user_id)
+        user_id = request.args.get("user_id", type=int)
+        logger.debug("monthly_forecast user_id=%s", user_id)
 
         if not user_id:
             return jsonify({"error": "Missing user_id"}), 400
@@ -97,119 +88,143 @@ def register_routes(app):
         ).first()
 
         if cached:
-            print("Returning CACHED monthly forecast")
+            logger.debug("Returning cached monthly forecast for user %s", user_id)
             return jsonify({
                 "forecast_text": cached.forecast_text,
                 "cached": True
             })
 
-        # Step 2 — Generate stats (your existing logic)
-        stats = generate_monthly_forecast(user_id)
-        print("STATS =", stats)
+        # Step 2-4 — Generate once per (user, month) in this process:
+        # concurrent requests share the leader's result. A leader in another
+        # worker may race it; the unique key keeps whichever row lands first.
+        try:
+            result = flight.do(
+                ("forecast", user_id, month, year),
+                lambda: build_forecast(user_id, now),
+            )
+        except Exception as e:
+            db.session.rollback()
+            return jsonify({"error": f"OpenAI error: {str(e)}"}), 500
 
-        if isinstance(stats, str):  # Not enough data
-            return jsonify({"forecast_text": stats})
+        return jsonify(result)
 
-        top_species = stats["species"]
-        top_location = stats["location"]
-        top_bait = stats["bait"]
-        top_tide = stats["tide"]
+    def build_forecast(user_id, now):
+        month, year = now.month, now.year
 
-        month_name = now.strftime("%B")
+        cached = MonthlyForecast.query.filter_by(
+            user_id=user_id, month=month, year=year
+        ).first()
+        if cached:
+            return {"forecast_text": cached.forecast_text, "cached": True}
 
-        # Build LLM prompt
-        prompt = f"""
-        Based on this user's historical fishing performance:
+        # Step 2 — Generate stats (your existing logic)
+        stats = generate_monthly_forecast(user_id)
+        logger.debug("Monthly forecast stats for user %s: %s", user_id, stats)
 
-        Month: {month_name}
-        Best species: {top_species}
-        Best location: {top_location}
-        Best bait: {top_bait}
-        Best tide: {top_tide}
+        # The LLM call takes seconds: don't hold a transaction and a pooled
+        # connection open across it
+        db.session.close()
 
-        Write a short, upbeat monthly fishing forecast (1–2 sentences).
-        Make it friendly, confident, and motivating.
-        """
+        if isinstance(stats, str):  # Not enough data
+            return {"forecast_text": stats}
 
-        # Step 3 — LLM call
-        try:
-            completion = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "user", "content": prompt}]
-            )
+        month_name = now.strftime("%B")
 
-            forecast_text = completion.choices[0].message.content
+        # Step 3 — LLM call (same prompt the precompute job uses)
+        forecast_text = generate_forecast_text(stats, month_name)
 
-        # -----------------------------------------------
-            # 🔵 NEW: Step 4 — Save cache entry
-        # -----------------------------------------------
-            new_entry = MonthlyForecast(
-                user_id=user_id,
-                month=month,
-                year=year,
-                forecast_text=forecast_text
-            )
-            db.session.add(new_entry)
+        # Step 4 — Save cache entry; the unique key rejects a racing duplicate
+        db.session.add(MonthlyForecast(
+            user_id=user_id,
+            month=month,
+            year=year,
+            forecast_text=forecast_text
+        ))
+        try:
             db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            winner = MonthlyForecast.query.filter_by(
+                user_id=user_id, month=month, year=year
+            ).first()
+            return {"forecast_text": winner.forecast_text, "cached": True}
 
-            return jsonify({
-                "forecast_text": forecast_text,
-                "cached": False,
-                "raw_stats": stats
-            })
-
-        except Exception as e:
-            return jsonify({"error": f"OpenAI error: {str(e)}"}), 500
-        
+        return {
+            "forecast_text": forecast_text,
+            "cached": False,
+            "raw_stats": stats
+        }
 
     def generate_monthly_forecast(user_id):
-        print("FETCHING CATCHES FOR USER:", user_id)
-        catches = Catch.query.filter_by(user_id=user_id).all()
-        print("CATCHES FOUND:", catches)
-
-        # 🔹 Debug: log each catch with its month
-        for c in catches:
-            print(f"CATCH: {c.species} | {c.date_caught} | month={c.date_caught.month}")
-
         this_month = datetime.now().month
 
-        # 🔥 NEW: Use ALL catches from this same month across any year
-        month_data = [c for c in catches if c.date_caught.month == this_month]
+        # Use ALL catches from this same month across any year, grouped in SQL
+        stats = analytics.month_patterns(user_id, this_month)
 
-        if not month_data:
+        if not stats:
             return "Not enough data for a forecast."
 
-        from collections import Counter
-        species = Counter([c.species for c in month_data])
-        location = Counter([c.location for c in month_data])
-        bait = Counter([c.bait_used for c in month_data])
-        tide = Counter([c.tide for c in month_data])
-
-        top_species = species.most_common(1)[0][0]
-        top_location = location.most_common(1)[0][0]
-        top_bait = bait.most_common(1)[0][0]
-        top_tide = tide.most_common(1)[0][0]
-
-        return {
-            "species": top_species,
-            "location": top_location,
-            "bait": top_bait,
-            "tide": top_tide
-        }
+        return stats
 
 
 
 
     @app.route("/chat", methods=["POST"])
+    @jwt_required(optional=True)
     def chat():
         data = request.get_json()
         query = data.get("message", "")
 
+        # Tools only read the signed-in user's catches; guests get no catch tool
+        user_id = current_user_id()
+
         if not query:
             return jsonify({"reply": "⚠️ No input received."}), 400
 
         try:
-            response = agent_executor.invoke({"query": query})
+            # Repeat questions against unchanged catch data skip the agent
+            version = data_version(user_id)
+            cached, vector = chat_cache.get(user_id, version, query)
+            if cached is not None:
+                return jsonify({"reply": cached, "cached": True})
+
+            response = build_agent_executor(user_id).invoke({"query": query})
+            chat_cache.set(user_id, version, query, response["output"], vector)
             return jsonify({"reply": response["output"]})
         except Exception as e:
-            return jsonify({"reply": f"❌ Agent error: {str(e)}"}), 500
\ No newline at end of file
+            return jsonify({"reply": f"❌ Agent error: {str(e)}"}), 500
+
+    # 📡 Streaming chat: server-sent token and tool-call events
+    @app.route("/chat/stream", methods=["POST"])
+    @jwt_required(optional=True)
+    def chat_stream():
+        data = request.get_json()
+        query = data.get("message", "")
+
+        user_id = current_user_id()
+
+        if not query:
+            return jsonify({"reply": "⚠️ No input received."}), 400
+
+        version = data_version(user_id)
+        cached, vector = chat_cache.get(user_id, version, query)
+        if cached is not None:
+            body = [sse("done", {"reply": cached, "cached": True})]
+        else:
+            body = stream_agent(
+                current_app._get_current_object(),
+                build_agent_executor(user_id),
+                {"query": query},
+                on_done=lambda reply: chat_cache.set(user_id, version, query, reply, vector),
+            )
+
+        return Response(
+            body,
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # 📊 Chat cache hit/miss metrics
+    @app.route("/chat/cache/stats", methods=["GET"])
+    def chat_cache_stats():
+        return jsonify(chat_cache.stats()), 200
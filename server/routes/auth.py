@@ -1,10 +1,10 @@
 from flask import request, jsonify, current_app
 from ..extensions import db, jwt
 from ..models import User
+from ..revocation import revocation_store
+from ..current_user import parse_identity
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt
-from datetime import datetime, timezone
-
-REVOKED_TOKENS = set()  # In-memory store for revoked tokens (use Redis or DB in production)
+from datetime import datetime
 
 def register_routes(app):
     @app.route("/signup", methods=["POST"])
@@ -59,16 +59,21 @@ def register_routes(app):
     @app.route("/logout", methods=["DELETE"])
     @jwt_required()
     def logout():
-        # Add current token's jti to revocation store
-        jti = get_jwt()["jti"]
-        REVOKED_TOKENS.add(jti)
+        # Add current token's jti to the shared revocation store
+        token = get_jwt()
+        revocation_store.revoke(token["jti"], datetime.utcfromtimestamp(token["exp"]))
         return jsonify({"message": "Logged out"}), 200
 
+    # Tokens carry the user id as a string subject (what PyJWT expects);
+    # the {"id", "username"} dicts built above still go in unchanged
+    @jwt.user_identity_loader
+    def user_identity(identity):
+        return str(parse_identity(identity))
+
     # Register token-in-blocklist callback
     @jwt.token_in_blocklist_loader
     def check_if_token_revoked(jwt_header, jwt_payload):
-        jti = jwt_payload.get("jti")
-        return jti in REVOKED_TOKENS
+        return revocation_store.is_revoked(jwt_payload.get("jti"))
 
     # Optionally handle revoked token responses
     @jwt.revoked_token_loader
@@ -1,54 +1,123 @@
-import cloudinary.uploader
+import logging
+import os
 from datetime import datetime
-from flask import request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import func
+from flask import request, jsonify, send_from_directory
+from flask_jwt_extended import jwt_required
 from ..extensions import db
-from ..models import Catch, User, Follower
+from ..models import Catch, User, Like, Comment, Notification, NotificationActor
+from ..current_user import current_user, current_user_id, user_cache
+from ..counters import bump_unread
+from ..follow_graph import follow_graph
+from ..http_cache import http_cache, catch_version
+from ..serialization import as_dicts, catch_query
+from ..timeline import timeline
+from ..pagination import parse_cursor, parse_limit, keyset_before, next_cursor
+from ..catch_stats import record_catch, refresh_user_stats
+from ..uploads import upload_pipeline, PENDING
+from ..imports import FORMATS, detect_format, read_rows, import_catches
 from .progression import handle_catch_post, posts_required_for_level
 
+logger = logging.getLogger(__name__)
+
+# Columns behind a feed card, shared by /feed and /timeline
+FEED_COLUMNS = (
+    Catch.id,
+    Catch.image_url,
+    Catch.medium_url,
+    Catch.thumbnail_url,
+    Catch.species,
+    Catch.location,
+    Catch.date_caught,
+    Catch.is_public,
+    Catch.user_id,
+    User.username,
+    User.profile_photo,
+    Catch.like_count,
+    Catch.comment_count,
+)
+
+
+def feed_item(r, followed):
+    return {
+        "id": r.id,
+        "image_url": r.image_url,
+        "medium_url": r.medium_url,
+        "thumbnail_url": r.thumbnail_url,
+        "species": r.species,
+        "location": r.location,
+        "date_caught": r.date_caught.isoformat() if r.date_caught else None,
+        "is_public": r.is_public,
+        "user_id": r.user_id,
+        "user_name": r.username,
+        "user_avatar": r.profile_photo,
+        "like_count": r.like_count,
+        "comment_count": r.comment_count,
+        "is_following": r.user_id in followed,
+    }
+
 
 def register_routes(app):
-    # Public catches feed
+    # Public catches feed (keyset paginated: ?before=<date_caught>,<id>&limit=)
     @app.route("/feed", methods=["GET"])
     @jwt_required(optional=True)  # Allow both authenticated and unauthenticated access
     def get_public_catches():
 
-        identity = get_jwt_identity()  # Get JWT identity
-        current_user_id = identity["id"] if identity else None  #  Handle guest users
+        viewer_id = current_user_id()  # None for guest users
 
-        catches = (
-            Catch.query.filter_by(is_public=True)
-            .order_by(Catch.date_caught.desc())
-            .all()
+        try:
+            cursor = parse_cursor(request.args.get("before"))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor. Use before=<date_caught>,<id>"}), 400
+        limit = parse_limit(request.args.get("limit"))
+
+        query = (
+            db.session.query(*FEED_COLUMNS)
+            .outerjoin(User, User.id == Catch.user_id)
+            .filter(Catch.is_public == True)  # same predicate as idx_catches_public_feed
         )
-         
-        return jsonify(
-            [
-                {
-                    "id": c.id,
-                    "image_url": c.image_url,
-                    "species": c.species,
-                    "location": c.location,
-                    "date_caught": c.date_caught.isoformat() if c.date_caught else None,
-                    "is_public": c.is_public,
-                    "user_id": c.user_id,
-                    "user_name": c.user.username if c.user else None,
-                    "user_avatar": c.user.profile_photo if c.user else None,
-                    "like_count": len(c.likes),
-                    "comment_count": len(c.comments),
-                    "is_following": Follower.query.filter_by(
-                        follower_id=current_user_id, following_id=c.user_id
-                    ).first() is not None if current_user_id else False,
-                }
-                for c in catches
-            ]
+        rows = (
+            keyset_before(query, Catch.date_caught, Catch.id, cursor)
+            .order_by(Catch.date_caught.desc(), Catch.id.desc())
+            .limit(limit)
+            .all()
         )
 
+        # Viewer's follow set comes from the follow-graph cache
+        followed = follow_graph.is_following_many(viewer_id, {r.user_id for r in rows})
+
+        response = jsonify([feed_item(r, followed) for r in rows])
+        # Body stays a plain list for existing clients; the next page is a header
+        cursor_out = next_cursor(rows, limit, "date_caught")
+        if cursor_out:
+            response.headers["X-Next-Cursor"] = cursor_out
+        return response
+
+    # 🏠 Following-only home timeline (keyset paginated like /feed)
+    @app.route("/timeline", methods=["GET"])
+    @jwt_required()
+    def get_timeline():
+        user_id = current_user_id()
+
+        try:
+            cursor = parse_cursor(request.args.get("before"))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor. Use before=<date_caught>,<id>"}), 400
+        limit = parse_limit(request.args.get("limit"))
+
+        rows = timeline.page(user_id, FEED_COLUMNS, cursor, limit)
+        followed = follow_graph.is_following_many(user_id, {r.user_id for r in rows})
+
+        response = jsonify([feed_item(r, followed) for r in rows])
+        cursor_out = next_cursor(rows, limit, "date_caught")
+        if cursor_out:
+            response.headers["X-Next-Cursor"] = cursor_out
+        return response
+
     # 📅 Get all catches
     @app.route("/catches", methods=["GET"])
     def get_catches():
-        catches = Catch.query.all()
-        return jsonify([c.to_dict() for c in catches]), 200
+        return jsonify(as_dicts(catch_query().all())), 200
 
     # 📅 Get catches by date
     @app.route("/catches/<date>", methods=["GET"])
@@ -60,8 +129,8 @@ def register_routes(app):
         except ValueError:
             return jsonify({"error": "Invalid date format. Use YYYY-MM-DD"}), 400
 
-        catches = Catch.query.filter(db.func.date(Catch.timestamp) == date_obj).all()
-        return jsonify([catch.to_dict() for catch in catches])
+        catches = catch_query().filter(db.func.date(Catch.date_caught) == date_obj).all()
+        return jsonify(as_dicts(catches)), 200
 
     # 📅 Get catches by exact date string
     @app.route("/catches/date/<string:date_string>", methods=["GET"])
@@ -73,29 +142,60 @@ def register_routes(app):
             return {"error": "Invalid date format. Use YYYY-MM-DD"}, 400
 
         # Get all catches for that calendar day
-        catches = Catch.query.filter(db.func.date(Catch.date_caught) == date_obj).all()
+        catches = catch_query().filter(db.func.date(Catch.date_caught) == date_obj).all()
 
         if not catches:
             return [], 200  # Return empty list if none (not 404)
 
-        return [c.to_dict() for c in catches], 200
+        return as_dicts(catches), 200
 
     # 📅 Get, Patch, Delete catch by ID
     @app.route("/catches/<int:id>", methods=["GET", "PATCH", "DELETE"])
+    @http_cache.conditional(catch_version, tags=lambda id: [("catch", id)])
     def catch_by_id(id):
+        if request.method == "GET":
+            # Author columns are read with the catch, not from the per-process
+            # user cache, so a shared cached body is never older than its ETag
+            row = catch_query().filter(Catch.id == id).first()
+            if not row:
+                return {"error": "catch not found"}, 404
+            return row._asdict(), 200
+
         catch = Catch.query.filter(Catch.id == id).first()
 
         if not catch:
             return {"error": "catch not found"}, 404
 
-        if request.method == "GET":
-            return catch.to_dict(), 200
-
         # patch method to be added later
 
         elif request.method == "DELETE":
+            # Bulk-delete dependents instead of loading them through the
+            # ORM cascade; the counters go away with the catch row itself.
+            Like.query.filter_by(catch_id=id).delete(synchronize_session=False)
+            Comment.query.filter_by(catch_id=id).delete(synchronize_session=False)
+            # Notifications about this catch that are still unread leave
+            # their recipients' unread counters along with them
+            unread = (
+                db.session.query(Notification.recipient_id, func.count(Notification.id))
+                .filter(Notification.catch_id == id, Notification.is_read == False)
+                .group_by(Notification.recipient_id)
+                .all()
+            )
+            for recipient_id, count in unread:
+                bump_unread(recipient_id, -count)
+            NotificationActor.query.filter(
+                NotificationActor.notification_id.in_(
+                    db.session.query(Notification.id).filter(Notification.catch_id == id)
+                )
+            ).delete(synchronize_session=False)
+            Notification.query.filter_by(catch_id=id).delete(synchronize_session=False)
+            timeline.remove_catch(id)
             db.session.delete(catch)
+            refresh_user_stats(catch.user_id)
             db.session.commit()
+            upload_pipeline.discard(id)
+            http_cache.invalidate("catch", id)
+            http_cache.invalidate("user", catch.user_id)
             return "", 204
 
     @app.route("/catches", methods=["POST"])
@@ -103,10 +203,8 @@ def register_routes(app):
     def add_catch():
         data = request.get_json()
 
-        # ✅ Get authenticated user ID from JWT
-        user_id = get_jwt_identity()
-
-        user = db.session.get(User, user_id)
+        # ✅ Get authenticated user from JWT
+        user = current_user()
         if not user:
             return jsonify({"error": "User not found"}), 404
 
@@ -138,15 +236,19 @@ def register_routes(app):
             date_caught=date_caught or datetime.utcnow(),
             location=data.get("location"),
             is_public=data.get("is_public", False),
-            user_id=user_id,  # ✅ Now from token, not client
+            user_id=user.id,  # ✅ Now from token, not client
         )
 
         db.session.add(new_catch)
+        record_catch(new_catch)
+        timeline.fan_out(new_catch)
 
         # Update user progression
         handle_catch_post(user)
 
         db.session.commit()
+        user_cache.invalidate(user.id)
+        http_cache.invalidate("user", user.id)
 
         posts_required = posts_required_for_level(user.level)
 
@@ -159,42 +261,33 @@ def register_routes(app):
         }), 201
  
 
+    # 🖼️ Serve images saved by STORAGE_BACKEND=local. A full URL in
+    # LOCAL_STORAGE_URL means some other static server owns the directory.
+    local_url = app.config.get("LOCAL_STORAGE_URL", "")
+    if app.config.get("STORAGE_BACKEND") == "local" and local_url.startswith("/"):
+        @app.route(f"{local_url.rstrip('/')}/<path:filename>", methods=["GET"])
+        def local_image(filename):
+            return send_from_directory(app.config["LOCAL_STORAGE_DIR"], filename)
+
     # 📤 Upload catch with image file
     @app.route("/catches/upload", methods=["POST"])
     @jwt_required()
     def upload_catch():
-        identity = get_jwt_identity()
-        user_id = identity["id"]
-        user = db.session.get(User, user_id)
-        print("JWT identity:", get_jwt_identity(), type(get_jwt_identity()))
+        user_id = current_user_id()
+        user = current_user()
 
         if not user:
             return jsonify({"error": f"User {user_id} not found"}), 404
         
         if "file" not in request.files:
-            print("❌ No file part in request.files")
+            logger.debug("upload_catch: no file part in request.files")
             return jsonify({"error": "No file part"}), 400
 
         file = request.files["file"]
         if file.filename == "":
-            print("❌ File selected but filename is empty")
+            logger.debug("upload_catch: file selected but filename is empty")
             return jsonify({"error": "No selected file"}), 400
 
-        try:
-            print("☁️ Uploading file to Cloudinary...")
-            upload_result = cloudinary.uploader.upload(file)
-            print("✅ Cloudinary upload result:", upload_result)
-        except Exception as e:
-            print("💥 Cloudinary upload failed:", str(e))
-            return jsonify(
-                {"error": "Failed to upload to Cloudinary", "details": str(e)}
-            ), 500
-
-        image_url = upload_result.get("secure_url")
-        if not image_url:
-            print("❌ No secure_url found in Cloudinary response")
-            return jsonify({"error": "Failed to get image URL from Cloudinary"}), 500
-
         # Parse user-supplied date (if provided)
         date_caught = None
         date_str = request.form.get("date_caught")
@@ -204,12 +297,20 @@ def register_routes(app):
                     date_str = date_str[:-1]  # remove trailing Z
                 date_caught = datetime.fromisoformat(date_str)
             except ValueError as e:
-                print("❌ Date parsing failed:", str(e))
+                logger.debug("upload_catch: date parsing failed: %s", e)
                 return jsonify({"error": "Invalid date format", "details": str(e)}), 400
 
+        # Spool to local disk; the storage upload happens off the request path
+        try:
+            spooled_path = upload_pipeline.spool(file)
+        except OSError as e:
+            logger.warning("upload_catch: spooling failed: %s", e)
+            return jsonify({"error": "Failed to save upload", "details": str(e)}), 500
+
         try:
             new_catch = Catch(
-                image_url=image_url,
+                image_url=None,
+                image_status=PENDING,
                 species=request.form.get("species"),
                 water_temp=request.form.get("water_temp", type=float),
                 air_temp=request.form.get("air_temp", type=float),
@@ -226,13 +327,55 @@ def register_routes(app):
                 user_id=user_id,
             )
             db.session.add(new_catch)
+            record_catch(new_catch)
+            timeline.fan_out(new_catch)
             handle_catch_post(user)
             db.session.commit()
-
-            print("✅ Upload complete, image URL:", image_url)
-            return jsonify(new_catch.to_dict()), 201
-        
+            user_cache.invalidate(user.id)
+            http_cache.invalidate("user", user.id)
         except Exception as e:
-            print("💥 Database insert failed:", str(e))
+            logger.exception("upload_catch: database insert failed")
             db.session.rollback()
-            return jsonify({"error": "Database insert failed", "details": str(e)}), 500
\ No newline at end of file
+            os.remove(spooled_path)
+            return jsonify({"error": "Database insert failed", "details": str(e)}), 500
+
+        path = upload_pipeline.claim(spooled_path, new_catch.id)
+        upload_pipeline.submit(new_catch.id, path)
+        logger.debug("Upload queued: catch=%s", new_catch.id)
+        return jsonify(new_catch.to_dict()), 201
+
+    # Bulk logbook import: CSV or JSONL, as a multipart "file" or the raw body
+    # (?format=csv|jsonl overrides detection, ?dry_run=true validates only)
+    @app.route("/catches/import", methods=["POST"])
+    @jwt_required()
+    def import_catches_route():
+        user = current_user()
+        if not user:
+            return jsonify({"error": "User not found"}), 404
+
+        upload = request.files.get("file")
+        if upload:
+            stream = upload.stream
+            fmt = detect_format(upload.filename, upload.content_type)
+        else:
+            stream = request.stream
+            fmt = detect_format(content_type=request.content_type)
+        fmt = request.args.get("format", fmt)
+        if fmt not in FORMATS:
+            return jsonify({"error": "Unknown format. Use format=csv or format=jsonl"}), 400
+
+        summary = import_catches(
+            user,
+            read_rows(stream, fmt),
+            chunk_size=app.config["IMPORT_CHUNK_SIZE"],
+            dry_run=request.args.get("dry_run", "false").lower() == "true",
+        )
+        logger.debug("Import for user %s: %s inserted, %s failed",
+                     user.id, summary["inserted"], summary["failed"])
+        return jsonify({
+            **summary,
+            "level": user.level,
+            "prestige": user.prestige,
+            "postsTowardNextLevel": user.posts_toward_next_level,
+            "postsRequiredForNextLevel": posts_required_for_level(user.level),
+        }), 200
@@ -1,3 +1,8 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+
 def posts_required_for_level(level: int) -> int:
     if level < 2:
         return 1
@@ -19,11 +24,10 @@ def handle_catch_post(user):
         user.posts_toward_next_level = 0
         return
     
-    print("🔥 handle_catch_post called")
-    print("User:", user)
-    print("Type:", type(user))
-
-    print("Before → level:", user.level, "posts:", user.posts_toward_next_level)
+    logger.debug(
+        "handle_catch_post before: user=%s level=%s posts=%s",
+        user.id, user.level, user.posts_toward_next_level,
+    )
 
     required = posts_required_for_level(user.level)
     user.posts_toward_next_level += 1
@@ -31,13 +35,43 @@ def handle_catch_post(user):
     if user.posts_toward_next_level >= required:
         user.level += 1
         user.posts_toward_next_level = 0
-        print("🎉 Level up!")
+        logger.debug("Level up: user=%s level=%s", user.id, user.level)
 
         if user.level == 30:
-            print("🏆 Prestige achieved!")
+            logger.debug("Prestige achieved: user=%s", user.id)
             user.prestige += 1
             user.level = 1
             user.posts_toward_next_level = 0
             return
 
-    print("After → level:", user.level, "posts:", user.posts_toward_next_level)
+    logger.debug(
+        "handle_catch_post after: user=%s level=%s posts=%s",
+        user.id, user.level, user.posts_toward_next_level,
+    )
+
+
+def apply_catch_posts(user, count):
+    """Same end state as calling handle_catch_post(user) count times.
+
+    Walks a level at a time instead of a post at a time, so bulk imports
+    update progression once per batch without per-row work or logging.
+    """
+    while count > 0:
+        if user.level == 30:
+            user.prestige += 1
+            user.level = 1
+            user.posts_toward_next_level = 0
+            count -= 1
+            continue
+
+        needed = max(posts_required_for_level(user.level) - user.posts_toward_next_level, 1)
+        if count < needed:
+            user.posts_toward_next_level += count
+            return
+
+        count -= needed
+        user.level += 1
+        user.posts_toward_next_level = 0
+        if user.level == 30:
+            user.prestige += 1
+            user.level = 1
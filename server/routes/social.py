@@ -1,7 +1,19 @@
-from flask import request, jsonify
+import logging
+from flask import request, jsonify, Response, stream_with_context
+from sqlalchemy.exc import IntegrityError
 from ..extensions import db
-from ..models import Like, Comment, Notification, User, Follower
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from ..models import Catch, Like, Comment, Notification, User, Follower
+from ..current_user import current_user_id
+from ..counters import bump_catch_counter, bump_unread
+from ..follow_graph import follow_graph
+from ..http_cache import http_cache, comments_version
+from ..serialization import comment_dicts, comment_query
+from ..timeline import timeline
+from ..pagination import parse_cursor, parse_limit, keyset_before, next_cursor
+from ..notifications import notification_queue, publish_unread_counts, stream_notifications
+from flask_jwt_extended import jwt_required
+
+logger = logging.getLogger(__name__)
 
 def register_routes(app):
     # ❤️ Like a catch
@@ -17,9 +29,14 @@ def register_routes(app):
         if existing_like:
             return jsonify({"message": "Already liked"}), 200
 
+        if not bump_catch_counter(catch_id, Catch.like_count, 1):
+            return jsonify({"error": "Catch not found"}), 404
+
         like = Like(user_id=user_id, catch_id=catch_id)
         db.session.add(like)
         db.session.commit()
+        http_cache.invalidate("catch", catch_id)
+        notification_queue.enqueue("like", catch_id, user_id)
 
         return jsonify({"message": "Catch liked successfully"}), 201
 
@@ -37,7 +54,9 @@ def register_routes(app):
             return jsonify({"error": "Like not found"}), 404
 
         db.session.delete(like)
+        bump_catch_counter(catch_id, Catch.like_count, -1)
         db.session.commit()
+        http_cache.invalidate("catch", catch_id)
 
         return jsonify({"message": "Catch unliked successfully"}), 200
 
@@ -51,21 +70,28 @@ def register_routes(app):
         if not user_id or not content:
             return jsonify({"error": "user_id and content are required"}), 400
 
+        if not bump_catch_counter(catch_id, Catch.comment_count, 1):
+            return jsonify({"error": "Catch not found"}), 404
+
         comment = Comment(user_id=user_id, catch_id=catch_id, content=content)
         db.session.add(comment)
         db.session.commit()
+        http_cache.invalidate("catch", catch_id)
+        notification_queue.enqueue("comment", catch_id, user_id)
 
         return jsonify(comment.to_dict()), 201
 
     # 🧾 Get comments for a catch
     @app.route("/catches/<int:catch_id>/comments", methods=["GET"])
+    @http_cache.conditional(comments_version, tags=lambda catch_id: [("catch", catch_id)])
     def get_comments(catch_id):
         comments = (
-            Comment.query.filter_by(catch_id=catch_id)
+            comment_query()
+            .filter(Comment.catch_id == catch_id)
             .order_by(Comment.timestamp.desc())
             .all()
         )
-        return jsonify([c.to_dict() for c in comments]), 200
+        return jsonify(comment_dicts(comments)), 200
     
     # 🔔 Get unread notification count
     @app.route("/notifications/unread-count", methods=["GET"])
@@ -75,14 +101,22 @@ def register_routes(app):
         if not user_id:
             return jsonify({"error": "user_id is required"}), 400
 
-        count = Notification.query.filter_by(
-            recipient_id=user_id,
-            is_read=False
-        ).count()
+        # Maintained counter: a primary-key lookup instead of COUNT(*)
+        count = db.session.query(User.unread_notifications).filter(User.id == user_id).scalar()
 
-        return jsonify({"count": count}), 200
+        return jsonify({"count": count or 0}), 200
     
-        # 📬 Get notifications for user
+    # 📡 Push unread-count changes and new notifications (server-sent events)
+    @app.route("/notifications/stream", methods=["GET"])
+    @jwt_required()
+    def stream_user_notifications():
+        return Response(
+            stream_with_context(stream_notifications(current_user_id())),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    # 📬 Get notifications for user (keyset paginated: ?before=<created_at>,<id>&limit=&is_read=)
     @app.route("/notifications", methods=["GET"])
     def get_notifications():
         user_id = request.args.get("user_id", type=int)
@@ -90,12 +124,19 @@ def register_routes(app):
         if not user_id:
             return jsonify({"error": "user_id is required"}), 400
 
-        notifications = (
+        try:
+            cursor = parse_cursor(request.args.get("before"))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor. Use before=<created_at>,<id>"}), 400
+        limit = parse_limit(request.args.get("limit"))
+
+        query = (
             db.session.query(
                 Notification.id,
                 Notification.type,
                 Notification.catch_id,
                 Notification.actor_id,
+                Notification.actor_count,
                 Notification.is_read,
                 Notification.created_at,
                 User.username.label("actor_username"),
@@ -103,11 +144,18 @@ def register_routes(app):
             )
             .outerjoin(User, User.id == Notification.actor_id)
             .filter(Notification.recipient_id == user_id)
-            .order_by(Notification.created_at.desc())
+        )
+        is_read = request.args.get("is_read")
+        if is_read is not None:
+            query = query.filter(Notification.is_read == (is_read.lower() == "true"))
+        notifications = (
+            keyset_before(query, Notification.created_at, Notification.id, cursor)
+            .order_by(Notification.created_at.desc(), Notification.id.desc())
+            .limit(limit)
             .all()
         )
 
-        return jsonify([
+        response = jsonify([
             {
                 "id": n.id,
                 "type": n.type,
@@ -115,13 +163,19 @@ def register_routes(app):
                 "actor_id": n.actor_id,
                 "actor_username": n.actor_username,
                 "actor_profile_photo": n.actor_profile_photo,
+                "actor_count": n.actor_count,
                 "is_read": n.is_read,
                 "created_at": n.created_at.isoformat(),
             }
             for n in notifications
-        ]), 200
-    
-        # ✅ Mark all notifications as read
+        ])
+        cursor_out = next_cursor(notifications, limit, "created_at")
+        if cursor_out:
+            response.headers["X-Next-Cursor"] = cursor_out
+        return response, 200
+
+    # ✅ Mark notifications as read: all of them, or up to and including
+    # the "<created_at>,<id>" cursor in up_to (the newest one the client saw)
     @app.route("/notifications/mark-read", methods=["POST"])
     def mark_notifications_read():
         user_id = request.json.get("user_id")
@@ -129,49 +183,56 @@ def register_routes(app):
         if not user_id:
             return jsonify({"error": "user_id is required"}), 400
 
-        Notification.query.filter_by(
-            recipient_id=user_id,
-            is_read=False
-        ).update({"is_read": True})
+        try:
+            up_to = parse_cursor(request.json.get("up_to"))
+        except ValueError:
+            return jsonify({"error": "Invalid cursor. Use up_to=<created_at>,<id>"}), 400
+
+        query = Notification.query.filter(
+            Notification.recipient_id == user_id,
+            Notification.is_read == False,
+        )
+        if up_to:
+            ts, row_id = up_to
+            query = query.filter(
+                (Notification.created_at < ts)
+                | ((Notification.created_at == ts) & (Notification.id <= row_id))
+            )
+        marked = query.update({"is_read": True}, synchronize_session=False)
+        bump_unread(user_id, -marked)
 
         db.session.commit()
+        publish_unread_counts([user_id])
 
-        return jsonify({"success": True}), 200
+        return jsonify({"success": True, "marked": marked}), 200
     
     @app.route("/follow", methods=["POST"])
     @jwt_required()
     def follow_user():
-        print("JWT identity:", get_jwt_identity())
-        
         data = request.json
-        identity = get_jwt_identity()  # Get follower_id from JWT
-        follower_id = identity["id"]
+        follower_id = current_user_id()  # Get follower_id from JWT
         following_id = data["following_id"]
 
         # 🚫 Guard: prevent self-follow
         if follower_id == following_id:
             return jsonify({"error": "Cannot follow yourself"}), 400
         
-        print("Follower:", follower_id)
-        print("Following:", following_id)
-
-        # Prevent duplicates
-        existing = Follower.query.filter_by(
-            follower_id=follower_id,
-            following_id=following_id
-        ).first()
-
-        print("Existing follow relationship:", existing)
-
-        if existing:
-            return jsonify({"error": "Already following"}), 400
+        logger.debug("follow_user follower=%s following=%s", follower_id, following_id)
 
-        # ➕ Create follow relationship
+        # ➕ Create follow relationship; uq_followers_pair rejects duplicates,
+        # so there's no existence query first
         follow = Follower(
             follower_id=follower_id,
             following_id=following_id
         )
         db.session.add(follow)
+        try:
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return jsonify({"error": "Already following"}), 400
+
+        timeline.follow(follower_id, following_id)
 
         # prevent duplicate FOLLOW notifications
         existing_notification = Notification.query.filter_by(
@@ -188,7 +249,14 @@ def register_routes(app):
                 type="follow",
             )
             db.session.add(notification)
+            bump_unread(following_id, 1)
         db.session.commit()
+        follow_graph.invalidate(follower_id, following_id)
+        http_cache.invalidate("user", follower_id)
+        http_cache.invalidate("user", following_id)
+
+        if not existing_notification:
+            publish_unread_counts([following_id])
 
         return jsonify({"success": True}), 201
     
@@ -196,22 +264,20 @@ def register_routes(app):
     @jwt_required()
     def unfollow_user():
         data = request.json
-        identity = get_jwt_identity()
-        follower_id = identity["id"]
+        follower_id = current_user_id()
         following_id = data["following_id"]
 
-        # 🔍 Find the follow relationship
-        follow = Follower.query.filter_by(
+        # ➖ Remove the follow relationship (rowcount doubles as the existence check)
+        removed = Follower.query.filter_by(
             follower_id=follower_id,
             following_id=following_id
-        ).first()
+        ).delete(synchronize_session=False)
 
-        if not follow:
+        if not removed:
             return jsonify({"error": "Not following"}), 400
-        
-        # ➖ Remove the follow relationship
-        db.session.delete(follow)
-        
+
+        timeline.unfollow(follower_id, following_id)
+
         # Auto-delete the FOLLOW notification on unfollow
         follow_notification = Notification.query.filter_by(
             recipient_id=following_id, # user being unfollowed
@@ -221,7 +287,15 @@ def register_routes(app):
 
         if follow_notification:
             db.session.delete(follow_notification)
+            if not follow_notification.is_read:
+                bump_unread(following_id, -1)
 
         db.session.commit()
+        follow_graph.invalidate(follower_id, following_id)
+        http_cache.invalidate("user", follower_id)
+        http_cache.invalidate("user", following_id)
+
+        if follow_notification:
+            publish_unread_counts([following_id])
 
         return jsonify({"success": True}), 200
\ No newline at end of file
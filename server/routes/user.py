@@ -1,28 +1,29 @@
-from flask import request, jsonify
-from ..models import User, Catch, Follower
+from flask import request, jsonify, Response, stream_with_context
+from flask_jwt_extended import jwt_required
+from ..models import User, Catch
 from ..extensions import db
+from ..current_user import current_user_id, user_cache
+from .. import exports
+from ..follow_graph import follow_graph
+from ..http_cache import http_cache, profile_version, user_catches_version
+from ..serialization import as_dicts, catch_query
 from .progression import posts_required_for_level
 
 def register_routes(app):
     # 👤 Get user profile
     @app.route("/users/<int:user_id>/profile", methods=["GET"])
+    @http_cache.conditional(profile_version, tags=lambda user_id: [("user", user_id)])
     def get_user_profile(user_id):
         user = db.session.get(User, user_id)
         if not user:
             return jsonify({"error": "User not found"}), 404
         
         viewer_id = request.args.get("viewer_id", type=int)
-
-        is_following = False
-        if viewer_id:
-            is_following = Follower.query.filter_by(
-                follower_id=viewer_id,
-                following_id=user_id
-            ).first() is not None
+        is_following = follow_graph.is_following(viewer_id, user_id)
 
         catch_count = Catch.query.filter_by(user_id=user.id).count() # number of posts
-        followers_count = Follower.query.filter_by(following_id=user.id).count() # number of followers
-        following_count = Follower.query.filter_by(follower_id=user.id).count() # number of following
+        followers_count = follow_graph.follower_count(user.id) # number of followers
+        following_count = follow_graph.following_count(user.id) # number of following
 
         return jsonify({
             "id": user.id,
@@ -65,6 +66,8 @@ def register_routes(app):
             user.state = data["state"]
 
         db.session.commit()
+        user_cache.invalidate(user.id)
+        http_cache.invalidate("user", user.id)
 
         return jsonify({
             "id": user.id,
@@ -77,12 +80,41 @@ def register_routes(app):
 
     # 🎣 Get user's catches
     @app.route("/users/<int:user_id>/catches", methods=["GET"])
+    @http_cache.conditional(user_catches_version, tags=lambda user_id: [("user", user_id)])
     def get_user_catches(user_id):
-        catches = Catch.query.filter_by(user_id=user_id).order_by(
+        catches = catch_query().filter(Catch.user_id == user_id).order_by(
             Catch.date_caught.desc()
         ).all()
-        return jsonify([c.to_dict() for c in catches])
+        return jsonify(as_dicts(catches))
     
+    # 📦 Stream a user's full catch history (?format=ndjson|csv&fields=a,b&gzip=true)
+    @app.route("/users/<int:user_id>/catches/export", methods=["GET"])
+    @jwt_required(optional=True)
+    def export_user_catches(user_id):
+        if not db.session.get(User, user_id):
+            return jsonify({"error": "User not found"}), 404
+
+        fmt = request.args.get("format", "ndjson")
+        if fmt not in exports.FORMATS:
+            return jsonify({"error": "Unknown format. Use format=ndjson or format=csv"}), 400
+        try:
+            fields = exports.parse_fields(request.args.get("fields"))
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+        # Owners get everything; anyone else only sees public catches
+        is_owner = current_user_id() == user_id
+        compress = request.args.get("gzip", "false").lower() == "true"
+
+        rows = exports.export_rows(fields, user_id=user_id, public_only=not is_owner)
+        body = exports.encode(exports.render(rows, fields, fmt), compress=compress)
+
+        response = Response(stream_with_context(body), mimetype=exports.FORMATS[fmt])
+        response.headers["Content-Disposition"] = f'attachment; filename="catches-{user_id}.{fmt}"'
+        if compress:
+            response.headers["Content-Encoding"] = "gzip"
+        return response
+
     # 🐟 Get distinct species caught by user
     @app.route("/user/species", methods=["POST"])
     def get_user_species():
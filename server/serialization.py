@@ -0,0 +1,119 @@
+from decimal import Decimal
+import orjson
+from flask.json.provider import JSONProvider
+from .extensions import db
+from .models import Catch, Comment, User
+
+# Fast JSON for responses. OrjsonProvider replaces Flask's stdlib-json
+# provider, so jsonify() and returned dicts/lists encode straight to bytes
+# in C. datetimes come out as ISO 8601 (the same as .isoformat() for the
+# naive UTC values stored here), so rows can be passed through unconverted.
+#
+# List routes also skip ORM objects: *_COLUMNS are column-only selects
+# labelled with the response keys, so each row maps to its JSON object
+# with row._asdict() and no per-object to_dict() or lazy loads. The key
+# sets match Catch.to_dict / Comment.to_dict for existing clients.
+
+OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    # Types orjson doesn't know, handled the way Flask's provider did
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if hasattr(obj, "__html__"):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    mimetype = "application/json"
+
+    def _option(self):
+        # Indented in debug, like Flask's default provider
+        return OPTIONS | orjson.OPT_INDENT_2 if self._app.debug else OPTIONS
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=_default, option=self._option()).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_default, option=self._option() | orjson.OPT_APPEND_NEWLINE)
+        return self._app.response_class(body, mimetype=self.mimetype)
+
+
+CATCH_COLUMNS = (
+    Catch.id,
+    Catch.user_id.label("owner_id"),
+    Catch.image_url,
+    Catch.medium_url,
+    Catch.thumbnail_url,
+    Catch.image_status,
+    Catch.species,
+    Catch.date_caught,
+    Catch.water_temp,
+    Catch.air_temp,
+    Catch.moon_phase,
+    Catch.tide,
+    Catch.length,
+    Catch.weight,
+    Catch.wind_speed,
+    Catch.method,
+    Catch.bait_used,
+    Catch.location,
+    Catch.is_public,
+    Catch.user_id,
+    User.username.label("user_name"),
+    User.profile_photo.label("user_avatar"),
+    Catch.like_count.label("likes_count"),
+    Catch.comment_count.label("comments_count"),
+)
+
+COMMENT_COLUMNS = (
+    Comment.id,
+    Comment.content,
+    Comment.timestamp,
+    User.id.label("user_id"),
+    User.username,
+    User.profile_photo,
+    User.cover_photo,
+    User.level,
+    User.prestige,
+    User.posts_toward_next_level,
+)
+
+
+def catch_query():
+    """Catch rows shaped like Catch.to_dict (author joined in); add filters/order."""
+    return db.session.query(*CATCH_COLUMNS).outerjoin(User, User.id == Catch.user_id)
+
+
+def comment_query():
+    return db.session.query(*COMMENT_COLUMNS).outerjoin(User, User.id == Comment.user_id)
+
+
+def as_dicts(rows):
+    return [row._asdict() for row in rows]
+
+
+def comment_dicts(rows):
+    return [
+        {
+            "id": r.id,
+            "content": r.content,
+            "timestamp": r.timestamp,
+            "user": {
+                "id": r.user_id,
+                "username": r.username,
+                "profile_photo": r.profile_photo,
+                "cover_photo": r.cover_photo,
+                "level": r.level,
+                "prestige": r.prestige,
+                "postsTowardNextLevel": r.posts_toward_next_level,
+            } if r.user_id is not None else None,
+        }
+        for r in rows
+    ]
@@ -0,0 +1,49 @@
+import os
+import shutil
+from abc import ABC, abstractmethod
+
+# Pluggable image storage. STORAGE_BACKEND=cloudinary (default) uploads to
+# Cloudinary; STORAGE_BACKEND=local copies into LOCAL_STORAGE_DIR and
+# returns URLs under LOCAL_STORAGE_URL, for development and tests. A path
+# there (the default /images) is served by the app itself; set a full URL
+# instead when a separate static server publishes the directory.
+
+
+class StorageBackend(ABC):
+    @abstractmethod
+    def save(self, path, key):
+        """Store the file at path under key and return its public URL."""
+
+
+class CloudinaryStorage(StorageBackend):
+    def save(self, path, key):
+        import cloudinary.uploader
+
+        result = cloudinary.uploader.upload(path, public_id=key)
+        url = result.get("secure_url")
+        if not url:
+            raise RuntimeError("No secure_url found in Cloudinary response")
+        return url
+
+
+class LocalStorage(StorageBackend):
+    def __init__(self, root, base_url):
+        self.root = root
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(root, exist_ok=True)
+
+    def save(self, path, key):
+        filename = key + os.path.splitext(path)[1]
+        destination = os.path.join(self.root, filename)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copyfile(path, destination)
+        return f"{self.base_url}/{filename}"
+
+
+def storage_from_config(config):
+    backend = config.get("STORAGE_BACKEND", "cloudinary")
+    if backend == "local":
+        return LocalStorage(config["LOCAL_STORAGE_DIR"], config["LOCAL_STORAGE_URL"])
+    if backend == "cloudinary":
+        return CloudinaryStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,158 @@
+from sqlalchemy import DateTime, Integer, func, insert, literal, select
+from .extensions import db
+from .follow_graph import follow_graph
+from .models import Catch, Follower, TimelineEntry, User
+from .pagination import keyset_before
+
+# "Following" home timeline. Public catches are fanned out on write: one
+# INSERT ... SELECT copies the catch into timeline_entries for every
+# follower of the author, so reading a page is a single range scan on
+# idx_timeline_entries_page. The catch is then marked fanned_out.
+#
+# Catches that were not fanned out (posted while the author had more than
+# TIMELINE_FANOUT_LIMIT followers, where one post would mean that many
+# rows, or bulk imported) are merged in at read time from the followed
+# authors' unfanned catches on idx_catches_unfanned. That depends only on
+# the flag stored with each catch, so those catches stay visible whatever
+# the author's follower count does afterwards.
+
+
+class Timeline:
+    def __init__(self, fanout_limit=5000, backfill=50):
+        self.fanout_limit = fanout_limit
+        self.backfill = backfill
+
+    def init_app(self, app):
+        self.fanout_limit = app.config.get("TIMELINE_FANOUT_LIMIT", self.fanout_limit)
+        self.backfill = app.config.get("TIMELINE_BACKFILL", self.backfill)
+
+    def is_heavy(self, author_id):
+        return follow_graph.follower_count(author_id) > self.fanout_limit
+
+    def fan_out(self, catch):
+        """Copy a new public catch into its author's followers' timelines.
+
+        Runs in the caller's transaction. Returns the number of entries written.
+        """
+        if not catch.is_public or self.is_heavy(catch.user_id):
+            return 0
+        if catch.id is None:
+            db.session.flush()
+        rows = select(
+            Follower.follower_id,
+            literal(catch.id, Integer),
+            literal(catch.user_id, Integer),
+            literal(catch.date_caught, DateTime),
+        ).where(Follower.following_id == catch.user_id)
+        result = db.session.execute(
+            insert(TimelineEntry).from_select(
+                ["user_id", "catch_id", "author_id", "date_caught"], rows
+            )
+        )
+        catch.fanned_out = True
+        return result.rowcount
+
+    def follow(self, follower_id, author_id):
+        """Backfill a new follower's timeline with the author's recent catches.
+
+        Only fanned-out catches are copied (at most backfill rows, so heavy
+        authors too); the rest already reach followers through the read merge.
+        """
+        recent = (
+            select(
+                literal(follower_id, Integer),
+                Catch.id,
+                Catch.user_id,
+                Catch.date_caught,
+            )
+            .where(Catch.user_id == author_id, Catch.is_public == True, Catch.fanned_out == True)
+            .where(
+                ~select(TimelineEntry.id)
+                .where(TimelineEntry.user_id == follower_id, TimelineEntry.catch_id == Catch.id)
+                .exists()
+            )
+            .order_by(Catch.date_caught.desc(), Catch.id.desc())
+            .limit(self.backfill)
+        )
+        result = db.session.execute(
+            insert(TimelineEntry).from_select(
+                ["user_id", "catch_id", "author_id", "date_caught"], recent
+            )
+        )
+        return result.rowcount
+
+    def unfollow(self, follower_id, author_id):
+        return TimelineEntry.query.filter_by(
+            user_id=follower_id, author_id=author_id
+        ).delete(synchronize_session=False)
+
+    def remove_catch(self, catch_id):
+        return TimelineEntry.query.filter_by(catch_id=catch_id).delete(synchronize_session=False)
+
+    def page(self, user_id, columns, cursor=None, limit=20):
+        """Newest-first page of the catches user_id follows, as rows of columns."""
+        query = (
+            db.session.query(*columns)
+            .select_from(TimelineEntry)
+            .join(Catch, Catch.id == TimelineEntry.catch_id)
+            .outerjoin(User, User.id == Catch.user_id)
+            .filter(TimelineEntry.user_id == user_id)
+        )
+        rows = (
+            keyset_before(query, TimelineEntry.date_caught, TimelineEntry.catch_id, cursor)
+            .order_by(TimelineEntry.date_caught.desc(), TimelineEntry.catch_id.desc())
+            .limit(limit)
+            .all()
+        )
+
+        following = follow_graph.following_ids(user_id)
+        if not following:
+            return rows
+
+        # Fan-out-on-read for followed authors' catches that were never
+        # materialized (same predicate as idx_catches_unfanned)
+        query = (
+            db.session.query(*columns)
+            .outerjoin(User, User.id == Catch.user_id)
+            .filter(Catch.user_id.in_(following), Catch.is_public == True, Catch.fanned_out == False)
+        )
+        extra = (
+            keyset_before(query, Catch.date_caught, Catch.id, cursor)
+            .order_by(Catch.date_caught.desc(), Catch.id.desc())
+            .limit(limit)
+            .all()
+        )
+        if not extra:
+            return rows
+        # Disjoint by fanned_out, so merging is just a re-sort
+        return sorted(rows + extra, key=lambda row: (row.date_caught, row.id), reverse=True)[:limit]
+
+    def rebuild(self):
+        """Rematerialize every timeline from followers x public catches."""
+        TimelineEntry.query.delete(synchronize_session=False)
+        heavy = (
+            select(Follower.following_id)
+            .group_by(Follower.following_id)
+            .having(func.count(Follower.id) > self.fanout_limit)
+        )
+        # Authors over the limit now are merged on read; fanned_out has no
+        # bearing on responses, so updated_at (the ETag stamp) is kept
+        Catch.query.filter(Catch.is_public == True).update(
+            {Catch.fanned_out: Catch.user_id.not_in(heavy), Catch.updated_at: Catch.updated_at},
+            synchronize_session=False,
+        )
+        rows = (
+            select(Follower.follower_id, Catch.id, Catch.user_id, Catch.date_caught)
+            .join(Catch, Catch.user_id == Follower.following_id)
+            .where(Catch.is_public == True, Catch.fanned_out == True)
+        )
+        result = db.session.execute(
+            insert(TimelineEntry).from_select(
+                ["user_id", "catch_id", "author_id", "date_caught"], rows
+            )
+        )
+        db.session.commit()
+        return result.rowcount
+
+
+timeline = Timeline()
@@ -1,71 +1,28 @@
 from langchain.tools import Tool
-from .models import Catch
+from .catch_stats import stats_for_query, most_common_value, average
 
 # Catch history analysis tool (reads from user DB or past logs)
 
 # --- Catch History Analysis Tool ---
-def analyze_catch_history(query: str) -> str:
-    """Analyze user's past catch data to find helpful patterns."""
-    query = query.lower()
-    catches = Catch.query.all()
+def analyze_catch_history(query: str, user_id=None) -> str:
+    """Analyze the requesting user's past catch data to find helpful patterns."""
+    mentioned_species, stats = stats_for_query(user_id, query)
 
-    if not catches:
+    if not stats:
         return "You haven't logged any catches yet. Try logging a few and I’ll start giving more personalized suggestions."
 
-    # Determine if user mentioned a specific species
-    species_list = [c.species.lower() for c in catches if c.species]
-    mentioned_species = next((s for s in species_list if s in query), None)
+    best_bait = most_common_value(stats, "bait_used")
+    best_tide = most_common_value(stats, "tide")
+    best_location = most_common_value(stats, "location")
+    best_method = most_common_value(stats, "method")
 
-    filtered = catches
-    if mentioned_species:
-        filtered = [c for c in catches if c.species and c.species.lower() == mentioned_species]
-
-    if not filtered:
-        return f"I didn’t find any catches for that species yet. Try logging more data first."
-
-    # Most common bait used
-    bait_counts = {}
-    for c in filtered:
-        if c.bait_used:
-            bait_counts[c.bait_used] = bait_counts.get(c.bait_used, 0) + 1
-    best_bait = max(bait_counts, key=bait_counts.get) if bait_counts else None
-
-    # Most common tide
-    tide_counts = {}
-    for c in filtered:
-        if c.tide:
-            tide_counts[c.tide] = tide_counts.get(c.tide, 0) + 1
-    best_tide = max(tide_counts, key=tide_counts.get) if tide_counts else None
-
-    location_counts = {}
-    for c in filtered:
-        if c.location:
-            location_counts[c.location] = location_counts.get(c.location, 0) + 1
-    best_location = max(location_counts, key=location_counts.get) if location_counts else None
-
-    # Average water temperature
-    temps = [c.water_temp for c in filtered if c.water_temp is not None]
-    avg_temp = round(sum(temps) / len(temps), 1) if temps else None
-
-    # Average wind speed
-    winds = [c.wind_speed for c in filtered if c.wind_speed is not None]  
-    avg_wind = round(sum(winds) / len(winds), 1) if winds else None        
-
-    # Average length and weight
-    lengths = [c.length for c in filtered if c.length is not None]          
-    avg_length = round(sum(lengths) / len(lengths), 1) if lengths else None 
-    weights = [c.weight for c in filtered if c.weight is not None]          
-    avg_weight = round(sum(weights) / len(weights), 1) if weights else None 
-
-    # Most common fishing method
-    method_counts = {}                                                     
-    for c in filtered:                                                     
-        if c.method:                                                       
-            method_counts[c.method] = method_counts.get(c.method, 0) + 1   
-    best_method = max(method_counts, key=method_counts.get) if method_counts else None  
+    avg_temp = average(stats, "water_temp")
+    avg_wind = average(stats, "wind_speed")
+    avg_length = average(stats, "length")
+    avg_weight = average(stats, "weight")
 
     # Get most recent catch date
-    recent_date = max(c.date_caught for c in filtered)
+    recent_date = stats.last_caught
 
     # Build response
     summary_parts = []
@@ -85,20 +42,26 @@ def analyze_catch_history(query: str) -> str:
         summary_parts.append(f"📏 Average length: **{avg_length} in**, weight: **{avg_weight} lbs**.")  
     if best_method:                                                        
         summary_parts.append(f"⚓ Most common fishing method: **{best_method}**.")     
-    summary_parts.append(f"📅 Your last logged catch was on **{recent_date.strftime('%B %d, %Y')}**.")
+    if recent_date:
+        summary_parts.append(f"📅 Your last logged catch was on **{recent_date.strftime('%B %d, %Y')}**.")
 
     if not summary_parts:
         return "I couldn’t find clear patterns yet — keep logging more catches and I’ll learn more!"
 
     return " ".join(summary_parts)
 
-catch_history_tool = Tool(
-    name="catch_history_analyzer",
-    func=analyze_catch_history,
-    description="Analyzes user's past catch history to provide suggestions on bait, location, and time. Input should be a natural language query."
-)
+CATCH_HISTORY_DESCRIPTION = "Analyzes user's past catch history to provide suggestions on bait, location, and time. Input should be a natural language query."
+
+
+def build_tools(user_id=None):
+    """Fishing tools bound to the user the agent is answering for."""
+    return [
+        Tool(
+            name="catch_history_analyzer",
+            func=lambda query: analyze_catch_history(query, user_id),
+            description=CATCH_HISTORY_DESCRIPTION,
+        ),
+    ]
 
-# Bundle all fishing tools
-tools = [
-    catch_history_tool,
-]
\ No newline at end of file
+# Bundle all fishing tools (unbound; used to declare tool schemas to the LLM)
+tools = build_tools()
\ No newline at end of file
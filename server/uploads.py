@@ -0,0 +1,141 @@
+import glob
+import logging
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from PIL import UnidentifiedImageError
+from .extensions import db
+from .http_cache import http_cache
+from .images import image_pool, process_image
+from .models import Catch
+from .storage import storage_from_config
+from .utils import with_retries
+
+logger = logging.getLogger(__name__)
+
+# Catch image pipeline: the request spools the upload to local disk and
+# returns immediately with image_status="pending"; a small worker pool
+# hands the file to the image process pool for resizing, pushes the
+# variants to storage and patches the catch's URLs when they land.
+
+PENDING, READY, FAILED = "pending", "ready", "failed"
+
+
+class UploadPipeline:
+    def __init__(self):
+        self.app = None
+        self.storage = None
+        self.spool_dir = None
+        self.attempts = 3
+        self.image_options = {}
+        self._pool = None
+        self._images = None
+
+    def init_app(self, app):
+        self.app = app
+        self.storage = storage_from_config(app.config)
+        self.spool_dir = app.config["UPLOAD_SPOOL_DIR"]
+        self.attempts = app.config.get("UPLOAD_ATTEMPTS", self.attempts)
+        os.makedirs(self.spool_dir, exist_ok=True)
+        self._pool = ThreadPoolExecutor(
+            max_workers=app.config.get("UPLOAD_WORKERS", 4),
+            thread_name_prefix="upload",
+        )
+        self.image_options = {
+            "max_edge": app.config.get("IMAGE_MAX_EDGE", 2048),
+            "fmt": app.config.get("IMAGE_FORMAT", "webp"),
+            "quality": app.config.get("IMAGE_QUALITY", 82),
+        }
+        self._images = image_pool(app.config.get("IMAGE_WORKERS"))
+
+    def spool(self, file):
+        """Stream an uploaded FileStorage to the spool dir; returns the path.
+
+        FileStorage.save copies in chunks, so large photos never sit
+        fully in memory.
+        """
+        ext = os.path.splitext(file.filename or "")[1].lower() or ".jpg"
+        path = os.path.join(self.spool_dir, f"incoming-{uuid.uuid4().hex}{ext}")
+        file.save(path)
+        return path
+
+    def claim(self, spooled_path, catch_id):
+        """Rename a spooled file after its catch id so retries can find it."""
+        path = os.path.join(self.spool_dir, f"catch-{catch_id}{os.path.splitext(spooled_path)[1]}")
+        os.replace(spooled_path, path)
+        return path
+
+    def submit(self, catch_id, path):
+        return self._pool.submit(self.process, catch_id, path)
+
+    def process(self, catch_id, path):
+        """Resize and upload one spooled image and patch its catch. Returns the final status."""
+        with self.app.app_context():
+            try:
+                with tempfile.TemporaryDirectory(dir=self.spool_dir, prefix="variants-") as out_dir:
+                    variants = self._images.submit(
+                        process_image, path, out_dir, **self.image_options
+                    ).result()
+                    urls = {
+                        name: with_retries(
+                            lambda: self.storage.save(variant_path, f"catches/{catch_id}/{name}"),
+                            attempts=self.attempts,
+                        )
+                        for name, variant_path in variants.items()
+                    }
+            except UnidentifiedImageError:
+                # Pillow can't decode it (e.g. HEIC from iPhones): keep the
+                # upload as-is, without variants, like before resizing existed
+                logger.info("Catch %s upload can't be resized; storing the original", catch_id)
+                return self._store_original(catch_id, path)
+            except Exception:
+                logger.exception("Image upload failed for catch %s", catch_id)
+                self._set_status(catch_id, FAILED)
+                return FAILED
+
+            self._set_status(
+                catch_id, READY,
+                image_url=urls["full"],
+                medium_url=urls["medium"],
+                thumbnail_url=urls["thumbnail"],
+            )
+            os.remove(path)
+            logger.debug("Images stored for catch %s: %s", catch_id, urls)
+            return READY
+
+    def _store_original(self, catch_id, path):
+        try:
+            url = with_retries(
+                lambda: self.storage.save(path, f"catches/{catch_id}/full"),
+                attempts=self.attempts,
+            )
+        except Exception:
+            # Keep the spooled file: it is the only copy, and `uploads retry` picks it up
+            logger.exception("Original upload failed for catch %s", catch_id)
+            self._set_status(catch_id, FAILED)
+            return FAILED
+
+        self._set_status(catch_id, READY, image_url=url, medium_url=None, thumbnail_url=None)
+        os.remove(path)
+        return READY
+
+    def _set_status(self, catch_id, status, **values):
+        Catch.query.filter_by(id=catch_id).update(
+            {"image_status": status, **values}, synchronize_session=False
+        )
+        db.session.commit()
+        http_cache.invalidate("catch", catch_id)
+
+    def spooled_catches(self):
+        """(catch_id, path) for every spooled image still waiting on storage."""
+        for path in glob.glob(os.path.join(self.spool_dir, "catch-*")):
+            name = os.path.splitext(os.path.basename(path))[0]
+            yield int(name.split("-", 1)[1]), path
+
+    def discard(self, catch_id):
+        for path in glob.glob(os.path.join(self.spool_dir, f"catch-{catch_id}.*")):
+            os.remove(path)
+
+
+upload_pipeline = UploadPipeline()
@@ -1,3 +1,13 @@
-import requests
-from datetime import datetime, timedelta
+import random
+import time
 
+
+def with_retries(fn, attempts=3, base_delay=1.0):
+    """Call fn(), retrying with exponential backoff plus jitter."""
+    for attempt in range(attempts):
+        try:
+            return fn()
+        except Exception:
+            if attempt == attempts - 1:
+                raise
+            time.sleep(base_delay * (2 ** attempt) + random.uniform(0, base_delay))
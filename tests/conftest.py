@@ -0,0 +1,64 @@
+import pytest
+from flask_jwt_extended import create_access_token
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # create_app reads its config from the environment
+    env = {
+        "DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+        "OPENAI_API_KEY": "test",
+        "JWT_SECRET_KEY": "test-secret-key-that-is-long-enough-for-hs256",
+        "LOG_LEVEL": "WARNING",
+        "NOTIFICATION_FLUSH_INTERVAL": "0",
+        "STORAGE_BACKEND": "local",
+        "LOCAL_STORAGE_DIR": str(tmp_path / "images"),
+        "UPLOAD_SPOOL_DIR": str(tmp_path / "spool"),
+        "IMAGE_WORKERS": "1",
+        "PUBSUB_URL": "memory://",
+        "RESPONSE_CACHE_URL": "",
+    }
+    for name, value in env.items():
+        monkeypatch.setenv(name, value)
+
+    from server import create_app
+    from server.extensions import db
+
+    app = create_app()
+    app.config["TESTING"] = True
+    with app.app_context():
+        db.create_all()
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    from server.extensions import db
+    from server.models import User
+
+    def make(username):
+        with app.app_context():
+            user = User(username=username)
+            db.session.add(user)
+            db.session.commit()
+            return user.id
+
+    return make
+
+
+@pytest.fixture
+def auth_headers(app):
+    def headers(user_id):
+        with app.app_context():
+            token = create_access_token(identity={"id": user_id})
+        return {"Authorization": f"Bearer {token}"}
+
+    return headers
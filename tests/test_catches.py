@@ -0,0 +1,32 @@
+from datetime import datetime
+import pytest
+from server.extensions import db
+from server.models import Catch
+
+
+@pytest.fixture
+def catches(app, make_user):
+    user_id = make_user("angler")
+    with app.app_context():
+        rows = [
+            Catch(user_id=user_id, species="Snook", date_caught=datetime(2026, 6, 1, 6, 30)),
+            Catch(user_id=user_id, species="Tarpon", date_caught=datetime(2026, 6, 1, 19, 45)),
+            Catch(user_id=user_id, species="Redfish", date_caught=datetime(2026, 6, 2, 7, 0)),
+        ]
+        db.session.add_all(rows)
+        db.session.commit()
+        return [row.id for row in rows]
+
+
+@pytest.mark.parametrize("url", ["/catches/2026-06-01", "/catches/date/2026-06-01"])
+def test_catches_by_date(client, catches, url):
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert sorted(item["id"] for item in response.json) == catches[:2]
+    assert {item["user_name"] for item in response.json} == {"angler"}
+
+
+@pytest.mark.parametrize("url", ["/catches/june-first", "/catches/date/2026-13-01"])
+def test_catches_by_date_rejects_bad_dates(client, url):
+    assert client.get(url).status_code == 400
@@ -0,0 +1,170 @@
+import json
+import re
+import threading
+import time
+import pytest
+from langchain.agents import create_tool_calling_agent
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from server import chat_stream
+
+def tokens(text):
+    # Words with their trailing space, like a real model's token stream
+    return re.findall(r"\S+\s*", text)
+
+
+TOOL_CALL = {"name": "catch_history_analyzer", "args": {"__arg1": "best bait"}, "id": "call_1"}
+
+
+class FakeStreamingLLM(BaseChatModel):
+    """Stands in for ChatOpenAI: calls the catch tool once (if given tools), then streams a reply."""
+
+    reply: str = "Try live shrimp at dawn"
+    delay: float = 0.0
+    streaming: bool = True
+    has_tools: bool = False
+    state: dict = {}
+
+    @property
+    def _llm_type(self):
+        return "fake-streaming"
+
+    def bind_tools(self, tools, **kwargs):
+        self.has_tools = bool(tools)
+        return self
+
+    def _calls(self, messages):
+        return not self.has_tools or any(getattr(m, "type", None) == "tool" for m in messages)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        if not self._calls(messages):
+            message = AIMessage(content="", tool_calls=[TOOL_CALL])
+        else:
+            message = AIMessage(content=self.reply)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        if not self._calls(messages):
+            yield ChatGenerationChunk(message=AIMessageChunk(content="", tool_call_chunks=[
+                {**TOOL_CALL, "args": json.dumps(TOOL_CALL["args"]), "index": 0},
+            ]))
+            return
+        self.state["emitted"] = 0
+        try:
+            for word in tokens(self.reply):
+                time.sleep(self.delay)
+                if run_manager:
+                    run_manager.on_llm_new_token(word)
+                self.state["emitted"] += 1
+                yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+        finally:
+            self.state["finished"].set()
+
+
+@pytest.fixture
+def agent_module(app):
+    # Imported once the app fixture has set OPENAI_API_KEY for ChatOpenAI
+    from server import agent
+
+    return agent
+
+
+@pytest.fixture
+def fake_llm(agent_module, monkeypatch):
+    llm = FakeStreamingLLM(state={"finished": threading.Event()})
+    # build_agent_executor wraps the shared agent, so swapping it swaps the LLM
+    fake_agent = create_tool_calling_agent(llm=llm, prompt=agent_module.prompt, tools=agent_module.tools)
+    monkeypatch.setattr(agent_module, "agent", fake_agent)
+    return llm
+
+
+@pytest.fixture
+def guest_llm(agent_module, monkeypatch):
+    llm = FakeStreamingLLM(reply="Fish the tide change", state={"finished": threading.Event()})
+    monkeypatch.setattr(agent_module, "guest_agent", agent_module.build_guest_agent(llm))
+    return llm
+
+
+@pytest.fixture
+def signed_in(make_user, auth_headers):
+    return auth_headers(make_user("angler"))
+
+
+def parse(chunks):
+    """[(event, data)] for SSE events, ("keep-alive", None) for comments."""
+    events = []
+    for chunk in chunks:
+        if chunk.startswith(":"):
+            events.append(("keep-alive", None))
+            continue
+        event, data = (line.split(": ", 1)[1] for line in chunk.strip().split("\n"))
+        events.append((event, json.loads(data)))
+    return events
+
+
+def stream(client, message, headers=None, **body):
+    response = client.post("/chat/stream", json={"message": message, **body}, headers=headers, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    return response
+
+
+def test_events_arrive_in_order_then_done(client, fake_llm, signed_in):
+    response = stream(client, "what bait works?", signed_in)
+    events = parse(chunk.decode() for chunk in response.response)
+
+    names = [name for name, _ in events]
+    assert names == ["tool_start", "tool_end"] + ["token"] * 5 + ["done"]
+    assert events[0][1]["tool"] == "catch_history_analyzer"
+    assert "haven't logged any catches" in events[1][1]["output"]
+    streamed = [data["text"] for name, data in events if name == "token"]
+    assert streamed == tokens(fake_llm.reply)
+    assert events[-1][1]["reply"] == fake_llm.reply
+
+    # The finished reply was cached, so asking again answers at once
+    [(name, data)] = parse(chunk.decode() for chunk in stream(client, "what bait works?", signed_in).response)
+    assert (name, data) == ("done", {"reply": fake_llm.reply, "cached": True})
+
+
+def test_keepalives_while_the_model_is_slow(client, fake_llm, signed_in, monkeypatch):
+    monkeypatch.setattr(chat_stream, "KEEPALIVE_SECONDS", 0.02)
+    fake_llm.delay = 0.1
+
+    events = parse(chunk.decode() for chunk in stream(client, "slow one", signed_in).response)
+
+    assert ("keep-alive", None) in events
+    # Keepalives are only filler: the real events keep their order
+    names = [name for name, _ in events if name != "keep-alive"]
+    assert names == ["tool_start", "tool_end"] + ["token"] * 5 + ["done"]
+
+
+def test_disconnect_stops_the_agent(client, fake_llm, signed_in):
+    fake_llm.delay = 0.05
+    response = stream(client, "walk away", signed_in)
+    chunks = iter(response.response)
+
+    name = None
+    while name != "token":
+        [(name, _)] = parse([next(chunks).decode()])
+    response.close()  # what the server does when the client goes away
+
+    # The next token raises inside the agent run, which then ends early
+    assert fake_llm.state["finished"].wait(2)
+    assert fake_llm.state["emitted"] < len(tokens(fake_llm.reply))
+
+
+def test_guests_get_no_catch_tool_whatever_user_id_they_send(client, make_user, fake_llm, guest_llm):
+    victim = make_user("victim")
+
+    events = parse(chunk.decode() for chunk in stream(client, "what bait works?", user_id=victim).response)
+
+    # The guest agent answered directly; the tool-calling agent never ran
+    assert [name for name, _ in events] == ["token"] * 4 + ["done"]
+    assert events[-1][1]["reply"] == guest_llm.reply
+    assert "emitted" not in fake_llm.state
+
+
+def test_guest_executor_has_no_tools(agent_module):
+    assert agent_module.build_agent_executor(None).tools == []
+    assert [t.name for t in agent_module.build_agent_executor(1).tools] == ["catch_history_analyzer"]
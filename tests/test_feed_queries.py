@@ -0,0 +1,60 @@
+import re
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import insert
+from server.extensions import db
+from server.models import Catch, Follower
+from server.timeline import timeline
+
+AUTHORS = 5
+
+
+def query_count(response):
+    # perf.init_app reports every request's statement count in Server-Timing
+    return int(re.search(r'desc="(\d+) queries"', response.headers["Server-Timing"]).group(1))
+
+
+def add_catches(author_ids, start, count):
+    now = datetime.utcnow()
+    db.session.execute(insert(Catch), [
+        {
+            "user_id": author_ids[i % len(author_ids)],
+            "species": "Striped Bass",
+            "date_caught": now - timedelta(minutes=i),
+            "is_public": True,
+            "image_url": f"https://example.invalid/{i}.jpg",
+        }
+        for i in range(start, start + count)
+    ])
+    db.session.commit()
+    timeline.rebuild()
+
+
+def measure(client, url, headers):
+    # The first request warms the per-process caches (follow graph, token
+    # filter); the second is the steady state being compared
+    client.get(url, headers=headers)
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    return query_count(response), len(response.json)
+
+
+@pytest.mark.parametrize("url", ["/feed", "/timeline"])
+def test_query_count_flat_from_10_to_10k_catches(app, client, make_user, auth_headers, url):
+    viewer = make_user("viewer")
+    authors = [make_user(f"author{i}") for i in range(AUTHORS)]
+    with app.app_context():
+        db.session.add_all(Follower(follower_id=viewer, following_id=a) for a in authors)
+        db.session.commit()
+        add_catches(authors, 0, 10)
+    headers = auth_headers(viewer)
+
+    small_queries, small_rows = measure(client, url, headers)
+
+    with app.app_context():
+        add_catches(authors, 10, 9990)
+
+    large_queries, large_rows = measure(client, url, headers)
+
+    assert (small_rows, large_rows) == (10, 20)
+    assert large_queries == small_queries
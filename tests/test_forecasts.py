@@ -0,0 +1,62 @@
+from datetime import datetime
+import pytest
+from server.extensions import db
+from server.models import Catch, MonthlyForecast
+
+
+@pytest.fixture
+def angler(app, make_user):
+    user_id = make_user("angler")
+    with app.app_context():
+        db.session.add(Catch(user_id=user_id, species="Snook", bait_used="shrimp", date_caught=datetime.now()))
+        db.session.commit()
+    return user_id
+
+
+class FakeLLM:
+    def __init__(self):
+        self.in_transaction = []  # per call: was a DB transaction open?
+        self.reply = lambda stats, month_name: f"{month_name}: fish {stats['bait']}"
+
+    def __call__(self, stats, month_name, **kwargs):
+        # Seconds of OpenAI latency in production: no transaction may be open
+        self.in_transaction.append(db.session().in_transaction())
+        return self.reply(stats, month_name)
+
+
+@pytest.fixture
+def llm(app, monkeypatch):
+    from server.routes import ai
+
+    fake = FakeLLM()
+    monkeypatch.setattr(ai, "generate_forecast_text", fake)
+    return fake
+
+
+def test_forecast_is_generated_outside_a_transaction_and_cached(client, angler, llm):
+    first = client.get("/ai/monthly_forecast", query_string={"user_id": angler}).json
+    second = client.get("/ai/monthly_forecast", query_string={"user_id": angler}).json
+
+    assert first["cached"] is False and first["forecast_text"].endswith("fish shrimp")
+    assert second == {"forecast_text": first["forecast_text"], "cached": True}
+    assert llm.in_transaction == [False]
+
+
+def test_racing_writer_wins_through_the_unique_key(app, client, angler, llm):
+    now = datetime.now()
+
+    def other_worker_finishes_first(stats, month_name):
+        # Runs in its own session, as another gunicorn worker would
+        with db.engine.begin() as conn:
+            conn.execute(MonthlyForecast.__table__.insert().values(
+                user_id=angler, month=now.month, year=now.year, forecast_text="theirs",
+            ))
+        return "ours"
+
+    llm.reply = other_worker_finishes_first
+    response = client.get("/ai/monthly_forecast", query_string={"user_id": angler})
+
+    assert response.status_code == 200
+    assert response.json == {"forecast_text": "theirs", "cached": True}
+    with app.app_context():
+        assert MonthlyForecast.query.count() == 1
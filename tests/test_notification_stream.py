@@ -0,0 +1,80 @@
+import json
+import pytest
+from server import notifications
+from server.extensions import db
+from server.models import Catch
+from server.pubsub import pubsub
+
+
+@pytest.fixture
+def owner_and_catch(app, make_user):
+    owner = make_user("owner")
+    with app.app_context():
+        catch = Catch(user_id=owner, species="Redfish", is_public=True)
+        db.session.add(catch)
+        db.session.commit()
+        return owner, catch.id
+
+
+def next_event(chunks):
+    """(event, data) of the next SSE chunk, or ("keep-alive", None)."""
+    chunk = next(chunks).decode()
+    if chunk.startswith(":"):
+        return "keep-alive", None
+    event, data = (line.split(": ", 1)[1] for line in chunk.strip().split("\n"))
+    return event, json.loads(data)
+
+
+def open_stream(client, headers):
+    response = client.get("/notifications/stream", headers=headers, buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    return response, iter(response.response)
+
+
+def test_like_is_pushed_with_new_unread_count(client, make_user, auth_headers, owner_and_catch):
+    owner, catch_id = owner_and_catch
+    fan = make_user("fan")
+    response, chunks = open_stream(client, auth_headers(owner))
+
+    assert next_event(chunks) == ("unread_count", {"count": 0})
+
+    # NOTIFICATION_FLUSH_INTERVAL=0 in tests: the like is written and published inline
+    assert client.post(f"/catches/{catch_id}/like", json={"user_id": fan}).status_code == 201
+
+    event, data = next_event(chunks)
+    assert event == "notification"
+    assert data["recipient_id"] == owner
+    assert (data["type"], data["catch_id"], data["actor_id"], data["actor_count"]) == ("like", catch_id, fan, 1)
+    assert data["is_read"] is False
+    assert next_event(chunks) == ("unread_count", {"count": 1})
+    response.close()
+
+
+def test_other_users_events_are_not_delivered(client, make_user, auth_headers, owner_and_catch, monkeypatch):
+    monkeypatch.setattr(notifications, "KEEPALIVE_SECONDS", 0.05)
+    owner, catch_id = owner_and_catch
+    fan = make_user("fan")
+    response, chunks = open_stream(client, auth_headers(fan))
+    assert next_event(chunks) == ("unread_count", {"count": 0})
+
+    client.post(f"/catches/{catch_id}/like", json={"user_id": fan})
+
+    # Only the catch owner's channel gets the like; the fan just sees keep-alives
+    assert next_event(chunks) == ("keep-alive", None)
+    response.close()
+
+
+def test_closing_the_stream_unsubscribes(client, make_user, auth_headers):
+    user = make_user("reader")
+    before = pubsub.backend.subscriber_count()
+    response, chunks = open_stream(client, auth_headers(user))
+    next_event(chunks)
+    assert pubsub.backend.subscriber_count() == before + 1
+
+    response.close()
+    assert pubsub.backend.subscriber_count() == before
+
+
+def test_stream_requires_a_token(client):
+    assert client.get("/notifications/stream").status_code == 401
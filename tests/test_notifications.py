@@ -0,0 +1,136 @@
+import pytest
+from server.extensions import db
+from server.models import Catch, Notification, NotificationActor, User
+from server.notifications import notification_queue
+
+
+@pytest.fixture
+def catch(app, make_user):
+    owner = make_user("owner")
+    with app.app_context():
+        row = Catch(user_id=owner, species="Snook", is_public=True)
+        db.session.add(row)
+        db.session.commit()
+        return row.id
+
+
+@pytest.fixture
+def batched(monkeypatch):
+    # Hold events until flush() is called, as the background thread would
+    monkeypatch.setattr(notification_queue, "flush_interval", 60)
+
+
+def notifications(app, catch_id):
+    with app.app_context():
+        rows = Notification.query.filter_by(catch_id=catch_id).order_by(Notification.id).all()
+        return [(n.type, n.actor_id, n.actor_count, n.created_at) for n in rows]
+
+
+def unread(app, user_id):
+    with app.app_context():
+        return db.session.get(User, user_id).unread_notifications
+
+
+def test_repeat_actor_counts_once_across_flushes(app, client, make_user, catch):
+    fan = make_user("fan")
+    for i in range(5):
+        client.post(f"/catches/{catch}/comments", json={"user_id": fan, "content": f"nice {i}"})
+
+    [(type, actor_id, count, _)] = notifications(app, catch)
+    assert (type, actor_id, count) == ("comment", fan, 1)
+    with app.app_context():
+        assert NotificationActor.query.count() == 1
+
+
+def test_unlike_and_relike_does_not_inflate(app, client, make_user, catch):
+    fan = make_user("fan")
+    client.post(f"/catches/{catch}/like", json={"user_id": fan})
+    client.delete(f"/catches/{catch}/unlike", json={"user_id": fan})
+    client.post(f"/catches/{catch}/like", json={"user_id": fan})
+
+    [(_, actor_id, count, _)] = notifications(app, catch)
+    assert (actor_id, count) == (fan, 1)
+
+
+def test_distinct_actors_add_up_across_flushes(app, client, make_user, catch):
+    a, b, c = make_user("a"), make_user("b"), make_user("c")
+    for user_id in (a, b, a, c, b):
+        client.post(f"/catches/{catch}/like", json={"user_id": user_id})
+        client.delete(f"/catches/{catch}/unlike", json={"user_id": user_id})
+
+    [(_, actor_id, count, _)] = notifications(app, catch)
+    assert (actor_id, count) == (b, 3)
+
+
+def test_burst_dedups_within_one_flush(app, make_user, catch, batched):
+    a, b = make_user("a"), make_user("b")
+    with app.app_context():
+        owner = db.session.get(Catch, catch).user_id
+        for actor_id in (a, b, a, owner):
+            notification_queue.enqueue("like", catch, actor_id)
+        assert notification_queue.flush() == 1
+
+    # The owner's own like is skipped; a is the latest other actor
+    [(_, actor_id, count, _)] = notifications(app, catch)
+    assert (actor_id, count) == (a, 2)
+    assert unread(app, owner) == 1
+
+
+def test_bump_in_place_keeps_one_unread(app, make_user, catch, batched):
+    a, b = make_user("a"), make_user("b")
+    with app.app_context():
+        owner = db.session.get(Catch, catch).user_id
+        notification_queue.enqueue("like", catch, a)
+        notification_queue.flush()
+        notification_queue.enqueue("like", catch, b)
+        notification_queue.flush()
+
+    [(_, actor_id, count, _)] = notifications(app, catch)
+    assert (actor_id, count) == (b, 2)
+    assert unread(app, owner) == 1
+
+
+def test_read_notification_starts_a_new_count(app, make_user, catch, batched):
+    fan = make_user("fan")
+    with app.app_context():
+        notification_queue.enqueue("like", catch, fan)
+        notification_queue.flush()
+        Notification.query.update({"is_read": True})
+        db.session.commit()
+        notification_queue.enqueue("like", catch, fan)
+        notification_queue.flush()
+
+    counts = [count for _, _, count, _ in notifications(app, catch)]
+    assert counts == [1, 1]
+
+
+def test_ids_follow_latest_activity(app, make_user, batched):
+    owner, a, b = make_user("owner"), make_user("a"), make_user("b")
+    with app.app_context():
+        first, second = Catch(user_id=owner), Catch(user_id=owner)
+        db.session.add_all([first, second])
+        db.session.commit()
+        first, second = first.id, second.id
+
+        notification_queue.enqueue("like", first, a)
+        notification_queue.enqueue("comment", second, b)
+        notification_queue.enqueue("like", first, b)  # first is now the most recent
+        assert notification_queue.flush() == 2
+
+        rows = Notification.query.order_by(Notification.id).all()
+        assert [(n.catch_id, n.type) for n in rows] == [(second, "comment"), (first, "like")]
+        assert rows[0].created_at <= rows[1].created_at
+        assert rows[1].actor_id == b
+
+
+def test_deleting_catch_removes_actor_rows(app, client, make_user, auth_headers, catch):
+    fan = make_user("fan")
+    client.post(f"/catches/{catch}/like", json={"user_id": fan})
+    with app.app_context():
+        owner = db.session.get(Catch, catch).user_id
+
+    response = client.delete(f"/catches/{catch}", headers=auth_headers(owner))
+    assert response.status_code == 204
+    with app.app_context():
+        assert Notification.query.count() == 0
+        assert NotificationActor.query.count() == 0
@@ -0,0 +1,94 @@
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from server.pubsub import CHANNEL_PREFIX, LocalPubSub, PubSub, RedisPubSub, pubsub
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+@pytest.fixture
+def redis_server(monkeypatch):
+    import redis
+
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(
+        redis.Redis, "from_url", classmethod(lambda cls, url, **kwargs: fakeredis.FakeRedis(server=server))
+    )
+    return server
+
+
+def wait_for_listeners(server, *workers):
+    # Each RedisPubSub subscribes from its own thread: publish probes
+    # straight to Redis until every worker has relayed one
+    client = fakeredis.FakeRedis(server=server)
+    probes = [worker.subscribe("probe") for worker in workers]
+    deadline = time.monotonic() + 2
+    while probes:
+        assert time.monotonic() < deadline, "listeners never subscribed"
+        client.publish(CHANNEL_PREFIX + "probe", json.dumps("ping"))
+        probes = [p for p in probes if p.get(timeout=0.02) is None]
+    for worker in workers:
+        for subscription in list(worker._subscribers.get("probe", ())):
+            subscription.close()
+
+
+def test_publish_reaches_subscribers_in_every_worker(redis_server):
+    first, second = RedisPubSub("redis://fake/0"), RedisPubSub("redis://fake/0")
+    wait_for_listeners(redis_server, first, second)
+    here, there = first.subscribe("notifications:1"), second.subscribe("notifications:1")
+    elsewhere = second.subscribe("notifications:2")
+
+    first.publish("notifications:1", {"event": "unread_count", "data": {"count": 3}})
+
+    expected = {"event": "unread_count", "data": {"count": 3}}
+    assert there.get(timeout=2) == expected
+    assert here.get(timeout=2) == expected
+    assert elsewhere.get(timeout=0.1) is None
+
+
+def test_messages_go_through_redis_as_json(redis_server):
+    worker = RedisPubSub("redis://fake/0")
+    wait_for_listeners(redis_server, worker)
+    spy = fakeredis.FakeRedis(server=redis_server).pubsub(ignore_subscribe_messages=True)
+    spy.subscribe(CHANNEL_PREFIX + "notifications:7")
+    spy.get_message(timeout=1)
+
+    worker.publish("notifications:7", {"event": "notification", "data": {"id": 1}})
+
+    message = spy.get_message(timeout=2)
+    assert json.loads(message["data"]) == {"event": "notification", "data": {"id": 1}}
+
+
+def test_init_app_picks_backend_from_url(redis_server):
+    hub = PubSub()
+    hub.init_app(SimpleNamespace(config={"PUBSUB_URL": "redis://fake/0"}))
+    assert isinstance(hub.backend, RedisPubSub)
+    hub.init_app(SimpleNamespace(config={"PUBSUB_URL": "memory://"}))
+    assert type(hub.backend) is LocalPubSub
+    with pytest.raises(ValueError):
+        hub.init_app(SimpleNamespace(config={"PUBSUB_URL": "nats://fake"}))
+
+
+def test_notification_stream_over_redis(app, client, make_user, auth_headers, redis_server, monkeypatch):
+    from server.extensions import db
+    from server.models import Catch
+
+    monkeypatch.setattr(pubsub, "backend", RedisPubSub("redis://fake/0"))
+    wait_for_listeners(redis_server, pubsub.backend)
+    owner, fan = make_user("owner"), make_user("fan")
+    with app.app_context():
+        catch = Catch(user_id=owner, is_public=True)
+        db.session.add(catch)
+        db.session.commit()
+        catch_id = catch.id
+
+    response = client.get("/notifications/stream", headers=auth_headers(owner), buffered=False)
+    chunks = iter(response.response)
+    assert b"unread_count" in next(chunks)
+
+    client.post(f"/catches/{catch_id}/like", json={"user_id": fan})
+
+    assert next(chunks).startswith(b"event: notification\n")
+    assert next(chunks) == b'event: unread_count\ndata: {"count": 1}\n\n'
+    response.close()
@@ -0,0 +1,129 @@
+from datetime import datetime, timedelta
+import pytest
+from sqlalchemy import event
+from server.extensions import db
+from server.models import RevokedToken
+from server.revocation import RevocationStore
+
+
+def later(**delta):
+    return datetime.utcnow() + timedelta(**delta)
+
+
+@pytest.fixture
+def stores(app):
+    # Two gunicorn workers' views of the same revoked_tokens table
+    first, second = RevocationStore(), RevocationStore()
+    first.init_app(app)
+    second.init_app(app)
+    with app.app_context():
+        first.rebuild()
+        second.rebuild()
+        yield first, second
+
+
+@pytest.fixture
+def queries(app):
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    yield statements
+    event.remove(engine, "before_cursor_execute", record)
+
+
+def hold_sync(*stores):
+    # No periodic sync/rebuild during the assertion that follows
+    for store in stores:
+        store._next_sync = float("inf")
+
+
+def test_logout_in_one_worker_is_seen_by_another_after_sync(stores):
+    first, second = stores
+    hold_sync(first, second)
+
+    first.revoke("jti-1", later(hours=1))
+
+    assert first.is_revoked("jti-1")
+    assert not second.is_revoked("jti-1")  # not synced yet
+    second.sync()
+    assert second.is_revoked("jti-1")
+
+
+def test_periodic_sync_picks_up_other_workers_logouts(stores):
+    first, second = stores
+    first.revoke("jti-1", later(hours=1))
+
+    second._next_sync = 0.0  # the sync interval has passed
+    assert second.is_revoked("jti-1")
+
+
+def test_bloom_miss_makes_no_query(stores, queries):
+    first, _ = stores
+    first.revoke("revoked", later(hours=1))
+    hold_sync(first)
+    queries.clear()
+
+    assert not first.is_revoked("never-revoked")
+    assert queries == []
+
+    assert first.is_revoked("revoked")
+    assert len(queries) == 1  # the filter hit is confirmed in the table
+
+
+def test_rebuild_drops_expired_rows_but_keeps_late_commits(stores):
+    store, _ = stores
+    db.session.add_all([
+        RevokedToken(jti="expired", expires_at=later(hours=-1)),
+        RevokedToken(jti="live", expires_at=later(hours=1)),
+    ])
+    db.session.commit()
+
+    assert store.rebuild() == 1
+    assert store._bloom.count == 1
+    assert store.is_revoked("live")
+
+    # A logout whose transaction stamped revoked_at before the rebuild
+    # started but only committed after the rebuild's read
+    db.session.add(RevokedToken(jti="late", revoked_at=later(seconds=-5), expires_at=later(hours=1)))
+    db.session.commit()
+    hold_sync(store)
+    store.sync()
+
+    assert store.is_revoked("late")
+
+
+def test_prune_removes_only_expired_revocations(stores):
+    store, _ = stores
+    db.session.add_all([
+        RevokedToken(jti="expired-1", expires_at=later(hours=-2)),
+        RevokedToken(jti="expired-2", expires_at=later(seconds=-1)),
+        RevokedToken(jti="live", expires_at=later(hours=1)),
+    ])
+    db.session.commit()
+
+    assert store.prune() == 2
+    assert [jti for (jti,) in db.session.query(RevokedToken.jti)] == ["live"]
+
+
+def test_revoking_twice_is_harmless(stores):
+    store, _ = stores
+    store.revoke("jti-1", later(hours=1))
+    store.revoke("jti-1", later(hours=1))
+
+    assert RevokedToken.query.count() == 1
+
+
+def test_logged_out_token_is_rejected(app, client, make_user, auth_headers):
+    headers = auth_headers(make_user("angler"))
+    assert client.get("/timeline", headers=headers).status_code == 200
+
+    assert client.delete("/logout", headers=headers).status_code == 200
+
+    assert client.get("/timeline", headers=headers).status_code == 401
+    with app.app_context():
+        assert RevokedToken.query.count() == 1
@@ -0,0 +1,154 @@
+from datetime import datetime, timedelta
+import pytest
+from server.extensions import db
+from server.models import Catch, TimelineEntry
+from server.timeline import timeline
+
+
+@pytest.fixture
+def api(client, auth_headers):
+    class Api:
+        def post(self, author, days_ago=0, is_public=True):
+            when = datetime(2026, 6, 1) - timedelta(days=days_ago)
+            response = client.post("/catches", headers=auth_headers(author), json={
+                "image_url": "https://example.invalid/catch.jpg",
+                "date_caught": when.isoformat(),
+                "is_public": is_public,
+            })
+            assert response.status_code == 201
+            return response.json["catch"]["id"]
+
+        def follow(self, follower, author):
+            assert client.post("/follow", headers=auth_headers(follower), json={"following_id": author}).status_code == 201
+
+        def unfollow(self, follower, author):
+            assert client.post("/unfollow", headers=auth_headers(follower), json={"following_id": author}).status_code == 200
+
+        def timeline(self, user, **params):
+            response = client.get("/timeline", headers=auth_headers(user), query_string=params)
+            assert response.status_code == 200
+            return [item["id"] for item in response.json], response.headers.get("X-Next-Cursor")
+
+        def ids(self, user):
+            return self.timeline(user, limit=100)[0]
+
+    return Api()
+
+
+def entries(app, catch_id):
+    with app.app_context():
+        return sorted(user_id for (user_id,) in db.session.query(TimelineEntry.user_id).filter_by(catch_id=catch_id))
+
+
+def fanned_out(app, catch_id):
+    with app.app_context():
+        return db.session.get(Catch, catch_id).fanned_out
+
+
+def test_fan_out_writes_one_entry_per_follower(app, api, make_user):
+    author, a, b = make_user("author"), make_user("a"), make_user("b")
+    api.follow(a, author)
+    api.follow(b, author)
+
+    public = api.post(author)
+    private = api.post(author, is_public=False)
+
+    assert entries(app, public) == [a, b]
+    assert fanned_out(app, public)
+    assert entries(app, private) == []
+    assert api.ids(a) == api.ids(b) == [public]
+
+
+def test_follow_backfills_recent_catches_and_unfollow_removes_them(app, api, make_user, monkeypatch):
+    monkeypatch.setattr(timeline, "backfill", 2)
+    author, reader = make_user("author"), make_user("reader")
+    old, older, oldest = api.post(author, 1), api.post(author, 2), api.post(author, 3)
+
+    api.follow(reader, author)
+    assert api.ids(reader) == [old, older]  # newest `backfill` catches only
+
+    api.unfollow(reader, author)
+    assert api.ids(reader) == []
+    assert entries(app, old) == []
+
+
+def test_deleted_catch_leaves_timelines(app, api, make_user, auth_headers, client):
+    author, reader = make_user("author"), make_user("reader")
+    api.follow(reader, author)
+    kept, deleted = api.post(author, 1), api.post(author)
+
+    assert client.delete(f"/catches/{deleted}", headers=auth_headers(author)).status_code == 204
+    assert entries(app, deleted) == []
+    assert api.ids(reader) == [kept]
+
+
+def test_heavy_author_is_merged_on_read(app, api, make_user, monkeypatch):
+    monkeypatch.setattr(timeline, "fanout_limit", 1)
+    author, a, b = make_user("author"), make_user("a"), make_user("b")
+    api.follow(a, author)
+    api.follow(b, author)
+
+    catch_id = api.post(author)
+
+    assert entries(app, catch_id) == []
+    assert not fanned_out(app, catch_id)
+    assert api.ids(a) == api.ids(b) == [catch_id]
+
+
+def test_catch_stays_visible_after_author_drops_under_limit(app, api, make_user, monkeypatch):
+    monkeypatch.setattr(timeline, "fanout_limit", 1)
+    author, a, b = make_user("author"), make_user("a"), make_user("b")
+    api.follow(a, author)
+    api.follow(b, author)
+    catch_id = api.post(author)
+
+    # Back under the limit: nothing about the unfanned catch depends on that
+    api.unfollow(b, author)
+
+    assert api.ids(a) == [catch_id]
+    assert api.ids(b) == []
+
+
+def test_following_a_heavy_author_sees_every_catch_once(app, api, make_user, monkeypatch):
+    author, a, b, late = make_user("author"), make_user("a"), make_user("b"), make_user("late")
+    api.follow(a, author)
+    fanned = [api.post(author, days) for days in (5, 3, 1)]
+
+    monkeypatch.setattr(timeline, "fanout_limit", 1)
+    api.follow(b, author)  # now heavy
+    unfanned = [api.post(author, days) for days in (4, 2, 0)]
+    api.follow(late, author)
+
+    newest_first = [unfanned[2], fanned[2], unfanned[1], fanned[1], unfanned[0], fanned[0]]
+    for reader in (a, b, late):
+        assert api.ids(reader) == newest_first
+
+    # Keyset pages over the merged timeline: each catch exactly once, in order
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["before"] = cursor
+        page, cursor = api.timeline(late, **params)
+        seen += page
+        if not cursor:
+            break
+    assert seen == newest_first
+
+
+def test_rebuild_matches_write_path(app, api, make_user, monkeypatch):
+    author, heavy, a, b = make_user("author"), make_user("heavy"), make_user("a"), make_user("b")
+    api.follow(a, author)
+    api.follow(a, heavy)
+    api.follow(b, heavy)
+    light_catch = api.post(author)
+    heavy_catch = api.post(heavy, 1)
+
+    monkeypatch.setattr(timeline, "fanout_limit", 1)
+    with app.app_context():
+        timeline.rebuild()
+
+    assert fanned_out(app, light_catch) and entries(app, light_catch) == [a]
+    assert not fanned_out(app, heavy_catch) and entries(app, heavy_catch) == []
+    assert api.ids(a) == [light_catch, heavy_catch]
+    assert api.ids(b) == [heavy_catch]
@@ -0,0 +1,71 @@
+import os
+import pytest
+from server.extensions import db
+from server.models import Catch
+from server.storage import StorageBackend
+from server.uploads import upload_pipeline, FAILED, PENDING, READY
+
+
+def spooled_catch(app, make_user, data=b"ftypheic not decodable by Pillow"):
+    user_id = make_user("angler")
+    with app.app_context():
+        catch = Catch(user_id=user_id, species="Fluke", image_status=PENDING)
+        db.session.add(catch)
+        db.session.commit()
+        catch_id = catch.id
+    path = os.path.join(app.config["UPLOAD_SPOOL_DIR"], f"catch-{catch_id}.heic")
+    with open(path, "wb") as f:
+        f.write(data)
+    return catch_id, path
+
+
+def test_undecodable_upload_stores_original(app, make_user):
+    catch_id, path = spooled_catch(app, make_user)
+
+    assert upload_pipeline.process(catch_id, path) == READY
+
+    with app.app_context():
+        catch = db.session.get(Catch, catch_id)
+        assert catch.image_status == READY
+        assert catch.image_url.endswith(f"catches/{catch_id}/full.heic")
+        assert catch.medium_url is None and catch.thumbnail_url is None
+    stored = os.path.join(app.config["LOCAL_STORAGE_DIR"], "catches", str(catch_id), "full.heic")
+    with open(stored, "rb") as f:
+        assert f.read() == b"ftypheic not decodable by Pillow"
+    assert not os.path.exists(path)
+
+
+def test_failed_original_upload_keeps_spooled_file(app, make_user, monkeypatch):
+    catch_id, path = spooled_catch(app, make_user)
+
+    def unavailable(path, key):
+        raise ConnectionError("storage down")
+
+    monkeypatch.setattr(upload_pipeline.storage, "save", unavailable)
+    monkeypatch.setattr(upload_pipeline, "attempts", 1)
+
+    assert upload_pipeline.process(catch_id, path) == FAILED
+    with app.app_context():
+        assert db.session.get(Catch, catch_id).image_status == FAILED
+    # Still the only copy; `flask uploads retry` can pick it up
+    assert os.path.exists(path)
+    assert (catch_id, path) in list(upload_pipeline.spooled_catches())
+
+
+def test_local_storage_urls_are_served(app, client, make_user):
+    catch_id, path = spooled_catch(app, make_user)
+    upload_pipeline.process(catch_id, path)
+    with app.app_context():
+        url = db.session.get(Catch, catch_id).image_url
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert response.data == b"ftypheic not decodable by Pillow"
+
+
+def test_storage_backends_must_implement_save():
+    class Incomplete(StorageBackend):
+        pass
+
+    with pytest.raises(TypeError):
+        Incomplete()